@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Report how much memory the models of a language database take.
+
+Every model is counted with the objects in its fields. An object that is
+shared by several models (an interned status or ID, for example) is only
+counted for the first model that refers to it, so the numbers show what
+sharing saves."""
+
+import sys
+
+from spelt.models import *
+from spelt.models.surface_form_store import INT_COLUMNS, SurfaceFormStore
+
+def slot_names(model):
+    """Get the names of the fields in the __slots__ of a model's classes."""
+    names = []
+    for klass in type(model).__mro__:
+        names.extend(getattr(klass, '__slots__', ()))
+    return names
+
+def model_memory(models, seen=None):
+    """Get the number of bytes used by the given models and their fields.
+
+        @type  seen: set
+        @param seen: The id()'s of objects that were already counted."""
+    if seen is None:
+        seen = set()
+    total = 0
+    for model in models:
+        total += sys.getsizeof(model)
+        for name in slot_names(model):
+            value = getattr(model, name, None)
+            if value is None or id(value) in seen:
+                continue
+            seen.add(id(value))
+            total += sys.getsizeof(value)
+    return total
+
+def store_memory(store):
+    """Get the number of bytes used by a SurfaceFormStore: its columns, text
+        table and views."""
+    columns = [getattr(store, column) for name, column in INT_COLUMNS]
+    columns += [store.statuses, store.text, store.offsets, store.lengths, store.rows, store.views]
+    total = sum([sys.getsizeof(column) for column in columns])
+    return total + sum([sys.getsizeof(view) for view in store])
+
+def report(langdb, out=sys.stdout):
+    """Print the number of models and bytes used by every section of the
+        given language database to out."""
+    seen = set()
+    for section in ('users', 'sources', 'parts_of_speech', 'roots', 'surface_forms'):
+        models = getattr(langdb, section)
+        if isinstance(models, SurfaceFormStore):
+            total = store_memory(models)
+        else:
+            total = model_memory(models, seen)
+        per_model = models and float(total) / len(models) or 0.0
+        print >> out, '%-16s %8d models %12d bytes %8.1f bytes/model' % (section, len(models), total, per_model)
+
+def create_option_parser():
+    from optparse import OptionParser
+
+    usage = '%prog [<options>]'
+    parser = OptionParser(usage=usage)
+
+    parser.add_option(
+        '-i', '--inputdb',
+        dest='ilangdb',
+        default='testdb.xldb',
+        help='The language database to measure.'
+    )
+    parser.add_option(
+        '-c', '--columnar',
+        dest='columnar',
+        action='store_true',
+        default=False,
+        help='Keep the surface forms in a SurfaceFormStore.'
+    )
+
+    return parser
+
+def main():
+    options, args = create_option_parser().parse_args()
+    report(LanguageDB(filename=options.ilangdb, columnar=options.columnar))
+
+if __name__ == '__main__':
+    main()
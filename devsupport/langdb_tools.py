@@ -28,6 +28,8 @@ class LanguageDBProcessor(object):
     This class is intended for use in benchmarking and/or profiling of the
     language database code.
 
+    Models are added in a single batch with L{LanguageDB.add_many}.
+
     Only the addition of roots and parts-of-speech are supported here, because
     those are the models that are expected to have the greatest impact on
     Spelt's performance. Also, surface forms can easily be added by importing a
@@ -50,9 +52,11 @@ class LanguageDBProcessor(object):
 
             The POS's shortcut is set to the same as its name
             """
-        for i in range(n):
-            name = "%s%d" % (prefix, i+1)
-            self.langdb.add_part_of_speech(PartOfSpeech(name=name, shortcut=name))
+        names = ["%s%d" % (prefix, i+1) for i in range(n)]
+        self.langdb.add_many(
+            'parts_of_speech',
+            [PartOfSpeech(name=name, shortcut=name) for name in names]
+        )
 
     def add_roots(self, n, prefix=''):
         """Add C{n} roots to the language database with the given prefix
@@ -61,6 +65,7 @@ class LanguageDBProcessor(object):
             Besides the name, the default values from L{Root}'s C{__init__()}
             are used.
             """
-        for i in range(n):
-            v = "%s%d" % (prefix, i)
-            self.langdb.add_root(Root(value=v))
+        self.langdb.add_many(
+            'roots',
+            [Root(value="%s%d" % (prefix, i)) for i in range(n)]
+        )
@@ -65,6 +65,7 @@ options = {
         "spelt",
         "spelt.common",
         "spelt.gui",
+        "spelt.importers",
         "spelt.models",
         "spelt.support"
     ],
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains the Collator class, which gives language-aware sort keys for words."""
+
+import unicodedata
+
+try:
+    import icu
+except ImportError, _e:
+    icu = None
+
+def fallback_key(text):
+    """A sort key for when PyICU is not available.
+
+        Words are compared by their letters without accents and case first,
+        then with accents and then with case, which is close to most
+        languages' dictionary order."""
+    decomposed = unicodedata.normalize('NFD', unicode(text))
+    base = u''.join([c for c in decomposed if not unicodedata.combining(c)])
+    return (base.lower(), decomposed.lower(), text)
+
+class Collator(object):
+    """
+    Gives sort keys that order words the way a language's dictionaries do.
+
+    PyICU's collator for the language is used if it is installed, otherwise
+    see L{fallback_key}.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, lang=None):
+        """Constructor.
+            @type  lang: str
+            @param lang: ISO 639 language code. (Default: None - root locale)
+            """
+        self.lang = lang
+        self._collator = None
+
+        if icu is not None:
+            try:
+                self._collator = icu.Collator.createInstance(icu.Locale(lang or ''))
+            except icu.ICUError, _e:
+                pass
+
+    # METHODS #
+    def key(self, text):
+        """Get the sort key of the given word."""
+        if self._collator is not None:
+            return self._collator.getSortKey(unicode(text))
+        return fallback_key(text)
+
+    # SPECIAL METHODS #
+    def __call__(self, text):
+        return self.key(text)
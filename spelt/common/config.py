@@ -50,7 +50,8 @@ class Configuration(object):
     }
     general = {
         'last_langdb_path': '',
-        'uilang': None
+        'uilang': None,
+        'wordlist_order': 'id'
     }
 
     def __init__(self, filename=default_config):
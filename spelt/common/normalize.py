@@ -0,0 +1,109 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains Unicode normalization helpers used for imported and looked up words."""
+
+import unicodedata
+
+NORMAL_FORMS = ('NFC', 'NFD', 'NFKC', 'NFKD')
+
+def normalize(text, normal_form='NFC'):
+    """Normalize the given Unicode string to the given normal form.
+
+        Based on normalize() from the Translate Toolkit's translate.lang.data.
+        Byte strings are returned unchanged."""
+    if not isinstance(text, unicode):
+        return text
+    return unicodedata.normalize(normal_form, text)
+
+class Normalizer(object):
+    """
+    Normalizes words to a Unicode normal form and then applies an optional
+    folding table.
+
+    A folding table maps single characters to their replacement strings, eg.
+    C{{u'’': u"'"}} to fold right single quotation marks into
+    apostrophes. Folding is applied after normalization and the result is
+    normalized again.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, normal_form='NFC', folding=None):
+        """Constructor.
+            @type  normal_form: str
+            @param normal_form: One of NORMAL_FORMS. (Default: "NFC")
+            @type  folding:     dict
+            @param folding:     A folding table. (Default: None)
+            """
+        assert normal_form in NORMAL_FORMS
+
+        self.normal_form = normal_form
+        self.folding     = {}
+        self._table      = {}
+
+        if folding:
+            self.add_folding(folding)
+
+    # METHODS #
+    def add_folding(self, folding):
+        """Add the entries from the given folding table to this normalizer's.
+
+            @type  folding: dict
+            @param folding: Maps single characters to their replacements."""
+        for char, repl in folding.items():
+            char = normalize(unicode(char), self.normal_form)
+            if len(char) != 1:
+                raise ValueError('Only single characters can be folded: %r' % (char))
+            repl = normalize(unicode(repl), self.normal_form)
+
+            self.folding[char]     = repl
+            self._table[ord(char)] = repl
+
+    def normalize(self, text):
+        """Normalize a single word."""
+        return self.normalize_many([text])[0]
+
+    def normalize_many(self, texts):
+        """Normalize a list of words in one batch.
+
+            @rtype:  list
+            @return: The normalized words, in the same order."""
+        form  = self.normal_form
+        norm  = unicodedata.normalize
+        texts = [norm(form, unicode(t)) for t in texts]
+
+        table = self._table
+        if not table:
+            return texts
+
+        result = []
+        for t in texts:
+            folded = t.translate(table)
+            if folded != t:
+                folded = norm(form, folded)
+            result.append(folded)
+        return result
+
+    # SPECIAL METHODS #
+    def __call__(self, text):
+        return self.normalize(text)
+
+    def __str__(self):
+        return '%s(%s, %d folded)' % (self.__class__.__name__, self.normal_form, len(self.folding))
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from spelt.common import collation
+from spelt.common.collation import Collator, fallback_key
+
+class TestCollator(object):
+    """Unit test for the Collator class."""
+
+    def test_fallback_key(self):
+        words = [u'Été', u'eta', u'ete', u'zoo', u'été', u'Eta']
+        assert sorted(words, key=fallback_key) == [u'Eta', u'eta', u'ete', u'Été', u'été', u'zoo']
+
+    def test_collator(self):
+        coll = Collator('af')
+        words = [u'zoo', u'Appel', u'appel', u'ênkel']
+        ordered = sorted(words, key=coll)
+        assert ordered[-1] == u'zoo' and ordered.index(u'ênkel') > ordered.index(u'appel')
+        if collation.icu is None:
+            assert coll.key(u'appel') == fallback_key(u'appel')
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from spelt.common.normalize import Normalizer, normalize
+
+class TestNormalizer(object):
+    """Unit test for the Normalizer class."""
+
+    nfc = u'koe\u00ef'  # Precomposed
+    nfd = u'koei\u0308' # With a combining diaeresis
+
+    def test_normalize(self):
+        assert normalize(self.nfd) == self.nfc
+        assert normalize(self.nfc, 'NFD') == self.nfd
+        assert normalize('bytes') == 'bytes'
+
+    def test_normalize_many(self):
+        norm = Normalizer()
+        assert norm.normalize_many([self.nfd, self.nfc, 'boom']) == [self.nfc, self.nfc, u'boom']
+        assert norm(self.nfd) == self.nfc
+
+    def test_folding(self):
+        norm = Normalizer(folding={u'’': u"'", u'ŉ': u"'n"})
+        assert norm(u'ma’s') == u"ma's"
+        assert norm(u'ŉ boom') == u"'n boom"
+        # Folding is applied after normalization, and the result is normalized again
+        norm.add_folding({u'i\u0308': u'i'})
+        assert norm(self.nfd) == u'koei'
+
+    def test_folding_single_chars(self):
+        try:
+            Normalizer(folding={u'ab': u'c'})
+        except ValueError:
+            return
+        assert False, 'Multi-character folding key accepted'
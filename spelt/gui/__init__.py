@@ -24,6 +24,7 @@ from dlg_source import DlgSource
 from gui        import GUI
 from edit_area  import EditArea
 from wordlist   import WordList
+from wordlistmodel import WordListModel
 
 __all__ = [
     'ComboModel',
@@ -32,5 +33,6 @@ __all__ = [
     'EditArea',
     'GUI',
     'Menu',
-    'WordList'
+    'WordList',
+    'WordListModel'
 ]
@@ -176,16 +176,16 @@ class DlgDBLoad(object):
         self.dlg_dbload.response(self.gui.RESPONSE_OK)
 
     def __on_open_clicked(self, btn):
-        self.langdb_path = self.gui.get_open_filename()
-
-        if self.langdb_path:
-            try:
-                self.langdb = LanguageDB(filename=self.langdb_path)
-            except Exception, exc:
-                self.gui.show_error(_('Error opening language database:\n\n') + str(exc))
-                self.langdb_path = ''
-                return
-        else:
+        filename = self.gui.get_open_filename()
+        if not filename:
+            return
+
+        try:
+            # Setting the path loads the database
+            self.langdb_path = filename
+        except Exception, exc:
+            self.gui.show_error(_('Error opening language database:\n\n') + str(exc))
+            self.langdb_path = ''
             return
 
         # We won't get here unless the language database was successfully opened.
@@ -18,11 +18,13 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-import datetime
 import gobject, gtk, gtk.glade
+from bisect import bisect_left
 
 from spelt.common         import Configuration, exceptions, _
 from spelt.models         import LanguageDB, PartOfSpeech, Root, SurfaceForm
+from spelt.models.ordered_index import OrderedIndex
+from spelt.models.xml_model import timestamp
 from spelt.gui.combomodel import ComboModel
 from spelt.gui.wordlist   import WordList
 
@@ -33,7 +35,10 @@ class EditArea(object):
     """
 
     COL_TEXT, COL_MODEL = range(2)
-    COMPLETION_POPUP_DELAY = 500
+    COMPLETION_POPUP_DELAY = 50
+    """Milliseconds to wait for more typing before completing a root. Finding
+    the completions is a binary search (see _complete_root()), so this only
+    saves work for fast typists."""
     EMPTY_COMBOMODEL = ComboModel([ ('', None) ])
     MAX_COMPLETION_LENGTH = 5
 
@@ -70,11 +75,13 @@ class EditArea(object):
             self.cmb_pos.grab_focus()
             return
 
-        shortcut, name = ('|' in text) and ( [substr.strip() for substr in text.split('|')] ) or ('_', text)
-        # Search for POS on value and shortcut
+        if isinstance(text, str):
+            text = unicode(text, 'utf-8')
+        shortcut, name = ('|' in text) and ( [substr.strip() for substr in text.split('|')] ) or (None, text)
+        # Look the POS up by name and shortcut (see LanguageDB.pos_by_name)
         pos = \
-            self.langdb.find(section='parts_of_speech', name=name, shortcut=shortcut) + \
-            self.langdb.find(section='parts_of_speech', name=text, shortcut=text)
+            self.langdb.find_parts_of_speech(name=name, shortcut=shortcut) + \
+            self.langdb.find_parts_of_speech(name=text, shortcut=text)
 
         if pos:
             # NOTE: If more than one part of speech matches, we use the first one
@@ -125,7 +132,7 @@ class EditArea(object):
             self.current_root = Root(
                 value   = unicode(text),
                 user_id = self.config.user['id'],
-                date    = datetime.datetime.now()
+                date    = timestamp()
             )
             self._new_root = True
             self.select_pos(None)  # Deselect POS
@@ -216,12 +223,12 @@ class EditArea(object):
         if not self.langdb or not isinstance(self.langdb, LanguageDB):
             return
 
-        self.pos_store = ComboModel([ (self.pos_tostring(m), m) for m in self.langdb.parts_of_speech ])
+        self.__set_pos_store([ (self.pos_tostring(m), m) for m in self.langdb.parts_of_speech ])
         self.cmb_pos.set_model(self.pos_store)
         self.cmb_pos.child.get_completion().set_model(self.pos_store)
 
-        self.root_store = ComboModel([ (m.value, m) for m in self.langdb.roots ])
-        self.ent_root.get_completion().set_model(self.root_store)
+        self.root_index = self.__create_root_index(self.langdb.roots)
+        self.ent_root.get_completion().set_model(self.EMPTY_COMBOMODEL)
 
     def select_root(self, root):
         """Set the root selected in the C{ent_root} combo box to that of the parameter.
@@ -243,12 +250,9 @@ class EditArea(object):
         self.ent_root.set_text(root.value)
         self.set_sensitive(cmb_pos=True)
 
-        pos_found = self.langdb.find(id=root.pos_id, section='parts_of_speech')
-        # The pos_found list can have a maximum of 1 element, because we
-        # search the database on ID's. ID's are guaranteed to be unique by the
-        # models (via it's inheritence of IDManager).
-        if pos_found:
-            self.select_pos(pos_found[0])
+        pos_found = self.langdb.parts_of_speech_ids.get(root.pos_id)
+        if pos_found is not None:
+            self.select_pos(pos_found)
             self.btn_ok.grab_focus()
         else:
             self.cmb_pos.grab_focus()
@@ -271,17 +275,12 @@ class EditArea(object):
             return
 
         assert isinstance(pos, PartOfSpeech)
-        iter = self.pos_store.get_iter_first()
+        iter = self.pos_iters.get(pos)
+        if iter is not None:
+            self.cmb_pos.set_active_iter(iter)
+            self.current_pos = pos
 
-        while self.pos_store.iter_is_valid(iter):
-            if self.pos_store.get_value(iter, self.COL_MODEL) == pos:
-                self.cmb_pos.set_active_iter(iter)
-                self.current_pos = pos
-
-                self.set_sensitive(btn_ok=True)
-                break
-
-            iter = self.pos_store.iter_next(iter)
+            self.set_sensitive(btn_ok=True)
 
     def set_sensitive(self, **kwargs):
         """Set widgets' sensitivity based on keyword arguments.
@@ -326,7 +325,7 @@ class EditArea(object):
 
         # Initialize combo's
         pos_cell = gtk.CellRendererText()
-        self.pos_store = self.EMPTY_COMBOMODEL
+        self.__set_pos_store([])
         self.cmb_pos.set_model(self.pos_store)
         self.cmb_pos.set_text_column(self.COL_TEXT)
         self.cmb_pos.clear()
@@ -345,14 +344,14 @@ class EditArea(object):
         self.pos_completion.props.text_column = self.COL_TEXT
         self.cmb_pos.child.set_completion(self.pos_completion)
 
-        self.root_store = self.EMPTY_COMBOMODEL
+        self.root_index = self.__create_root_index()
         root_cell = gtk.CellRendererText()
         self.root_completion = gtk.EntryCompletion()
         self.root_completion.clear()
         self.root_completion.pack_start(root_cell)
         self.root_completion.set_cell_data_func(root_cell, self.__render_root)
         self.root_completion.set_match_func(lambda *args: True) # Always match, because the model will already be filtered.
-        self.root_completion.set_model(self.root_store)
+        self.root_completion.set_model(self.EMPTY_COMBOMODEL)
         self.root_completion.props.text_column = self.COL_TEXT
         self.ent_root.set_completion(self.root_completion)
 
@@ -386,29 +385,44 @@ class EditArea(object):
         self.pos_completion.connect('match-selected', self.__on_match_selected, self.select_pos)
         self.root_completion.connect('match-selected', self.__on_match_selected, self.select_root)
 
+    def __create_root_index(self, roots=()):
+        """Index the given roots by their lower case values, so that the roots
+            starting with some text are next to each other."""
+        return OrderedIndex(lambda root: (root.value.lower(), root.id), roots)
+
     def __match_pos(self, completion, key, iter):
         model = self.pos_store.get_value(iter, self.COL_MODEL)
         if model is None:
             return False
-        return model.shortcut.lower().startswith(key) or model.name.lower().startswith(key)
+        shortcut, name = self.pos_match_keys[model]
+        return shortcut.startswith(key) or name.startswith(key)
+
+    def __set_pos_store(self, rows):
+        """Show the given (text, part of speech) rows in cmb_pos and map each
+            part of speech to its row and its lower case shortcut and name."""
+        if rows:
+            self.pos_store = ComboModel(rows)
+        else:
+            self.pos_store = self.EMPTY_COMBOMODEL
+        models = [row[1] for row in rows]
+        self.pos_iters = dict([(m, self.pos_store.get_iter((i,))) for i, m in enumerate(models)])
+        self.pos_match_keys = dict([(m, ((m.shortcut or u'').lower(), (m.name or u'').lower())) for m in models])
 
     # GUI SIGNAL HANDLERS #
     def _complete_root(self):
-        self.compl_count = 0
+        """Show the first (at most MAX_COMPLETION_LENGTH) roots starting with
+            the text in C{ent_root}. They are found with a binary search in
+            self.root_index, so no roots are scanned."""
+        self.root_comp_timeout = 0
 
-        def check(model, iter, text):
-            if model[iter][self.COL_TEXT].lower().startswith(text) and self.compl_count < self.MAX_COMPLETION_LENGTH:
-                self.compl_count += 1
-                return True
-            return False
+        text  = unicode(self.ent_root.get_text(), 'utf-8').lower()
+        start = bisect_left(self.root_index.keys, (text,))
+        roots = self.root_index.models[start:start + self.MAX_COMPLETION_LENGTH]
+        rows  = [(root.value, root) for root in roots if root.value.lower().startswith(text)]
 
-        filter = self.root_store.filter_new()
-        filter.set_visible_func(check, self.ent_root.get_text().lower())
-        self.ent_root.get_completion().set_model(filter)
+        self.ent_root.get_completion().set_model(ComboModel(rows))
         self.ent_root.get_completion().insert_prefix()
 
-        self.root_comp_timeout = 0
-
         return False
 
     def __clear_status(self):
@@ -422,7 +436,7 @@ class EditArea(object):
             self.current_root = Root(
                 value   = unicode(self.current_root.value),
                 user_id = self.config.user['id'],
-                date    = datetime.datetime.now()
+                date    = timestamp()
             )
         self.current_root.pos_id = self.current_pos.id
         self.langdb.add_root(self.current_root)
@@ -431,7 +445,7 @@ class EditArea(object):
         if self.cmb_pos.get_active() < 0:
             self.langdb.add_part_of_speech(self.current_pos)
 
-        self.root_store = ComboModel(self.root_store._rows + [(self.current_root.value, self.current_root)])
+        self.root_index.insert(self.current_root)
 
         # Update GUI
         self.set_sensitive(btn_ok=True, btn_add_root=False, btn_mod_root=False)
@@ -444,7 +458,7 @@ class EditArea(object):
         if not self.current_sf:
             return
 
-        self.current_sf.status = 'ignored'
+        self.langdb.update_surface_form(self.current_sf, status='ignored')
         self.wordlist.next()
         self.gui.changes_made = True
 
@@ -453,7 +467,7 @@ class EditArea(object):
         if self.cmb_pos.get_active() < 0:
             self.langdb.add_part_of_speech(self.current_pos)
 
-        self.current_root.date    = datetime.datetime.now()
+        self.current_root.date    = timestamp()
         self.current_root.pos_id  = self.current_pos.id
         self.current_root.user_id = self.config.user['id']
 
@@ -469,12 +483,20 @@ class EditArea(object):
         root = None
         pos  = None
 
+        user_id = None
         if self.current_sf.root_id != self.current_root.id:
-            self.current_sf.root_id = self.current_root.id
-            self.current_sf.user_id = self.config.user['id']
+            user_id = self.config.user['id']
 
-        self.current_sf.status  = 'classified'
-        self.current_sf.date    = datetime.datetime.now()
+        try:
+            # Keeps the language database's surface form indexes and status
+            # counters up to date
+            self.langdb.update_surface_form(
+                self.current_sf, root_id=self.current_root.id, status='classified', user_id=user_id
+            )
+        except exceptions.DuplicateModelError:
+            self.set_status(_('"%s" is already classified with this root.') % (self.current_sf.value))
+            return
+        self.current_sf.date = timestamp()
 
         self.wordlist.next() # This will select the next word at the top of the word list
         self.gui.changes_made = True
@@ -484,7 +506,7 @@ class EditArea(object):
         if not self.current_sf:
             return
 
-        self.current_sf.status = 'rejected'
+        self.langdb.update_surface_form(self.current_sf, status='rejected')
         self.wordlist.next()
         self.gui.changes_made = True
 
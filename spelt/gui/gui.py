@@ -63,6 +63,8 @@ class GUI(object):
         self.main_window = self.glade.get_widget('wnd_main')
         self.main_window.connect('destroy', lambda *w: gtk.main_quit())
         self.main_window.set_icon_from_file(self.icon_filename)
+        self.statusbar = self.glade.get_widget('sbr_main')
+        self.statusbar_context = self.statusbar.get_context_id('progress')
 
         self.__create_dialogs()
 
@@ -210,7 +212,11 @@ class GUI(object):
         if self.dlg_dbload.run() != self.RESPONSE_OK:
             return False
 
+        old_db = self.config.current_database
         self.config.current_database = db = self.dlg_dbload.langdb
+        if old_db is not None and old_db is not db:
+            # Release the old database's models right away
+            old_db.close()
 
         user = db.find(section='users', name=self.dlg_dbload.user_name)[0]
         self.config.user['id']                  = user.id
@@ -250,6 +256,7 @@ class GUI(object):
         self.edit_area = EditArea(self.glade, self.word_list, langdb=db, gui=self)
 
         self.word_list.word_selected_handlers.append(self.check_work_done)
+        self.word_list.word_selected_handlers.append(self.update_statusbar)
 
         # Check if this is the first time the program is run
         if self.config.user['id'] == 0:
@@ -294,3 +301,30 @@ class GUI(object):
         db = self.config.current_database
         self.edit_area.refresh(langdb=db)
         self.word_list.refresh(langdb=db)
+        self.update_statusbar()
+
+    def update_statusbar(self, sf=None):
+        """Show the classification progress in the status bar: of the whole
+            database and of the source of the given surface form.
+
+            The numbers come from the database's status counters (see
+            L{LanguageDB.stats}), so this is cheap enough to call for every
+            selected word."""
+        db = self.config.current_database
+        if db is None:
+            return
+
+        stats = db.stats()
+        msg = _('%(todo)d of %(total)d words left') % {'todo': stats['todo'], 'total': sum(stats.values())}
+
+        src = sf is not None and db.sources_ids.get(sf.source_id) or None
+        if src is not None:
+            stats = db.stats(source_id=src.id)
+            msg += ' | ' + _('%(source)s: %(done)d of %(total)d done') % {
+                'source': src.name,
+                'done':   sum(stats.values()) - stats['todo'],
+                'total':  sum(stats.values())
+            }
+
+        self.statusbar.pop(self.statusbar_context)
+        self.statusbar.push(self.statusbar_context, msg)
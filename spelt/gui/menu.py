@@ -23,9 +23,10 @@
 import gtk, gtk.glade
 import os
 
-from spelt.common  import Configuration, _
-from spelt.models  import Source, SurfaceForm
-from spelt.support import openmailto
+from spelt.common    import Configuration, _
+from spelt.importers import import_classified, import_hunspell
+from spelt.models    import Source, SurfaceForm
+from spelt.support   import openmailto
 
 RESPONSE_OK, RESPONSE_CANCEL = range(2)
 
@@ -119,7 +120,8 @@ class Menu(object):
             return
 
         # Get and save new user information
-        self.gui.load_langdb(filename)
+        if not self.gui.load_langdb(filename):
+            return
 
         # Ask the main GUI object to reload the database everywhere...
         self.gui.reload_database()
@@ -170,10 +172,11 @@ class Menu(object):
         openmailto.mailto('', subject=subj, attach=db.filename)
 
     def handler_import(self):
-        """Import words from a text file."""
+        """Import words from a text file, translation file, Hunspell dictionary
+            or a pre-classified "form<TAB>root<TAB>pos" (.tsv) file."""
         db = self.config.current_database
         user_id = self.config.user['id']
-        filename = self.gui.get_open_filename(_('Open word list...'))
+        filename = self.gui.get_open_filename(_('Open word list, corpus or translation file...'))
 
         if filename is None:
             return
@@ -182,7 +185,21 @@ class Menu(object):
         if src is None:
             return
 
-        db.import_source(src, filename=filename)
+        if filename.endswith('.dic'):
+            expand = self.gui.prompt(
+                _('Add the affixed forms of the dictionary words as classified surface forms?')
+            )
+            import_hunspell(db, src, filename, expand=expand)
+        elif filename.endswith('.tsv'):
+            import_classified(db, src, filename)
+        else:
+            sizes = dict([(s.id, s.size) for s in db.sources])
+            imported = db.import_source(src, filename=filename)
+            if imported is not src:
+                if sizes.get(imported.id) == imported.size:
+                    self.gui.show_info(_('This file was already imported as "%s". No words were imported.') % (imported.name))
+                    return
+                self.gui.show_info(_('Only the lines added to "%s" since it was imported were read.') % (imported.name))
         self.gui.reload_database()
 
     def handler_about(self):
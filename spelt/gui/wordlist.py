@@ -18,10 +18,15 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
+import re
 import gobject, gtk, gtk.glade
 
 from spelt.common import Configuration, _
 from spelt.models import LanguageDB, SurfaceForm
+from spelt.models.ordered_index import OrderedIndex
+
+from spelt.gui.combomodel    import ComboModel
+from spelt.gui.wordlistmodel import WordListModel
 
 class WordList(object):
     """
@@ -29,6 +34,20 @@ class WordList(object):
     window.
     """
 
+    ORDERS = LanguageDB.TODO_ORDERS
+    """The orders in which the word list can be displayed."""
+    ORDER_NAMES = {
+        'id':           _('Import order'),
+        'frequency':    _('Most frequent first'),
+        'alphabetical': _('Alphabetical'),
+        'source':       _('By source'),
+        'length':       _('Shortest first'),
+        'prefix':       _('Grouped by prefix')
+    }
+    FILTER_DELAY = 250
+    """Milliseconds to wait after typing in a filter entry before the list is
+    filtered."""
+
     # MEMBERS #
     word_selected_handlers = []
     """A list of callable objects that will be called in order when a surface
@@ -43,92 +62,244 @@ class WordList(object):
             """
         assert isinstance(glade_xml, gtk.glade.XML)
 
+        self.config                 = Configuration()
+        self.current                = None
+        """The selected surface form, or None once it left the list."""
+        self.cursor                 = None
+        """The position of the selected word in self.index (or of the word
+        after it, if it left the list). None if nothing is selected."""
+        self.filter_timeout         = None
+        self.filters                = {}
+        """The keyword arguments to LanguageDB.todo_index() for the shown
+        index, other than the order."""
         self.glade_xml              = glade_xml
         self.gui                    = gui
+        self.index                  = None
         self.langdb                 = langdb
-        self.selected_iter          = None
+        self.order                  = self.config.general['wordlist_order']
+        if self.order not in self.ORDERS:
+            self.order = 'id'
         self.word_selected_handlers = []
 
         self.__init_widgets()
 
     # METHODS #
     def next(self):
-        iter = self.store.get_iter_first()
-        if self.selected_iter is None:
-            return
-        self.store.remove(self.selected_iter)
+        """Select the word after the selected one.
 
-        self.selected_iter = self.store.get_iter_first()
-        if self.selected_iter is None:
+            The list is a work queue over the database's to-do index: when the
+            selected word's status changes (see
+            LanguageDB.update_surface_form()) it leaves the index and the
+            cursor is left on the word that followed it, so no searching or
+            store changes are needed. The word selected handlers are called
+            once, with None if no words are left."""
+        if self.cursor is None:
             return
-        self.treeview.get_selection().select_iter(self.selected_iter)
-        self.treeview.row_activated(self.store.get_path(self.selected_iter), self.treeview.get_column(0))
 
-    def refresh(self, langdb=None):
-        """Reload data from self.langdb database."""
+        position = self.cursor
+        if self.current is not None:
+            # The selected word is still in the list (eg. not classified)
+            position += 1
+        self.__select(position)
+
+    def refresh(self, langdb=None, order=None):
+        """Reload data from self.langdb database.
+
+            @type  order: str
+            @param order: One of ORDERS (see LanguageDB.order_key()).
+                (Default: the last used order)"""
         if langdb is not None and isinstance(langdb, LanguageDB):
             self.langdb = langdb
 
+        if order is not None:
+            assert order in self.ORDERS
+            self.order = self.config.general['wordlist_order'] = order
+
         if not self.langdb or not isinstance(self.langdb, LanguageDB):
             return
 
-        self.store.clear()
-        # TODO: Replace next line with one supporting filters.
-        # Currently only surface forms with status == 'todo' are filtered.
-        sforms = [model for model in self.langdb.surface_forms if model.status == 'todo']
-        sforms.sort(cmp=lambda x, y: x.id - y.id)
-
-        for sf in sforms:
-            self.store.append([sf])
-
-        # Now that the TreeView's model is filled, select the first row...
-        iter = self.store.get_iter_first()
-        if iter is None:
-            for f in self.word_selected_handlers:
-                if callable(f):
-                    f(None)
-        else:
-            self.treeview.get_selection().select_iter(iter)
-            self.treeview.row_activated(self.store.get_path(iter), self.treeview.get_column(0))
-            self.selected_iter = iter
+        self.__fill_filter_combos()
+        self.__apply_filters(self.filters)
+
+    def __apply_filters(self, filters):
+        """Show the surface forms with status "todo" that match the given
+            filters (see LanguageDB.todo_index()) and select the first one."""
+        old_index = self.index
+        try:
+            index = self.langdb.todo_index(self.order, **filters)
+        except re.error:
+            # Keep the current list until the expression is complete
+            return
+        self.filters = filters
+        self.__set_index(index)
+        if old_index is not index:
+            self.langdb.release_todo_index(old_index)
+
+        # Now that the TreeView's model is set, select the first row...
+        self.__select(0)
+
+    def __fill_filter_combos(self):
+        """Fill the source and user filter combos from self.langdb, keeping the
+            selected source and user if they still exist."""
+        self.filling_combos = True
+        for combo, models, name, label in (
+                (self.cmb_filter_source, self.langdb.sources, 'source_id', _('All sources')),
+                (self.cmb_filter_user,   self.langdb.users,   'user_id',   _('All users'))):
+            rows = [(label, None)] + sorted([(m.name, m.id) for m in models])
+            ids  = [row[1] for row in rows]
+            combo.set_model(ComboModel(rows))
+            if self.filters.get(name) is not None and self.filters[name] in ids:
+                combo.set_active(ids.index(self.filters[name]))
+            else:
+                self.filters.pop(name, None)
+                combo.set_active(0)
+        self.filling_combos = False
 
     def __init_widgets(self):
         """Get and initialize widgets from the Glade object."""
-        # TODO: Add support for filters
-        self.store = gtk.ListStore(gobject.TYPE_PYOBJECT)
-
         self.treeview = self.glade_xml.get_widget('tvw_words')
-        self.treeview.set_model(self.store)
+        self.store    = None
+        self.__set_index(OrderedIndex(lambda sf: sf.id))
 
         # Add columns
         cell = gtk.CellRendererText()
         col  = gtk.TreeViewColumn(_('Surface Form'))
         col.pack_start(cell)
-        col.set_cell_data_func(cell, self.__render_word)
+        col.add_attribute(cell, 'text', 0)
         self.treeview.append_column(col)
 
+        self.cmb_order = self.glade_xml.get_widget('cmb_order')
+        self.cmb_order.set_model(gtk.ListStore(str))
+        cell = gtk.CellRendererText()
+        self.cmb_order.pack_start(cell)
+        self.cmb_order.add_attribute(cell, 'text', 0)
+        for order in self.ORDERS:
+            self.cmb_order.append_text(self.ORDER_NAMES[order])
+        self.cmb_order.set_active(list(self.ORDERS).index(self.order))
+
+        self.filling_combos    = False
+        self.cmb_filter_source = self.glade_xml.get_widget('cmb_filter_source')
+        self.cmb_filter_user   = self.glade_xml.get_widget('cmb_filter_user')
+        self.ent_filter_prefix = self.glade_xml.get_widget('ent_filter_prefix')
+        self.ent_filter_regex  = self.glade_xml.get_widget('ent_filter_regex')
+        for combo in (self.cmb_filter_source, self.cmb_filter_user):
+            cell = gtk.CellRendererText()
+            combo.pack_start(cell)
+            combo.add_attribute(cell, 'text', 0)
+
         # Connect signals
-        self.treeview.connect('row-activated', self.__on_row_activated, self.store)
+        self.treeview.connect('row-activated', self.__on_row_activated)
+        self.cmb_order.connect('changed', self.__on_cmb_order_changed)
+        self.cmb_filter_source.connect('changed', self.__on_filter_changed)
+        self.cmb_filter_user.connect('changed', self.__on_filter_changed)
+        self.ent_filter_prefix.connect('changed', self.__on_filter_changed)
+        self.ent_filter_regex.connect('changed', self.__on_filter_changed)
 
         # Load data if available
         self.refresh()
 
+    def __set_index(self, index):
+        """Show the given index of surface forms (see LanguageDB.todo_index())
+            in a new WordListModel."""
+        if self.index is not None and self.__on_index_changed in self.index.change_handlers:
+            self.index.change_handlers.remove(self.__on_index_changed)
+        if self.store is not None:
+            self.store.detach()
 
-    # SIGNAL HANDLERS #
-    def __on_row_activated(self, treeview, path, col, store):
-        self.selected_iter = store.get_iter(path)
-        model = store.get_value(self.selected_iter, 0)
+        self.index = index
+        self.index.change_handlers.append(self.__on_index_changed)
+        self.store = WordListModel(index)
+        self.treeview.set_model(self.store)
+        self.cursor = self.current = None
 
+    def __notify(self, sf):
         for f in self.word_selected_handlers:
             if callable(f):
-                f(model)
-
-    def __render_word(self, col, cell, store, iter):
-        """Cell data function that renders the surface form from it's model in
-            the gtk.ListStore.
-            
-            See gtk.TreeViewColumn.set_cell_data_func()'s documentation for
-            description of parameters. For the sake of practicality, not that
-            "store.get_value(iter, 0)" returns the object from the selected
-            (double clicked) line (a models.SurfaceForm model in this case)."""
-        cell.set_property('text', store.get_value(iter, 0).value)
+                f(sf)
+
+    def __select(self, position):
+        """Select the word at the given position (or the first word, if the
+            position is past the end of the list) and notify the handlers."""
+        if len(self.index) == 0:
+            self.cursor = self.current = None
+            self.__notify(None)
+            return
+
+        if position >= len(self.index):
+            position = 0
+        self.cursor  = position
+        self.current = self.index[position]
+        self.treeview.get_selection().select_path((position,))
+        self.treeview.scroll_to_cell((position,))
+        self.__notify(self.current)
+
+    # SIGNAL HANDLERS #
+    def __on_index_changed(self, position, model, inserted):
+        if position is None:
+            # The whole index changed (eg. a source was imported), which is
+            # quicker to show in a new model than row by row
+            current = self.current
+            self.__set_index(self.index)
+            position = -1
+            if current is not None:
+                position = self.index.index(current)
+            if position < 0:
+                self.__select(0)
+                return
+            # The selected word is still there: only move the cursor to it
+            self.cursor  = position
+            self.current = current
+            self.treeview.get_selection().select_path((position,))
+            self.treeview.scroll_to_cell((position,))
+            return
+        if self.cursor is None:
+            return
+
+        # Keep the cursor on the same word
+        if inserted:
+            if position < self.cursor or (position == self.cursor and self.current is not None):
+                self.cursor += 1
+        elif position < self.cursor:
+            self.cursor -= 1
+        elif model is self.current:
+            self.current = None
+
+    def __on_cmb_order_changed(self, combo):
+        order = self.ORDERS[combo.get_active()]
+        if order != self.order:
+            # Every order's index is kept, so switching back is immediate
+            self.refresh(order=order)
+
+    def __on_filter_changed(self, widget):
+        if self.filling_combos or self.langdb is None:
+            return
+        if self.filter_timeout is not None:
+            gobject.source_remove(self.filter_timeout)
+            self.filter_timeout = None
+
+        if isinstance(widget, gtk.ComboBox):
+            self.__on_filter_timeout()
+        else:
+            # Wait for the user to stop typing
+            self.filter_timeout = gobject.timeout_add(self.FILTER_DELAY, self.__on_filter_timeout)
+
+    def __on_filter_timeout(self):
+        self.filter_timeout = None
+        filters = {}
+        for name, combo in (('source_id', self.cmb_filter_source), ('user_id', self.cmb_filter_user)):
+            it = combo.get_active_iter()
+            if it is not None and combo.get_model().get_value(it, 1) is not None:
+                filters[name] = combo.get_model().get_value(it, 1)
+        for name, entry in (('prefix', self.ent_filter_prefix), ('regex', self.ent_filter_regex)):
+            text = unicode(entry.get_text(), 'utf-8')
+            if text:
+                filters[name] = text
+
+        if filters != self.filters:
+            self.__apply_filters(filters)
+        return False # Don't repeat
+
+    def __on_row_activated(self, treeview, path, col):
+        self.cursor  = path[0]
+        self.current = self.index[self.cursor]
+        self.__notify(self.current)
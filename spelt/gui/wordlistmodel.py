@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+__all__ = ['WordListModel']
+
+import gobject
+import gtk
+
+class WordListModel(gtk.GenericTreeModel):
+    """
+    A list model of the surface forms in an OrderedIndex (see
+    LanguageDB.todo_index()). Column 0 is the surface form's value and column
+    1 the model itself.
+
+    Nothing is copied: rows are looked up in the index only when the view
+    asks for them, and insertions and removals in the index are passed on to
+    the view as they happen.
+    """
+
+    def __init__(self, index):
+        gtk.GenericTreeModel.__init__(self)
+        self._index = index
+        index.change_handlers.append(self.__on_index_changed)
+
+    def detach(self):
+        """Stop following changes to the index. Call this when the model is
+            not used anymore."""
+        if self.__on_index_changed in self._index.change_handlers:
+            self._index.change_handlers.remove(self.__on_index_changed)
+
+    def on_get_flags(self):
+        return gtk.TREE_MODEL_LIST_ONLY
+
+    def on_get_n_columns(self):
+        return 2
+
+    def on_get_column_type(self, index):
+        if index == 0:
+            return gobject.TYPE_STRING
+        elif index == 1:
+            return gobject.TYPE_PYOBJECT
+        return None
+
+    def on_get_iter(self, path):
+        if path[0] < len(self._index):
+            return path[0]
+        return None
+
+    def on_get_path(self, rowref):
+        return (rowref,)
+
+    def on_get_value(self, rowref, column):
+        if column == 0:
+            return self._index.values[rowref]
+        elif column == 1:
+            return self._index.models[rowref]
+        return None
+
+    def on_iter_next(self, rowref):
+        if rowref < len(self._index) - 1:
+            return rowref + 1
+        else:
+            return None
+
+    def on_iter_children(self, parent):
+        if parent == None and len(self._index) > 0:
+            return 0
+        else:
+            return None
+
+    def on_iter_has_child(self, rowref):
+        return False
+
+    def on_iter_n_children(self, rowref):
+        if rowref == None:
+            return len(self._index)
+        else:
+            return 0
+
+    def on_iter_nth_child(self, parent, n):
+        if parent == None and n < len(self._index):
+            return n
+        else:
+            return None
+
+    def on_iter_parent(self, child):
+        return None
+
+    def __on_index_changed(self, position, model, inserted):
+        if position is None:
+            # Reset: the word list sets a new model (see WordList.refresh())
+            return
+        path = (position,)
+        if inserted:
+            self.row_inserted(path, self.get_iter(path))
+        else:
+            self.row_deleted(path)
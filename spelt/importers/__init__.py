@@ -0,0 +1,40 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from corpus   import Tokenizer, read_corpus_counts
+from external import PAIR_READERS, external_counts
+from formats  import READERS, guess_format
+from hunspell import AffixFile, import_hunspell
+from tsv      import import_classified
+from wordlist import read_word_batches, read_word_counts
+
+__all__ = [
+    'AffixFile',
+    'PAIR_READERS',
+    'READERS',
+    'Tokenizer',
+    'external_counts',
+    'guess_format',
+    'import_classified',
+    'import_hunspell',
+    'read_corpus_counts',
+    'read_word_batches',
+    'read_word_counts'
+]
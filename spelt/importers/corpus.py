@@ -0,0 +1,170 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains a streaming tokenizer for importing words from running text."""
+
+import codecs
+import gzip
+import re
+
+from spelt.importers.wordlist import CHUNK_SIZE, SAMPLE_SIZE, detect_encoding
+
+GZIP_MAGIC = '\x1f\x8b'
+
+class Tokenizer(object):
+    """
+    Splits running text into words.
+
+    By default a word is a run of letters, optionally joined by hyphens or
+    apostrophes (eg. "mid-week", "don't"). Digits, underscores and all other
+    characters separate words.
+    """
+
+    DEFAULT_PATTERN = ur"[^\W\d_]+(?:[-'’][^\W\d_]+)*"
+
+    # CONSTRUCTOR #
+    def __init__(self, pattern=None, lowercase=False, min_length=1, max_length=None):
+        """Constructor.
+            @type  pattern:    basestring
+            @param pattern:    A regular expression matching a single word.
+                It is compiled with re.UNICODE. (Default: DEFAULT_PATTERN)
+            @type  lowercase:  bool
+            @param lowercase:  Whether words should be converted to lower case.
+            @type  min_length: int
+            @param min_length: Shorter words are dropped.
+            @type  max_length: int
+            @param max_length: Longer words are dropped. (Default: None - no limit)
+            """
+        self.pattern    = pattern or self.DEFAULT_PATTERN
+        self.lowercase  = lowercase
+        self.min_length = min_length
+        self.max_length = max_length
+        self.regex      = re.compile(self.pattern, re.UNICODE)
+
+    # METHODS #
+    def tokenize(self, text):
+        """Get the words in the given text.
+
+            @type  text: unicode
+            @param text: The text to tokenize.
+            @rtype:      list
+            @return:     The words in the order they appear in the text."""
+        words = self.regex.findall(text)
+        if self.lowercase:
+            words = [w.lower() for w in words]
+        if self.min_length > 1 or self.max_length:
+            lo, hi = self.min_length, self.max_length or len(text)
+            words = [w for w in words if lo <= len(w) <= hi]
+        return words
+
+def is_gzipped(filename):
+    """Check whether the given file is gzip compressed."""
+    f = open(filename, 'rb')
+    try:
+        return f.read(len(GZIP_MAGIC)) == GZIP_MAGIC
+    finally:
+        f.close()
+
+def open_corpus(filename):
+    """Open the given corpus file for reading, decompressing it on the fly if
+        it is gzipped."""
+    if is_gzipped(filename):
+        return gzip.open(filename, 'rb')
+    return open(filename, 'rb')
+
+def read_text_chunks(filename, chunk_size=CHUNK_SIZE, offset=0):
+    """Read (and decode) a plain text or gzipped corpus in chunks that end on
+        whitespace, so that no word is split over two chunks.
+
+        @type  offset: int
+        @param offset: The number of (uncompressed) bytes to skip at the start
+            of the corpus. See L{spelt.importers.wordlist.read_word_batches}.
+        @rtype:  generator
+        @return: Chunks of unicode text."""
+    f = open_corpus(filename)
+    try:
+        encoding, bom = detect_encoding(f.read(SAMPLE_SIZE))
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+        f.seek(max(bom, offset))
+
+        text = u''
+        data = True
+        while data:
+            data = f.read(chunk_size)
+            if data:
+                text += decoder.decode(data)
+            else:
+                text += decoder.decode('', True)
+
+            cut = max([text.rfind(ws) for ws in (u' ', u'\n', u'\t')])
+            if cut <= 0 and len(text) < 16 * chunk_size and data:
+                continue # Wait for whitespace, but don't wait forever
+
+            if cut <= 0 or not data:
+                cut = len(text)
+            if cut:
+                yield text[:cut]
+            text = text[cut:]
+    finally:
+        f.close()
+
+def count_words(texts, normalize=None, tokenizer=None):
+    """Tokenize the given texts and count the occurrences of every word.
+
+        @type  texts:     iterable
+        @param texts:     Unicode strings to tokenize.
+        @type  normalize: callable
+        @param normalize: See L{spelt.importers.wordlist.read_word_counts}.
+        @type  tokenizer: Tokenizer
+        @param tokenizer: The tokenizer to use. (Default: Tokenizer())
+        @rtype:           list
+        @return:          (word, count) pairs in the order that the words
+            first appear."""
+    if tokenizer is None:
+        tokenizer = Tokenizer()
+
+    counts = {}
+    order  = []
+
+    for text in texts:
+        words = tokenizer.tokenize(text)
+        if normalize is not None:
+            words = normalize(words)
+
+        for word in words:
+            if word in counts:
+                counts[word] += 1
+            else:
+                counts[word] = 1
+                order.append(word)
+
+    return [(w, counts[w]) for w in order]
+
+def read_corpus_counts(filename, normalize=None, tokenizer=None, **kwargs):
+    """Tokenize a raw text corpus and count the occurrences of every word.
+
+        The corpus is streamed, so only the distinct words and their counts
+        are kept in memory. Keyword arguments are passed on to
+        read_text_chunks(). See count_words() for the other parameters.
+
+        @rtype:  list
+        @return: (word, count) pairs in the order that the words first
+            appear in the corpus."""
+    return count_words(read_text_chunks(filename, **kwargs), normalize, tokenizer)
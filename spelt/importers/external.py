@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains word counting for inputs with more distinct words than fit in
+memory, based on an external merge sort."""
+
+import heapq
+import os
+import sys
+import tempfile
+
+from spelt.importers.corpus   import Tokenizer, read_text_chunks
+from spelt.importers.wordlist import parse_count, read_word_batches
+
+MEMORY_LIMIT = 64 << 20
+"""The default (approximate) number of bytes that counts are allowed to use
+before they are written to disk."""
+ENTRY_OVERHEAD = 100
+"""Estimated bytes used per counted word, besides the word itself (the dict
+slot and the count)."""
+MAX_RUNS = 64
+"""The maximum number of run files that are merged (and kept open) at once."""
+
+def read_wordlist_pairs(filename, **kwargs):
+    """Read a word list in batches of (word, count) pairs.
+        See L{spelt.importers.wordlist.read_word_counts}."""
+    for words in read_word_batches(filename, **kwargs):
+        yield [parse_count(w) for w in words]
+
+def read_corpus_pairs(filename, tokenizer=None, **kwargs):
+    """Read a corpus in batches of (word, 1) pairs.
+        See L{spelt.importers.corpus.read_corpus_counts}."""
+    if tokenizer is None:
+        tokenizer = Tokenizer()
+    for text in read_text_chunks(filename, **kwargs):
+        yield [(w, 1) for w in tokenizer.tokenize(text)]
+
+PAIR_READERS = {
+    'corpus'   : read_corpus_pairs,
+    'wordlist' : read_wordlist_pairs
+}
+"""Maps the import formats that can be counted out of core to their readers."""
+
+def _write_run(counts, tmpdir):
+    """Write the given counts, sorted by word, to a new run file."""
+    return _write_pairs(((word, counts[word]) for word in sorted(counts)), tmpdir)
+
+def _write_pairs(pairs, tmpdir):
+    """Write the (word, count) pairs to a new run file. The file is removed
+        again if writing fails."""
+    fd, filename = tempfile.mkstemp(prefix='spelt-run-', dir=tmpdir)
+    f = os.fdopen(fd, 'wb')
+    try:
+        try:
+            for word, count in pairs:
+                f.write('%d\t%s\n' % (count, word.encode('utf-8')))
+        finally:
+            f.close()
+    except:
+        os.remove(filename)
+        raise
+    return filename
+
+def _read_run(filename):
+    """Read the (word, count) pairs from a run file."""
+    f = open(filename, 'rb')
+    try:
+        for line in f:
+            count, word = line[:-1].split('\t', 1)
+            yield word.decode('utf-8'), int(count)
+    finally:
+        f.close()
+
+def _merge(iterables):
+    """Merge sorted (word, count) iterables, adding up the counts of equal
+        words."""
+    word, total = None, 0
+    for w, count in heapq.merge(*iterables):
+        if w == word:
+            total += count
+            continue
+        if word is not None:
+            yield word, total
+        word, total = w, count
+    if word is not None:
+        yield word, total
+
+def _merge_runs(runs, tmpdir):
+    """Merge the run files into a single run file. The merged run file is
+        removed if the merge fails; the given runs are only removed after it
+        succeeded."""
+    filename = _write_pairs(_merge([_read_run(r) for r in runs]), tmpdir)
+    for r in runs:
+        os.remove(r)
+    return filename
+
+def external_counts(batches, normalize=None, memory_limit=MEMORY_LIMIT, tmpdir=None, max_runs=MAX_RUNS):
+    """Count words from batches of (word, count) pairs without keeping more
+        than about memory_limit bytes of counts in memory.
+
+        Counts are collected in memory until the limit is reached, and then
+        written to a sorted run file on disk. The runs are merged at the end
+        (in several passes if there are more than max_runs).
+
+        @type  batches:      iterable
+        @param batches:      Lists of (word, count) pairs.
+        @type  normalize:    callable
+        @param normalize:    See L{spelt.importers.wordlist.read_word_counts}.
+        @type  memory_limit: int
+        @param memory_limit: The approximate number of bytes of counts to
+            keep in memory.
+        @type  tmpdir:       str
+        @param tmpdir:       The directory for run files. (Default: the
+            system's temporary directory)
+        @rtype:              generator
+        @return:             Distinct (word, count) pairs, sorted by word."""
+    counts = {}
+    size   = 0
+    runs   = []
+
+    try:
+        for pairs in batches:
+            if normalize is not None:
+                pairs = zip(normalize([p[0] for p in pairs]), [p[1] for p in pairs])
+
+            for word, count in pairs:
+                if not word:
+                    continue
+                if word in counts:
+                    counts[word] += count
+                else:
+                    counts[word] = count
+                    size += sys.getsizeof(word) + ENTRY_OVERHEAD
+
+            if size >= memory_limit:
+                runs.append(_write_run(counts, tmpdir))
+                counts = {}
+                size = 0
+
+        if not runs:
+            for word in sorted(counts):
+                yield word, counts[word]
+            return
+
+        if counts:
+            runs.append(_write_run(counts, tmpdir))
+            counts = {}
+
+        while len(runs) > max_runs:
+            runs = [_merge_runs(runs[:max_runs], tmpdir)] + runs[max_runs:]
+
+        for pair in _merge([_read_run(r) for r in runs]):
+            yield pair
+    finally:
+        for r in runs:
+            if os.path.exists(r):
+                os.remove(r)
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Identifies imported files by their size and contents."""
+
+import hashlib
+
+HASH_CHUNK_SIZE = 1 << 20
+"""The number of bytes hashed in one go."""
+
+def fingerprint(filename, prefixes=()):
+    """Calculate the size and SHA-1 digest of a file.
+
+        Digests of the file's first bytes are calculated along the way (in
+        the same pass), so that a file can be recognized as an earlier file
+        with lines appended to it. A prefix digest is only returned if the
+        prefix ends in a line break, because otherwise the last line of the
+        earlier file may have been extended.
+
+        @type  filename: basestring
+        @param filename: The path of the file to fingerprint.
+        @type  prefixes: iterable
+        @param prefixes: Sizes (in bytes) of the prefixes to calculate
+            digests for, eg. the sizes of previously imported files.
+        @rtype:          tuple
+        @return:         A (size, digest, prefix_digests) tuple, where
+            prefix_digests maps prefix sizes to hex digests."""
+    sizes   = sorted(set([p for p in prefixes if p > 0]))
+    sha     = hashlib.sha1()
+    digests = {}
+    size    = 0
+
+    f = open(filename, 'rb')
+    try:
+        while True:
+            want = HASH_CHUNK_SIZE
+            if sizes:
+                want = min(want, sizes[0] - size)
+
+            data = f.read(want)
+            if not data:
+                break
+            sha.update(data)
+            size += len(data)
+
+            if sizes and size == sizes[0]:
+                if data.endswith('\n'):
+                    digests[size] = sha.hexdigest()
+                sizes.pop(0)
+    finally:
+        f.close()
+
+    return size, sha.hexdigest(), digests
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Maps import formats to the functions that read them."""
+
+import os.path
+
+from spelt.importers.corpus      import is_gzipped, read_corpus_counts
+from spelt.importers.translation import read_po_counts, read_tmx_counts, read_xliff_counts
+from spelt.importers.wordlist    import read_word_batches, read_word_counts
+
+READERS = {
+    'corpus'   : read_corpus_counts,
+    'po'       : read_po_counts,
+    'tmx'      : read_tmx_counts,
+    'wordlist' : read_word_counts,
+    'xliff'    : read_xliff_counts
+}
+"""Maps format names to reader functions. A reader takes a filename and a
+normalize keyword argument and returns an iterable of (word, count) pairs.
+A word may occur in more than one pair (see read_word_counts())."""
+
+EXTENSIONS = {
+    '.po'    : 'po',
+    '.tmx'   : 'tmx',
+    '.xlf'   : 'xliff',
+    '.xliff' : 'xliff'
+}
+"""Maps file extensions to the formats that are recognized by extension only."""
+
+APPENDABLE = ('corpus', 'wordlist')
+"""Formats whose readers take an offset keyword argument, so that lines
+appended to an already imported file can be read on their own."""
+
+def guess_format(filename):
+    """Guess the format of the given file.
+
+        PO, XLIFF and TMX files are recognized by their extensions (see
+        EXTENSIONS). Gzipped files are read as corpora. Otherwise a file is
+        read as a corpus if most of its first lines contain more than one
+        word.
+
+        @rtype:  str
+        @return: One of the keys in READERS."""
+    ext = os.path.splitext(filename)[1].lower()
+    if ext in EXTENSIONS:
+        return EXTENSIONS[ext]
+
+    if is_gzipped(filename):
+        return 'corpus'
+
+    lines = 0
+    multi = 0
+    for words in read_word_batches(filename, batch_size=100):
+        for word in words:
+            # "word<TAB>count" lines are word list entries
+            if len(word.split(u'\t')[0].split()) > 1:
+                multi += 1
+        lines = len(words)
+        break
+
+    if lines and multi * 2 > lines:
+        return 'corpus'
+    return 'wordlist'
@@ -0,0 +1,397 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains an importer for Hunspell dictionaries (.dic/.aff pairs)."""
+
+import codecs
+import os.path
+import re
+
+from spelt.importers.wordlist  import BATCH_SIZE, python_encoding
+from spelt.models.pos          import PartOfSpeech
+from spelt.models.root         import Root
+from spelt.models.surface_form import SurfaceForm
+from spelt.models.xml_model    import timestamp
+
+class Affix(object):
+    """
+    A single prefix ("PFX") or suffix ("SFX") rule from an .aff file.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, kind, flag, cross, strip, add, condition='.'):
+        """Constructor.
+            @type  kind:      str
+            @param kind:      "PFX" or "SFX".
+            @type  flag:      unicode
+            @param flag:      The flag that words need to allow this affix.
+            @type  cross:     bool
+            @param cross:     Whether the affix can be combined with affixes
+                of the other kind.
+            @type  strip:     unicode
+            @param strip:     The characters to strip from the word.
+            @type  add:       unicode
+            @param add:       The characters to add to the stripped word.
+            @type  condition: unicode
+            @param condition: A Hunspell condition (a simple regular
+                expression) that the start (PFX) or end (SFX) of the word has
+                to match.
+            """
+        assert kind in ('PFX', 'SFX')
+
+        self.kind  = kind
+        self.flag  = flag
+        self.cross = cross
+        self.strip = strip
+        self.add   = add
+
+        if condition == '.':
+            self.regex = None
+        elif kind == 'PFX':
+            self.regex = re.compile(u'^' + condition, re.UNICODE)
+        else:
+            self.regex = re.compile(condition + u'$', re.UNICODE)
+
+    # METHODS #
+    def apply(self, word):
+        """Apply this affix to the given word.
+            @rtype:  unicode
+            @return: The affixed word or None if the affix doesn't apply."""
+        if self.regex is not None and not self.regex.search(word):
+            return None
+
+        if self.kind == 'PFX':
+            if not word.startswith(self.strip):
+                return None
+            return self.add + word[len(self.strip):]
+
+        if not word.endswith(self.strip):
+            return None
+        return word[:len(word)-len(self.strip)] + self.add
+
+class AffixFile(object):
+    """
+    The parts of a Hunspell .aff file needed to read a .dic file and expand
+    its entries: the encoding, flag format, flag aliases and affix rules.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, filename=None):
+        self.encoding      = 'iso8859-1'
+        self.flag_type     = 'short'
+        self.aliases       = []
+        self.affixes       = {}
+        self.forbiddenword = None
+        self.needaffix     = None
+
+        if filename is not None:
+            self.load(filename)
+
+    # METHODS #
+    def load(self, filename):
+        """Read the affix file with the given name."""
+        pending = {} # Maps (kind, flag) to (cross, number of rules still to come)
+        aliases_left = 0
+
+        f = open(filename, 'rb')
+        try:
+            for line in f:
+                fields = line.decode(self.encoding, 'replace').split()
+                if not fields or fields[0].startswith('#'):
+                    continue
+                key = fields[0]
+
+                if key == 'SET' and len(fields) > 1:
+                    self.encoding = python_encoding(fields[1])
+                elif key == 'FLAG' and len(fields) > 1:
+                    self.flag_type = fields[1].lower()
+                elif key == 'AF' and len(fields) > 1:
+                    if aliases_left:
+                        self.aliases.append(fields[1])
+                        aliases_left -= 1
+                    elif fields[1].isdigit():
+                        aliases_left = int(fields[1])
+                elif key == 'FORBIDDENWORD' and len(fields) > 1:
+                    self.forbiddenword = fields[1]
+                elif key == 'NEEDAFFIX' and len(fields) > 1:
+                    self.needaffix = fields[1]
+                elif key in ('PFX', 'SFX') and len(fields) > 3:
+                    flag = fields[1]
+                    cross, left = pending.get((key, flag), (False, 0))
+                    if not left:
+                        # Header line: "SFX flag cross_product count"
+                        if fields[3].isdigit():
+                            pending[(key, flag)] = (fields[2] == 'Y', int(fields[3]))
+                        continue
+
+                    pending[(key, flag)] = (cross, left - 1)
+                    strip = fields[2] != '0' and fields[2] or u''
+                    add   = fields[3].split('/')[0]
+                    if add == '0':
+                        add = u''
+                    condition = len(fields) > 4 and fields[4] or u'.'
+
+                    try:
+                        affix = Affix(key, flag, cross, strip, add, condition)
+                    except re.error:
+                        continue # Skip rules with conditions we can't handle
+                    self.affixes.setdefault(flag, []).append(affix)
+        finally:
+            f.close()
+
+    def parse_flags(self, flags):
+        """Split the flags of a .dic entry according to the "FLAG" type and
+            resolve "AF" aliases.
+            @rtype:  list
+            @return: The separate flags."""
+        if not flags:
+            return []
+        if self.aliases and flags.isdigit():
+            index = int(flags) - 1
+            if 0 <= index < len(self.aliases):
+                flags = self.aliases[index]
+
+        if self.flag_type == 'long':
+            return [flags[i:i+2] for i in range(0, len(flags), 2)]
+        if self.flag_type == 'num':
+            return [f for f in flags.split(',') if f]
+        return list(flags)
+
+    def expand(self, word, flags):
+        """Get all forms of the given word allowed by its flags.
+
+            The word itself is included, unless it is flagged with
+            "NEEDAFFIX". Prefixes and suffixes that allow cross products are
+            combined.
+            @rtype:  list
+            @return: The distinct forms, in the order they were generated."""
+        prefixes = []
+        suffixes = []
+        for flag in flags:
+            for affix in self.affixes.get(flag, []):
+                if affix.kind == 'PFX':
+                    prefixes.append(affix)
+                else:
+                    suffixes.append(affix)
+
+        forms = []
+        if self.needaffix is None or self.needaffix not in flags:
+            forms.append(word)
+
+        for sfx in suffixes:
+            form = sfx.apply(word)
+            if not form:
+                continue
+            forms.append(form)
+            if sfx.cross:
+                for pfx in prefixes:
+                    if pfx.cross:
+                        crossed = pfx.apply(form)
+                        if crossed:
+                            forms.append(crossed)
+
+        for pfx in prefixes:
+            form = pfx.apply(word)
+            if form:
+                forms.append(form)
+
+        seen = set()
+        return [f for f in forms if not (f in seen or seen.add(f))]
+
+def split_entry(entry):
+    """Split a .dic entry ("word/flags") into word and flags. Slashes in the
+        word can be escaped with a backslash."""
+    parts = re.split(r'(?<!\\)/', entry, 1)
+    word = parts[0].replace(u'\\/', u'/')
+    return word, len(parts) > 1 and parts[1] or u''
+
+def read_dic_entries(filename, aff):
+    """Read the entries of a .dic file one line at a time.
+
+        @type  aff: AffixFile
+        @param aff: The dictionary's affix file.
+        @rtype:     generator
+        @return:    (word, flags, morphological fields) tuples."""
+    f = codecs.open(filename, 'r', aff.encoding, 'replace')
+    try:
+        first = True
+        for line in f:
+            fields = line.split()
+            if first:
+                first = False
+                if len(fields) == 1 and fields[0].isdigit():
+                    continue # The approximate word count on the first line
+            if not fields:
+                continue
+
+            word, flags = split_entry(fields[0])
+            if word:
+                yield word, aff.parse_flags(flags), fields[1:]
+    finally:
+        f.close()
+
+def _undo_import(langdb, src, flushed, classified, reserved):
+    """Remove the source and models of a failed import_hunspell() again,
+        revert the classified surface forms and release the ID's reserved
+        for models that weren't added."""
+    for sf, user_id in reversed(classified):
+        langdb.update_surface_form(sf, root_id=0, status='todo', user_id=user_id)
+    for section, model in reversed(flushed):
+        langdb.remove(langdb.section_ids[section][model.id])
+    for section, model in reserved:
+        if langdb.release_id(section, model.id):
+            model.id = 0
+    langdb.remove(src)
+
+def import_hunspell(langdb, src, dic_filename, aff_filename=None, pos_map=None, expand=False, batch_size=BATCH_SIZE):
+    """Import the stems of a Hunspell dictionary as roots.
+
+        A root's part of speech is taken from the first of its flags found in
+        pos_map, or else from a "po:" morphological field in the .dic file.
+        Parts of speech named in "po:" fields are created if they don't exist.
+        An existing root with the same value and part of speech is reused.
+
+        Models are added in batches with L{LanguageDB.add_many}. If the
+        import fails, the source and everything that was added or classified
+        is removed (or reverted) again and the reserved ID's are released.
+
+        @type  langdb:       spelt.models.LanguageDB
+        @param langdb:       The language database to import into.
+        @type  src:          spelt.models.Source
+        @param src:          The source to add for the dictionary.
+        @type  dic_filename: basestring
+        @param dic_filename: The path of the .dic file.
+        @type  aff_filename: basestring
+        @param aff_filename: The path of the .aff file. (Default: the .dic
+            path with an .aff extension)
+        @type  pos_map:      dict
+        @param pos_map:      Maps Hunspell flags to PartOfSpeech models.
+        @type  expand:       bool
+        @param expand:       Whether to add the (affixed) forms of every stem
+            as surface forms classified under its root. Forms that are
+            already in the database with status "todo" are classified under
+            the root instead; other forms that are already in the database
+            are skipped.
+        @rtype:              tuple
+        @return:             The number of roots added and the number of
+            surface forms added or classified.
+        """
+    if aff_filename is None:
+        aff_filename = os.path.splitext(dic_filename)[0] + '.aff'
+    if os.path.exists(aff_filename):
+        aff = AffixFile(aff_filename)
+    else:
+        aff = AffixFile()
+
+    langdb.add_source(src)
+    user_id   = src.import_user_id
+    date      = timestamp() # Converted once for all new models
+    normalize = langdb.normalizer.normalize_many
+
+    pos_map = dict(pos_map or {})
+    pos_by_name = dict([(p.name, p) for p in langdb.parts_of_speech])
+    new_pos = []
+    def add_pos(pos):
+        # Several flags (or names) may map to the same new part of speech
+        for other in new_pos:
+            if other is pos:
+                return
+        new_pos.append(pos)
+    for pos in pos_map.values():
+        if pos.id not in langdb.parts_of_speech_ids:
+            add_pos(pos)
+    for pos in new_pos:
+        if not pos.id:
+            pos.id = langdb.new_id('parts_of_speech')
+        pos_by_name.setdefault(pos.name, pos)
+
+    existing   = set(langdb.surface_form_index)
+    added      = set()
+    pending    = {}
+    roots      = []
+    sforms     = []
+    flushed    = [] # (section, model) pairs, to undo a failed import
+    classified = [] # (surface form, user ID) pairs of the classified todo forms
+
+    def flush():
+        for section, models in (('parts_of_speech', new_pos), ('roots', roots), ('surface_forms', sforms)):
+            langdb.add_many(section, models)
+            flushed.extend([(section, m) for m in models])
+            del models[:]
+        pending.clear()
+
+    try:
+        for word, flags, morph in read_dic_entries(dic_filename, aff):
+            if aff.forbiddenword is not None and aff.forbiddenword in flags:
+                continue
+
+            pos = None
+            for flag in flags:
+                if flag in pos_map:
+                    pos = pos_map[flag]
+                    break
+            if pos is None:
+                for field in morph:
+                    if field.startswith('po:') and len(field) > 3:
+                        name = field[3:]
+                        pos = pos_by_name.get(name)
+                        if pos is None:
+                            pos = pos_by_name[name] = PartOfSpeech(name=name, shortcut=name, id=langdb.new_id('parts_of_speech'))
+                            add_pos(pos)
+                        break
+            pos_id = pos and pos.id or 0
+
+            key, = normalize([word])
+            root = None
+            for candidate in langdb.root_index.get(key, []) + pending.get(key, []):
+                if candidate.pos_id == pos_id:
+                    root = candidate
+                    break
+            if root is None:
+                root = Root(value=key, pos_id=pos_id, user_id=user_id, date=date, id=langdb.new_id('roots'))
+                roots.append(root)
+                pending.setdefault(key, []).append(root)
+
+            if expand:
+                for form in normalize(aff.expand(word, flags)):
+                    if (form, root.id) in added:
+                        continue
+                    added.add((form, root.id))
+                    if form in existing:
+                        todo = [sf for sf in langdb.surface_form_index.get(form, []) if sf.status == 'todo']
+                        if todo:
+                            classified.append((todo[0], todo[0].user_id))
+                            langdb.update_surface_form(todo[0], root_id=root.id, status='classified', user_id=user_id)
+                        continue
+                    sforms.append(SurfaceForm(
+                        value=form, status='classified', user_id=user_id, date=date,
+                        source_id=src.id, root_id=root.id
+                    ))
+
+            if len(roots) + len(sforms) >= batch_size:
+                flush()
+
+        flush()
+    except:
+        _undo_import(langdb, src, flushed, classified, [('parts_of_speech', p) for p in new_pos] + [('roots', r) for r in roots])
+        raise
+
+    sections = [section for section, model in flushed]
+    return sections.count('roots'), sections.count('surface_forms') + len(classified)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import gzip
+import os
+import tempfile
+
+from spelt.common.normalize import Normalizer
+from spelt.importers.corpus  import Tokenizer, read_corpus_counts, read_text_chunks
+from spelt.importers.formats import guess_format
+
+TEXT = u"""Die koeie loop in die veld. Die boer se seun se "koeie" is
+mooi-mooi, maar dié van die buurman s'n is 1000 keer mooier!
+"""
+
+class TestCorpus(object):
+    """Unit test for the corpus tokenizer and reader."""
+
+    def write_temp(self, data, compress=False):
+        fd, filename = tempfile.mkstemp(suffix='.txt')
+        os.close(fd)
+        if compress:
+            f = gzip.open(filename, 'wb')
+        else:
+            f = open(filename, 'wb')
+        f.write(data)
+        f.close()
+        return filename
+
+    def test_tokenize(self):
+        words = Tokenizer().tokenize(TEXT)
+        assert words[:4] == [u'Die', u'koeie', u'loop', u'in']
+        assert u'mooi-mooi' in words and u"s'n" in words and u'dié' in words
+        assert u'1000' not in words
+
+        words = Tokenizer(lowercase=True, min_length=4).tokenize(TEXT)
+        assert words[:3] == [u'koeie', u'loop', u'veld']
+
+    def test_chunks(self):
+        filename = self.write_temp(TEXT.encode('utf-8'))
+        try:
+            for chunk_size in (1, 5, 1 << 20):
+                chunks = list(read_text_chunks(filename, chunk_size=chunk_size))
+                assert u''.join(chunks) == TEXT
+                for chunk in chunks[1:]:
+                    assert chunk[0].isspace()
+        finally:
+            os.remove(filename)
+
+    def test_counts(self):
+        for compress in (False, True):
+            filename = self.write_temp(TEXT.encode('utf-8'), compress)
+            try:
+                assert guess_format(filename) == 'corpus'
+                counts = dict(read_corpus_counts(
+                    filename,
+                    normalize=Normalizer().normalize_many,
+                    tokenizer=Tokenizer(lowercase=True),
+                    chunk_size=7
+                ))
+            finally:
+                os.remove(filename)
+            assert counts[u'die'] == 4
+            assert counts[u'koeie'] == 2
+            assert counts[u'mooier'] == 1
+
+    def test_guess_wordlist(self):
+        filename = self.write_temp('koeie\nboom\t3\nvarkies\n')
+        try:
+            assert guess_format(filename) == 'wordlist'
+        finally:
+            os.remove(filename)
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+import random
+import tempfile
+
+from spelt.common.normalize    import Normalizer
+from spelt.importers.external  import external_counts, read_wordlist_pairs
+from spelt.importers.wordlist  import read_word_counts
+from spelt.models              import LanguageDB, Source, SurfaceForm
+
+def total_counts(pairs):
+    """Add up the counts of words that occur in more than one pair."""
+    totals = {}
+    for word, count in pairs:
+        totals[word] = totals.get(word, 0) + count
+    return sorted(totals.items())
+
+class TestExternalCounts(object):
+    """Unit test for out-of-core word counting."""
+
+    def setup(self):
+        rand = random.Random(42)
+        words = [u'word%d' % (rand.randint(0, 500)) for i in range(5000)]
+        words += [u'koeï', u'koeï', u'boom\t7']
+        fd, self.filename = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, u'\n'.join(words).encode('utf-8'))
+        os.close(fd)
+        self.tmpdir = tempfile.mkdtemp()
+
+    def teardown(self):
+        os.remove(self.filename)
+        os.rmdir(self.tmpdir) # Fails if any run files were left behind
+
+    def test_counts(self):
+        normalize = Normalizer().normalize_many
+        expected = total_counts(read_word_counts(self.filename, normalize=normalize, batch_size=100))
+
+        for memory_limit, max_runs in ((1 << 30, 64), (2000, 64), (2000, 3)):
+            counts = list(external_counts(
+                read_wordlist_pairs(self.filename, batch_size=100),
+                normalize=normalize,
+                memory_limit=memory_limit,
+                tmpdir=self.tmpdir,
+                max_runs=max_runs
+            ))
+            assert counts == expected
+        assert dict(expected)[u'koeï'] == 2
+        assert dict(expected)[u'boom'] == 7
+
+    def test_failed_merge(self):
+        # The line break makes the second run unreadable, so merging fails
+        batches = [[(u'a', 1)], [(u'b\nc', 1)], [(u'd', 1)]]
+        try:
+            list(external_counts(batches, memory_limit=1, tmpdir=self.tmpdir, max_runs=2))
+        except ValueError:
+            pass
+        else:
+            assert False, 'merging should fail'
+        assert os.listdir(self.tmpdir) == []
+
+    def test_import_source(self):
+        ldb = LanguageDB(lang='af')
+        ldb.add_surface_form(SurfaceForm(value=u'word1', status='classified'))
+        ldb.import_source(
+            Source(name=u'big', import_user_id=1), self.filename,
+            format='wordlist', memory_limit=2000
+        )
+        normalize = Normalizer().normalize_many
+        assert len(ldb.surface_forms) == len(total_counts(read_word_counts(self.filename, normalize=normalize)))
+        assert ldb.find(section='surface_forms', value=u'word1')[0].status == 'classified'
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import tempfile
+
+from spelt.importers.fingerprint import fingerprint
+
+class TestFingerprint(object):
+    """Unit test for file fingerprinting."""
+
+    def test_fingerprint(self):
+        data = 'koeie\nboom\nvarkies\n'
+        fd, filename = tempfile.mkstemp()
+        os.write(fd, data)
+        os.close(fd)
+
+        try:
+            size, digest, prefixes = fingerprint(filename, [6, 8, 11, 100])
+        finally:
+            os.remove(filename)
+
+        assert size == len(data)
+        assert digest == hashlib.sha1(data).hexdigest()
+        # Prefixes that don't end in a line break or are too long are skipped
+        assert prefixes == {
+            6:  hashlib.sha1(data[:6]).hexdigest(),
+            11: hashlib.sha1(data[:11]).hexdigest()
+        }
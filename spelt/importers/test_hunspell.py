@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+
+from spelt.importers          import hunspell
+from spelt.importers.hunspell import AffixFile, import_hunspell, split_entry
+from spelt.models             import LanguageDB, PartOfSpeech, Source, SurfaceForm
+
+AFF = u"""SET UTF-8
+# Comment
+NEEDAFFIX X
+FORBIDDENWORD F
+
+PFX O Y 1
+PFX O 0 on .
+
+SFX E Y 2
+SFX E 0 e [^e]
+SFX E 0 s e
+
+SFX T N 1
+SFX T 0 tjie [^e]
+"""
+
+DIC = u"""5
+koei/E	po:noun
+boom/ETO
+klein/T	po:adj
+kwaad/XE
+slegte/F
+"""
+
+class TestHunspell(object):
+    """Unit test for the Hunspell dictionary importer."""
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.dic = os.path.join(self.dir, 'af.dic')
+        open(os.path.join(self.dir, 'af.aff'), 'w').write(AFF.encode('utf-8'))
+        open(self.dic, 'w').write(DIC.encode('utf-8'))
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_affix_file(self):
+        aff = AffixFile(os.path.join(self.dir, 'af.aff'))
+        assert aff.encoding == 'utf-8'
+        assert aff.needaffix == u'X'
+        assert aff.expand(u'koei', [u'E']) == [u'koei', u'koeie']
+        assert aff.expand(u'boom', aff.parse_flags(u'ETO')) == [
+            u'boom', u'boome', u'onboome', u'boomtjie', u'onboom'
+        ]
+        assert aff.expand(u'kwaad', [u'X', u'E']) == [u'kwaade']
+
+    def test_split_entry(self):
+        assert split_entry(u'boom/ETO') == (u'boom', u'ETO')
+        assert split_entry(u'km\\/h') == (u'km/h', u'')
+
+    def test_import(self):
+        ldb = LanguageDB(lang='af')
+        verb = PartOfSpeech(name=u'verb', shortcut=u'v')
+        roots, sforms = import_hunspell(
+            ldb, Source(name=u'af.dic', import_user_id=1), self.dic,
+            pos_map={u'O': verb, u'T': verb}
+        )
+        assert (roots, sforms) == (4, 0)
+        assert len(ldb.sources) == 1
+        assert len(ldb.roots) == 4 and len(ldb.surface_forms) == 0
+        assert verb in ldb.parts_of_speech
+        assert ldb.find(section='roots', value=u'boom')[0].pos_id == verb.id
+
+        noun = ldb.find(section='parts_of_speech', name=u'noun')[0]
+        assert ldb.find(section='roots', value=u'koei')[0].pos_id == noun.id
+        assert not ldb.find(section='roots', value=u'slegte')
+
+    def test_import_expand(self):
+        ldb = LanguageDB(lang='af')
+        roots, sforms = import_hunspell(
+            ldb, Source(name=u'af.dic', import_user_id=1), self.dic, expand=True, batch_size=3
+        )
+        assert roots == 4 and sforms == len(ldb.surface_forms) == 10
+
+        koei = ldb.find(section='roots', value=u'koei')[0]
+        koeie = ldb.find(section='surface_forms', value=u'koeie')[0]
+        assert koeie.root_id == koei.id and koeie.status == 'classified'
+        assert not ldb.find(section='surface_forms', value=u'kwaad')
+
+        # Importing again reuses the roots and skips the known forms
+        roots, sforms = import_hunspell(
+            ldb, Source(name=u'af.dic again', import_user_id=1), self.dic, expand=True
+        )
+        assert (roots, sforms) == (0, 0)
+
+    def test_import_todo(self):
+        ldb = LanguageDB(lang='af')
+        todo = SurfaceForm(value=u'koeie', status='todo', frequency=3)
+        ignored = SurfaceForm(value=u'boome', status='ignored')
+        ldb.add_many('surface_forms', [todo, ignored])
+        roots, sforms = import_hunspell(
+            ldb, Source(name=u'af.dic', import_user_id=1), self.dic, expand=True
+        )
+        koei = ldb.find(section='roots', value=u'koei')[0]
+        assert todo.status == 'classified' and todo.root_id == koei.id and todo.frequency == 3
+        assert ldb.find(section='surface_forms', value=u'koeie') == [todo]
+        assert ignored.status == 'ignored' and ignored.root_id == 0
+        assert sforms == len(ldb.surface_forms) - 1 == 9
+
+    def test_import_failure(self):
+        ldb = LanguageDB(lang='af')
+        todo = SurfaceForm(value=u'koeie', status='todo', user_id=2)
+        ldb.add_surface_form(todo)
+
+        def failing_entries(filename, aff):
+            for entry in list(read_dic_entries(filename, aff))[:3]:
+                yield entry
+            raise IOError('Read error')
+
+        read_dic_entries = hunspell.read_dic_entries
+        hunspell.read_dic_entries = failing_entries
+        try:
+            import_hunspell(
+                ldb, Source(name=u'af.dic', import_user_id=1), self.dic,
+                expand=True, batch_size=2
+            )
+            assert False, 'The import should fail'
+        except IOError:
+            pass
+        finally:
+            hunspell.read_dic_entries = read_dic_entries
+
+        # Everything is undone, and nothing stays reserved
+        assert not ldb.sources and not ldb.roots and not ldb.parts_of_speech
+        assert ldb.surface_forms_ids.values() == [todo]
+        assert (todo.status, todo.root_id, todo.user_id) == ('todo', 0, 2)
+        assert not [ids for ids in ldb.reserved_ids.values() if ids]
+
+        assert import_hunspell(ldb, Source(name=u'af.dic', import_user_id=1), self.dic, expand=True) == (4, 10)
+        assert todo.status == 'classified'
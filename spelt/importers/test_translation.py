@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+import shutil
+import tempfile
+
+from spelt.importers.formats     import guess_format
+from spelt.importers.translation import *
+from spelt.models                import LanguageDB, Source
+
+PO = r'''# Afrikaans translation
+msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=UTF-8\n"
+
+#: main.c:12
+msgid "Open %s file"
+msgstr "Maak %s lêer oop"
+
+#, fuzzy
+msgid "Close"
+msgstr "Toemaak"
+
+msgctxt "menu"
+msgid "_File"
+msgstr "_Lêer"
+
+msgid "One <b>file</b>"
+msgid_plural "%(count)d files"
+msgstr[0] "Een <b>lêer</b>"
+msgstr[1] "%(count)d "
+"lêers &amp; {0} ${dir}"
+
+msgid "Untranslated"
+msgstr ""
+
+#~ msgid "Obsolete"
+#~ msgstr "Uitgedien"
+'''
+
+XLIFF = '''<?xml version="1.0" encoding="UTF-8"?>
+<xliff version="1.2" xmlns="urn:oasis:names:tc:xliff:document:1.2">
+  <file original="test" source-language="en" target-language="af" datatype="plaintext">
+    <body>
+      <trans-unit id="1">
+        <source>Open <ph id="1">&lt;b&gt;</ph>file<ph id="2">&lt;/b&gt;</ph></source>
+        <target>Maak <ph id="1">&lt;b&gt;</ph>lêer<ph id="2">&lt;/b&gt;</ph> oop</target>
+      </trans-unit>
+      <trans-unit id="2">
+        <source>Big tree</source>
+        <target state="translated"><g id="1">Groot</g> boom</target>
+        <alt-trans>
+          <source>Big tree</source>
+          <target>Reuse boom</target>
+        </alt-trans>
+      </trans-unit>
+      <trans-unit id="3">
+        <source>New</source>
+        <target state="new">Nuut</target>
+      </trans-unit>
+    </body>
+  </file>
+</xliff>
+'''
+
+TMX = '''<?xml version="1.0" encoding="UTF-8"?>
+<tmx version="1.4">
+  <header srclang="en" datatype="plaintext" segtype="sentence" adminlang="en" o-tmf="test" creationtool="test" creationtoolversion="1"/>
+  <body>
+    <tu>
+      <tuv xml:lang="en"><seg>The cow</seg></tuv>
+      <tuv xml:lang="af-ZA"><seg>Die <bpt i="1">&lt;i&gt;</bpt>koei<ept i="1">&lt;/i&gt;</ept></seg></tuv>
+      <tuv xml:lang="de"><seg>Die Kuh</seg></tuv>
+    </tu>
+  </body>
+</tmx>
+'''
+
+class TestTranslationFiles(object):
+    """Unit test for the PO, XLIFF and TMX readers."""
+
+    def setup(self):
+        self.dir = tempfile.mkdtemp()
+        self.files = {}
+        for ext, data in (('po', PO), ('xlf', XLIFF), ('tmx', TMX)):
+            filename = os.path.join(self.dir, 'test.' + ext)
+            open(filename, 'w').write(data)
+            self.files[ext] = filename
+
+    def teardown(self):
+        shutil.rmtree(self.dir)
+
+    def test_clean_text(self):
+        assert clean_text(u'Maak %s lêer oop').split() == [u'Maak', u'lêer', u'oop']
+        assert clean_text(u'%(count)d {0} ${dir} 100% <b>&File</b>&amp;').split() == [u'100%', u'File']
+        assert clean_text(u'_Open snake_case R&D Ctrl_Shift ~Nuut') == u'Open snake_case R&D Ctrl_Shift Nuut'
+
+    def test_po(self):
+        targets = list(read_po_targets(self.files['po']))
+        assert targets == [
+            u'Maak %s lêer oop',
+            u'_Lêer',
+            u'Een <b>lêer</b>\n%(count)d lêers &amp; {0} ${dir}'
+        ]
+        counts = dict(read_po_counts(self.files['po']))
+        assert counts == {u'Maak': 1, u'lêer': 2, u'oop': 1, u'Lêer': 1, u'Een': 1, u'lêers': 1}
+
+    def test_po_charset(self):
+        filename = os.path.join(self.dir, 'latin1.po')
+        data = PO.replace('charset=UTF-8', 'charset=ISO-8859-1').decode('utf-8')
+        open(filename, 'w').write(data.encode('iso-8859-1'))
+        assert list(read_po_targets(filename)) == list(read_po_targets(self.files['po']))
+
+        # Without a (known) charset the file is read as UTF-8
+        data = PO.replace('charset=UTF-8', 'charset=CHARSET')
+        open(filename, 'w').write(data)
+        assert list(read_po_targets(filename)) == list(read_po_targets(self.files['po']))
+
+    def test_xliff(self):
+        counts = read_xliff_counts(self.files['xlf'])
+        assert counts == [(u'Maak', 1), (u'lêer', 1), (u'oop', 1), (u'Groot', 1), (u'boom', 1)]
+
+    def test_tmx(self):
+        assert read_tmx_counts(self.files['tmx'], lang='af') == [(u'Die', 1), (u'koei', 1)]
+        assert dict(read_tmx_counts(self.files['tmx'])) == {u'Die': 2, u'koei': 1, u'Kuh': 1}
+
+    def test_import_source(self):
+        ldb = LanguageDB(lang='af')
+        for ext, format in (('po', 'po'), ('xlf', 'xliff'), ('tmx', 'tmx')):
+            assert guess_format(self.files[ext]) == format
+            ldb.import_source(Source(name=ext, import_user_id=1), self.files[ext])
+
+        assert len(ldb.sources) == 3
+        # Counts from the PO and XLIFF files are added up
+        assert ldb.find(section='surface_forms', value=u'lêer')[0].frequency == 3
+        assert ldb.find(section='surface_forms', value=u'Kuh')
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+
+from spelt.importers.tsv import import_classified
+from spelt.models        import LanguageDB, PartOfSpeech, Root, Source, SurfaceForm
+
+TSV = u"""# form\troot\tpos
+koeie\tkoei\tn1
+koeitjie\tkoei\tn1
+bome\tboom\tnoun
+boompie\tboom\tnoun
+loop\tloop
+koeie\tkoei\tn1
+geen wortel
+"""
+
+class TestImportClassified(object):
+    """Unit test for the pre-classified TSV importer."""
+
+    def setup(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.tsv')
+        os.write(fd, TSV.encode('utf-8'))
+        os.close(fd)
+
+    def teardown(self):
+        os.remove(self.filename)
+
+    def test_import(self):
+        ldb = LanguageDB(lang='af')
+        n1 = PartOfSpeech(name=u'Noun, ordinary', shortcut=u'n1')
+        ldb.add_part_of_speech(n1)
+        koei = Root(value=u'koei', pos_id=n1.id)
+        ldb.add_root(koei)
+        bome = SurfaceForm(value=u'bome', status='todo', frequency=4)
+        ldb.add_surface_form(bome)
+
+        counts = import_classified(ldb, Source(name=u'lexicon', import_user_id=1), self.filename, batch_size=2)
+        assert counts == (1, 2, 5)
+
+        noun = ldb.find(section='parts_of_speech', name=u'noun')[0]
+        boom = ldb.find(section='roots', value=u'boom')[0]
+        assert boom.pos_id == noun.id
+        assert ldb.find(section='roots', value=u'loop')[0].pos_id == 0
+
+        koeie = ldb.find(section='surface_forms', value=u'koeie')
+        assert len(koeie) == 1 and koeie[0].root_id == koei.id
+        assert koeie[0].status == 'classified'
+        assert ldb.find(section='surface_forms', value=u'boompie')[0].root_id == boom.id
+        assert ldb.find(section='surface_forms', value=u'bome') == [bome]
+        assert bome.root_id == boom.id and bome.status == 'classified' and bome.frequency == 4
+
+        # Nothing new the second time around
+        counts = import_classified(ldb, Source(name=u'lexicon again', import_user_id=1), self.filename)
+        assert counts == (0, 0, 0)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+import os
+import tempfile
+
+from spelt.importers.wordlist import SAMPLE_SIZE, detect_encoding, read_word_batches, read_word_counts
+
+class TestWordListReader(object):
+    """Unit test for the memory-mapped word list reader."""
+
+    def write_temp(self, data):
+        fd, filename = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, data)
+        os.close(fd)
+        return filename
+
+    def read_all(self, data, **kwargs):
+        filename = self.write_temp(data)
+        try:
+            return list(read_word_batches(filename, **kwargs))
+        finally:
+            os.remove(filename)
+
+    def test_detect_encoding(self):
+        assert detect_encoding('koeie\n') == ('utf-8', 0)
+        assert detect_encoding('\xef\xbb\xbfkoeie\n') == ('utf-8', 3)
+        assert detect_encoding(u'koeï\n'.encode('latin-1')) == ('latin-1', 0)
+        # A multi-byte character cut off at the end of the sample is fine
+        assert detect_encoding(u'boom\nkoeï'.encode('utf-8')[:-1]) == ('utf-8', 0)
+
+    def test_comments_and_blanks(self):
+        batches = self.read_all('# comment\nkoeie\n\n  # another\r\nvarkies\r\n')
+        assert batches == [[u'koeie', u'varkies']]
+
+    def test_encodings(self):
+        assert self.read_all(u'koeï\nboom\n'.encode('utf-8')) == [[u'koeï', u'boom']]
+        assert self.read_all(u'koeï\nboom\n'.encode('latin-1')) == [[u'koeï', u'boom']]
+        assert self.read_all('\xef\xbb\xbfboom') == [[u'boom']]
+        # A stray Latin-1 line after the part used to detect the encoding
+        data = u'koeï\n'.encode('utf-8') * SAMPLE_SIZE + u'boomï\n'.encode('latin-1')
+        words = sum(self.read_all(data), [])
+        assert words[0] == u'koeï' and words[-1] == u'boomï'
+
+    def test_empty(self):
+        assert self.read_all('') == []
+
+    def test_batches(self):
+        words = ['word%d' % (i) for i in range(1000)]
+        data = '\n'.join(words)
+        for chunk_size in (1, 7, 100, 1 << 20):
+            batches = self.read_all(data, batch_size=64, chunk_size=chunk_size)
+            assert max([len(b) for b in batches]) <= 64
+            assert sum(batches, []) == words
+
+    def test_word_counts(self):
+        filename = self.write_temp('boom\nkoeie\t5\nboom\n# 3\nkoeie\t2\nvark\tx\n')
+        try:
+            counts  = list(read_word_counts(filename))
+            batches = list(read_word_counts(filename, batch_size=3))
+        finally:
+            os.remove(filename)
+        # The malformed count column is dropped
+        assert counts == [(u'boom', 2), (u'koeie', 7), (u'vark', 1)]
+        assert batches == [(u'boom', 2), (u'koeie', 5), (u'koeie', 2), (u'vark', 1)]
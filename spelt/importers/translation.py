@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains readers that extract the translated (target language) text from
+PO, XLIFF and TMX files."""
+
+import re
+from lxml import etree
+
+from spelt.importers.corpus   import count_words
+from spelt.importers.wordlist import python_encoding
+
+XML_LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+PLACEHOLDER_RE = re.compile(ur"""
+      %(?:\([^)]*\))?[-+\#0-9.*$]*[hlLqjzt]*[a-zA-Z%] # printf: %s, %(name)s, %1$d
+    | \$\{[^}]*\}                                    # Variables: ${name}
+    | \{[^}]*\}                                      # Python/Java: {0}, {name}
+    | <[^>]*>                                        # Markup
+    | &(?:\#[0-9]+|\#x[0-9a-fA-F]+|[a-zA-Z]+);       # Entities
+    """, re.VERBOSE | re.UNICODE)
+"""Matches placeholders and markup that should not be tokenized."""
+
+ACCELERATOR_RE = re.compile(ur"(?<!\w)[&_~](?=[^\W\d_])", re.UNICODE)
+"""Matches accelerator markers at the start of a word, eg. "&File" or "_Open".
+Markers inside words ("snake_case", "R&D") are left alone."""
+
+INLINE_TEXT_TAGS = ('g', 'hi', 'mrk', 'pc', 'sub')
+"""Inline XLIFF/TMX elements whose content is translatable text. The content
+of other inline elements (ph, bpt, ept, it, x, ...) is native code."""
+
+PO_ESCAPES = {'n': u'\n', 't': u'\t', 'r': u'\r', '"': u'"', '\\': u'\\'}
+
+PO_CHARSET_RE = re.compile(r'charset=([-\w.:]+)', re.IGNORECASE)
+"""Matches the charset in the Content-Type of a PO header."""
+
+def clean_text(text):
+    """Replace placeholders and markup with spaces and remove accelerator
+        markers from the given text."""
+    text = PLACEHOLDER_RE.sub(u' ', text)
+    return ACCELERATOR_RE.sub(u'', text)
+
+def local_name(tag):
+    """Strip the namespace from an element's tag."""
+    if not isinstance(tag, basestring):
+        return None # Comments and processing instructions
+    return tag.rsplit('}', 1)[-1]
+
+def inline_text(elem):
+    """Get the translatable text in the given XLIFF/TMX element, leaving out
+        native code inside inline elements."""
+    parts = [elem.text or u'']
+    for child in elem:
+        if local_name(child.tag) in INLINE_TEXT_TAGS:
+            parts.append(inline_text(child))
+        else:
+            parts.append(u' ')
+        parts.append(child.tail or u'')
+    return u''.join(parts)
+
+def _unquote_po(line):
+    """Get the unescaped contents of the quoted string on a PO file line."""
+    start, end = line.find('"'), line.rfind('"')
+    if start < 0 or end <= start:
+        return u''
+    return re.sub(
+        r'\\(.)',
+        lambda m: PO_ESCAPES.get(m.group(1), m.group(1)),
+        line[start+1:end]
+    )
+
+def _po_entry_text(msgid, msgstrs, fuzzy):
+    """Get the translation of a PO entry, or None if it should be skipped."""
+    if not msgid or not u''.join(msgid) or fuzzy:
+        return None # The header or a fuzzy entry
+    text = u'\n'.join([u''.join(s) for s in msgstrs])
+    if not text.strip():
+        return None
+    return text
+
+def read_po_targets(filename):
+    """Read the translations from a PO file, one entry at a time.
+
+        The header, untranslated, fuzzy and obsolete entries are skipped.
+        Plural forms are joined with newlines. The file is decoded with the
+        charset in the header's Content-Type, or as UTF-8 if the header
+        doesn't name a known charset.
+
+        @rtype:  generator
+        @return: The translated text of every entry."""
+    msgid   = None
+    msgstrs = []
+    fuzzy   = False
+    current = None
+    encoding = 'utf-8'
+
+    f = open(filename, 'rb')
+    try:
+        for line in f:
+            # The keywords are ASCII, so the entry is finished (and the
+            # header read) before the line is decoded
+            line = line.strip()
+            new_entry = not line or line.startswith('#') or line.startswith('msgctxt') or line.startswith('msgid ')
+
+            if new_entry and msgstrs:
+                if msgid is not None and not u''.join(msgid):
+                    match = PO_CHARSET_RE.search(u''.join(msgstrs[0]))
+                    if match:
+                        encoding = python_encoding(match.group(1), encoding)
+                text = _po_entry_text(msgid, msgstrs, fuzzy)
+                if text:
+                    yield text
+                msgid, msgstrs, fuzzy, current = None, [], False, None
+
+            line = line.decode(encoding, 'replace')
+
+            if not line or line.startswith('#~'):
+                continue
+            if line.startswith('#'):
+                if line.startswith('#,') and 'fuzzy' in line:
+                    fuzzy = True
+                continue
+
+            if line.startswith('msgid '):
+                msgid = current = [_unquote_po(line)]
+            elif line.startswith('msgstr'):
+                current = [_unquote_po(line)]
+                msgstrs.append(current)
+            elif line.startswith('"') and current is not None:
+                current.append(_unquote_po(line))
+            elif line.startswith('msgctxt') or line.startswith('msgid_plural'):
+                current = [] # Not needed, but may continue on the next lines
+
+        text = _po_entry_text(msgid, msgstrs, fuzzy)
+        if text:
+            yield text
+    finally:
+        f.close()
+
+def _discard(elem):
+    """Clear an element that was parsed with iterparse() and remove its
+        (already discarded) earlier siblings, so that the parsed part of a
+        file doesn't keep growing in memory."""
+    elem.clear()
+    parent = elem.getparent()
+    while elem.getprevious() is not None:
+        del parent[0]
+
+def read_xliff_targets(filename):
+    """Read the target text of every translation unit in an XLIFF file.
+
+        The file is parsed incrementally and every translation unit is
+        discarded once it is read, so memory use doesn't grow with its size.
+        Targets with a state of "new" or "needs-translation" and the
+        alternative translations in <alt-trans> elements are skipped."""
+    for event, elem in etree.iterparse(filename, events=('end',)):
+        name = local_name(elem.tag)
+        if name == 'target':
+            if local_name(elem.getparent().tag) == 'alt-trans':
+                continue
+            if elem.get('state') not in ('new', 'needs-translation'):
+                yield inline_text(elem)
+        elif name in ('trans-unit', 'unit'):
+            _discard(elem)
+
+def _same_lang(lang, other):
+    """Whether the two language codes refer to the same language (the
+        region is ignored)."""
+    def base(code):
+        return code.lower().replace('_', '-').split('-')[0]
+    return base(lang) == base(other)
+
+def read_tmx_targets(filename, lang=None):
+    """Read the segments of the given language from a TMX file. Like
+        read_xliff_targets(), the file is parsed incrementally.
+
+        @type  lang: str
+        @param lang: The language code of the segments to read. (Default:
+            all languages except the header's source language)
+        """
+    srclang = None
+
+    for event, elem in etree.iterparse(filename, events=('end',)):
+        name = local_name(elem.tag)
+        if name == 'header':
+            srclang = elem.get('srclang')
+        elif name == 'tuv':
+            tuvlang = elem.get(XML_LANG) or elem.get('lang') or u''
+            if lang is not None:
+                wanted = _same_lang(tuvlang, lang)
+            else:
+                wanted = not srclang or srclang == '*all*' or not _same_lang(tuvlang, srclang)
+
+            if wanted:
+                for child in elem:
+                    if local_name(child.tag) == 'seg':
+                        yield inline_text(child)
+        elif name == 'tu':
+            _discard(elem)
+
+def read_po_counts(filename, normalize=None, tokenizer=None):
+    """Count the words in the translations of a PO file.
+        See L{spelt.importers.corpus.count_words}."""
+    return count_words((clean_text(t) for t in read_po_targets(filename)), normalize, tokenizer)
+
+def read_xliff_counts(filename, normalize=None, tokenizer=None):
+    """Count the words in the targets of an XLIFF file.
+        See L{spelt.importers.corpus.count_words}."""
+    return count_words((clean_text(t) for t in read_xliff_targets(filename)), normalize, tokenizer)
+
+def read_tmx_counts(filename, normalize=None, tokenizer=None, lang=None):
+    """Count the words in the target language segments of a TMX file.
+        See L{spelt.importers.corpus.count_words} and read_tmx_targets()."""
+    return count_words((clean_text(t) for t in read_tmx_targets(filename, lang)), normalize, tokenizer)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains an importer for pre-classified "form<TAB>root<TAB>pos" files."""
+
+from spelt.importers.wordlist  import BATCH_SIZE, read_word_batches
+from spelt.models.pos          import PartOfSpeech
+from spelt.models.root         import Root
+from spelt.models.surface_form import SurfaceForm
+from spelt.models.xml_model    import timestamp
+
+def import_classified(langdb, src, filename, batch_size=BATCH_SIZE):
+    """Import surface forms that are already classified.
+
+        Every line holds a surface form, its root and the root's part of
+        speech, separated by tabs. The part of speech (matched on name or
+        shortcut) may be left out. Lines without a root, blank lines and
+        lines starting with "#" are skipped.
+
+        Roots and parts of speech are resolved through in-memory maps and
+        created if they don't exist yet. Surface forms that are already in
+        the database (with the same root) are skipped, and unclassified
+        ("todo") surface forms are classified under their root through
+        L{LanguageDB.update_surface_form}. All new models are added with
+        L{LanguageDB.add_many}, a batch at a time.
+
+        @type  langdb:     spelt.models.LanguageDB
+        @param langdb:     The language database to import into.
+        @type  src:        spelt.models.Source
+        @param src:        The source to add for the file.
+        @type  filename:   basestring
+        @param filename:   The path of the file to import.
+        @type  batch_size: int
+        @param batch_size: The number of lines read per batch.
+        @rtype:            tuple
+        @return:           The number of parts of speech and roots added,
+            and the number of surface forms added or classified.
+        """
+    langdb.add_source(src)
+    user_id   = src.import_user_id
+    date      = timestamp() # Converted once for all new models
+    normalize = langdb.normalizer.normalize_many
+
+    pos_map = {}
+    for pos in langdb.parts_of_speech:
+        pos_map[pos.shortcut] = pos
+        pos_map[pos.name] = pos
+
+    root_map = {}
+    for key, roots in langdb.root_index.iteritems():
+        for root in roots:
+            root_map.setdefault((key, root.pos_id), root)
+
+    known = set()
+    for key, sforms in langdb.surface_form_index.iteritems():
+        for sf in sforms:
+            known.add((key, sf.root_id))
+
+    counts = [0, 0, 0]
+
+    for lines in read_word_batches(filename, batch_size=batch_size):
+        rows = [line.split(u'\t') for line in lines]
+        rows = [r for r in rows if len(r) > 1 and r[1].strip()]
+        forms = normalize([r[0].strip() for r in rows])
+        roots = normalize([r[1].strip() for r in rows])
+
+        new_pos    = []
+        new_roots  = []
+        new_sforms = []
+
+        for form, root_value, row in zip(forms, roots, rows):
+            pos_id = 0
+            pos_name = len(row) > 2 and row[2].strip() or u''
+            if pos_name:
+                pos = pos_map.get(pos_name)
+                if pos is None:
+                    pos = pos_map[pos_name] = PartOfSpeech(name=pos_name, shortcut=pos_name, id=langdb.new_id('parts_of_speech'))
+                    new_pos.append(pos)
+                pos_id = pos.id
+
+            root = root_map.get((root_value, pos_id))
+            if root is None:
+                root = root_map[(root_value, pos_id)] = Root(value=root_value, pos_id=pos_id, user_id=user_id, date=date, id=langdb.new_id('roots'))
+                new_roots.append(root)
+
+            if not form or (form, root.id) in known:
+                continue
+            known.add((form, root.id))
+
+            todo = langdb.surface_form_keys.get((form, 0))
+            if todo is not None and todo.status == 'todo':
+                langdb.update_surface_form(todo, root_id=root.id, status='classified', user_id=user_id)
+                counts[2] += 1
+                continue
+            new_sforms.append(SurfaceForm(
+                value=form, status='classified', user_id=user_id, date=date,
+                source_id=src.id, root_id=root.id
+            ))
+
+        langdb.add_many('parts_of_speech', new_pos)
+        langdb.add_many('roots', new_roots)
+        langdb.add_many('surface_forms', new_sforms)
+        counts[0] += len(new_pos)
+        counts[1] += len(new_roots)
+        counts[2] += len(new_sforms)
+
+    return tuple(counts)
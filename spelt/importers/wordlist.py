@@ -0,0 +1,210 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+"""Contains a fast reader for "one word per line" word lists."""
+
+import codecs
+import mmap
+import os
+
+BATCH_SIZE  = 10000
+"""The default maximum number of words handed back per batch."""
+CHUNK_SIZE  = 1 << 20
+"""The (approximate) number of bytes split into lines in one go."""
+SAMPLE_SIZE = 1 << 16
+"""The number of bytes from the start of a file used to detect its encoding."""
+
+ENCODING_MAP = {
+    'microsoft-cp1251' : 'cp1251',
+    'tis620-2533'      : 'tis-620',
+    'iscii-devanagari' : 'utf-8'
+}
+"""Maps encoding names that Python doesn't know (eg. from Hunspell .aff files)
+to Python codecs."""
+
+def python_encoding(name, default='iso8859-1'):
+    """Get the Python codec for the given encoding name, eg. a Hunspell "SET"
+        or the charset of a PO file. Unknown encodings fall back to the
+        default (ISO-8859-1 is Hunspell's default)."""
+    name = ENCODING_MAP.get(name.lower(), name)
+    try:
+        return codecs.lookup(name).name
+    except LookupError:
+        return default
+
+def detect_encoding(data):
+    """Detect the encoding of a word list from the first bytes in the file.
+
+        Only UTF-8 (with or without a byte order mark) and Latin-1 are
+        considered, because those are the only encodings that the old
+        line-by-line importer accepted.
+
+        @type  data: str
+        @param data: The first bytes of the file.
+        @rtype:      tuple
+        @return:     An (encoding, offset) pair, where offset is the number of
+            bytes (a byte order mark) to skip at the start of the file."""
+    if data.startswith(codecs.BOM_UTF8):
+        return 'utf-8', len(codecs.BOM_UTF8)
+
+    # Only look at complete lines, so that a multi-byte sequence cut off at
+    # the end of the sample isn't mistaken for an encoding error.
+    end = data.rfind('\n')
+    if end >= 0:
+        data = data[:end]
+
+    try:
+        data.decode('utf-8')
+    except UnicodeDecodeError:
+        return 'latin-1', 0
+
+    return 'utf-8', 0
+
+def split_words(chunk, encoding):
+    """Decode a chunk of complete lines and return the words it contains.
+
+        Blank lines and comments (lines starting with "#") are skipped. If the
+        chunk can not be decoded as a whole, every line that fails is decoded
+        as Latin-1 on its own.
+
+        @type  chunk:    str
+        @param chunk:    Raw bytes containing only complete lines.
+        @type  encoding: str
+        @param encoding: The encoding as returned by detect_encoding().
+        @rtype:          list
+        @return:         A list of unicode words."""
+    try:
+        lines = chunk.decode(encoding).split(u'\n')
+    except UnicodeDecodeError:
+        lines = []
+        for line in chunk.split('\n'):
+            try:
+                lines.append(line.decode(encoding))
+            except UnicodeDecodeError:
+                lines.append(line.decode('latin-1'))
+
+    words = [line.strip() for line in lines]
+    return [w for w in words if w and not w.startswith(u'#')]
+
+def read_word_batches(filename, batch_size=BATCH_SIZE, chunk_size=CHUNK_SIZE, offset=0):
+    """Read a "one word per line" word list in batches.
+
+        The file is memory-mapped and split into lines a chunk at a time. Its
+        encoding is detected once, from the start of the file.
+
+        @type  filename:   basestring
+        @param filename:   The path of the word list to read.
+        @type  batch_size: int
+        @param batch_size: The maximum number of words per batch.
+        @type  chunk_size: int
+        @param chunk_size: The number of bytes after which a chunk is split
+            off at the next line break.
+        @type  offset:     int
+        @param offset:     The number of bytes to skip at the start of the
+            file, eg. to only read lines appended since an earlier import. It
+            should be the position just after a line break.
+        @rtype:            generator
+        @return:           Lists of unicode words in file order."""
+    assert batch_size > 0 and chunk_size > 0
+
+    f = open(filename, 'rb')
+    try:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return # mmap() refuses to map empty files
+
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            encoding, pos = detect_encoding(mm[:SAMPLE_SIZE])
+            pos = max(pos, offset)
+
+            while pos < size:
+                end = pos + chunk_size
+                if end < size:
+                    end = mm.find('\n', end) + 1 or size
+                else:
+                    end = size
+
+                words = split_words(mm[pos:end], encoding)
+                pos = end
+
+                for i in xrange(0, len(words), batch_size):
+                    yield words[i:i+batch_size]
+        finally:
+            mm.close()
+    finally:
+        f.close()
+
+def parse_count(word):
+    """Split a "word<TAB>count" line into its parts.
+
+        A count column that isn't a positive number is dropped, so that it
+        doesn't become part of the word.
+
+        @rtype:  tuple
+        @return: A (word, count) pair. The count is 1 if the line contains no
+            (valid) count."""
+    if u'\t' not in word:
+        return word, 1
+
+    word, count = word.split(u'\t', 1)
+    try:
+        count = int(count)
+    except ValueError:
+        count = 0
+    return word.rstrip(), max(count, 1)
+
+def read_word_counts(filename, normalize=None, **kwargs):
+    """Read a word list and count the occurrences of the words in every
+        batch.
+
+        Lines may be plain words or "word<TAB>count" pairs (or a mix of
+        both). Counts for words repeated within a batch are added up. Only
+        one batch is counted at a time, so a word that is repeated in a
+        later batch is handed back again; the caller adds up those counts
+        (see LanguageDB.import_source()). Keyword arguments are passed on to
+        read_word_batches().
+
+        @type  normalize: callable
+        @param normalize: Called with every batch of words (a list) and
+            returns the list of normalized words. Words are counted after
+            normalization. See L{spelt.common.normalize.Normalizer.normalize_many}.
+
+        @rtype:  generator
+        @return: (word, count) pairs in the order that the words first appear
+            in each batch."""
+    for words in read_word_batches(filename, **kwargs):
+        pairs = [parse_count(w) for w in words]
+        if normalize is not None:
+            pairs = zip(normalize([p[0] for p in pairs]), [p[1] for p in pairs])
+
+        counts = {}
+        order  = []
+        for word, count in pairs:
+            if not word:
+                continue
+            if word in counts:
+                counts[word] += count
+            else:
+                counts[word] = count
+                order.append(word)
+
+        for word in order:
+            yield word, counts[word]
@@ -24,16 +24,19 @@ from pos           import PartOfSpeech
 from root          import Root
 from source        import Source
 from surface_form  import SurfaceForm
+from surface_form_store import SurfaceFormStore
 from user          import User
-from xml_model     import XMLModel
+from xml_model     import DatedModel, XMLModel
 
 __all__ = [
+    'DatedModel',
     'LanguageDB',
     'ModelFactory',
     'PartOfSpeech',
     'Root',
     'Source',
     'SurfaceForm',
+    'SurfaceFormStore',
     'User',
     'XMLModel'
 ]
@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+class IDAllocator(object):
+    """
+    Hands out the unique ID's of the models in one section of a language
+    database.
+
+    Used ID's are kept in a bitmap (one bit per ID up to the highest ID used)
+    along with a high-water mark, so allocating, claiming, releasing and
+    testing an ID all take constant time. Every LanguageDB has its own
+    allocators, so any number of databases can be open at once.
+
+    The high-water mark never drops (until clear()), so allocate() doesn't
+    hand out a released ID again: a model that was removed can't be
+    mistaken for a new one with the same ID. Released ID's can still be
+    claimed explicitly, and a database that is saved and loaded again
+    allocates from its highest remaining ID.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self):
+        self.bitmap = bytearray()
+        self.high   = 0
+        """The highest ID that was allocated or claimed."""
+        self.count  = 0
+        """The number of ID's in use."""
+
+    # METHODS #
+    def allocate(self):
+        """Get a new, unused ID. The ID is marked as used.
+            @rtype:  int
+            @return: One more than the highest ID that was ever in use."""
+        id = self.high + 1
+        self.claim(id)
+        return id
+
+    def claim(self, id):
+        """Mark the given ID as used.
+            @type  id: int
+            @param id: The ID to claim (> 0).
+            @rtype:    bool
+            @return:   False if the ID was already in use."""
+        assert id > 0
+        byte, bit = id >> 3, 1 << (id & 7)
+        bitmap = self.bitmap
+
+        if byte >= len(bitmap):
+            # Grow geometrically to keep claiming ascending ID's cheap
+            bitmap.extend('\0' * max(byte + 1 - len(bitmap), len(bitmap)))
+        elif bitmap[byte] & bit:
+            return False
+
+        bitmap[byte] |= bit
+        self.count += 1
+        if id > self.high:
+            self.high = id
+        return True
+
+    def clear(self):
+        """Release all ID's."""
+        self.bitmap = bytearray()
+        self.high   = 0
+        self.count  = 0
+
+    def is_used(self, id):
+        """Check whether the given ID is in use."""
+        byte = id >> 3
+        return 0 <= byte < len(self.bitmap) and bool(self.bitmap[byte] & (1 << (id & 7)))
+
+    def release(self, id):
+        """Mark the given ID as unused, so that it may be claimed again.
+            It isn't allocated again (see the class docstring).
+            @rtype:  bool
+            @return: False if the ID was not in use."""
+        if not self.is_used(id):
+            return False
+
+        self.bitmap[id >> 3] &= ~(1 << (id & 7)) & 0xff
+        self.count -= 1
+        return True
+
+    # SPECIAL METHODS #
+    def __contains__(self, id):
+        return self.is_used(id)
+
+    def __len__(self):
+        return self.count
@@ -22,16 +22,32 @@
 
 import datetime
 import os.path
-from lxml import etree, objectify
+import re
+import warnings
+from copy import deepcopy
+from itertools import imap, repeat
+from operator import and_, attrgetter, eq
+from lxml import etree
 
 from spelt.common import *
+from spelt.common.collation      import Collator
+from spelt.common.normalize      import Normalizer
+from spelt.importers.corpus      import is_gzipped
+from spelt.importers.external    import PAIR_READERS, external_counts
+from spelt.importers.fingerprint import fingerprint
+from spelt.importers.formats     import APPENDABLE, READERS, guess_format
+from spelt.importers.wordlist    import BATCH_SIZE
 
+from spelt.models.id_allocator  import IDAllocator
 from spelt.models.model_factory import ModelFactory
+from spelt.models.ordered_index import OrderedIndex
 from spelt.models.pos           import PartOfSpeech
 from spelt.models.root          import Root
 from spelt.models.source        import Source
-from spelt.models.surface_form  import SurfaceForm
+from spelt.models.surface_form  import SurfaceForm, VALID_STATUSES
+from spelt.models.surface_form_store import SurfaceFormStore
 from spelt.models.user          import User
+from spelt.models.xml_model     import Interner, timestamp
 
 class LanguageDB(object):
     """
@@ -40,8 +56,11 @@ class LanguageDB(object):
 
     FILE_EXTENSION = 'xldb' # The normal extension of language database files.
 
-    cache = {}
-    """Used to cache the XML tree."""
+    TODO_ORDERS = ('id', 'frequency', 'alphabetical', 'source', 'length', 'prefix')
+    """The orders of todo_index() (see order_key())."""
+    PREFIX_LENGTH = 3
+    """The length of the prefixes that words are grouped by in the "prefix" order."""
+
     model_list_map = {
         'part_of_speech' : 'parts_of_speech',
         'root'           : 'roots',
@@ -67,14 +86,42 @@ class LanguageDB(object):
 
     # CONSTRUCTOR #
     # TODO: Use file object instead of forcing opening from filename
-    def __init__(self, lang=None, filename=None):
+    def __init__(self, lang=None, filename=None, normalizer=None, columnar=False):
         """Constructor.
-            @type  lang: str
-            @param lang: ISO 639 language code.
+            @type  lang:       str
+            @param lang:       ISO 639 language code.
+            @type  normalizer: spelt.common.normalize.Normalizer
+            @param normalizer: Used to normalize imported words and the keys
+                of the value indexes. (Default: NFC without folding)
+            @type  columnar:   bool
+            @param columnar:   Keep the surface forms in a L{SurfaceFormStore}
+                instead of as separate models. The database then holds views
+                of the added surface forms rather than the added models
+                themselves. (Default: False)
             """
         self.filename = None
         self.lang = lang
-        self.root_hashes = {}
+        self.normalizer = normalizer or Normalizer()
+        self.pos_by_name = {}
+        """Maps the names of parts of speech, and their lower case versions,
+        to lists of parts of speech."""
+        self.pos_by_shortcut = {}
+        """Maps the shortcuts of parts of speech, and their lower case versions,
+        to lists of parts of speech."""
+        self.root_index = {}
+        self.surface_form_index = {}
+        self.surface_form_keys = {}
+        """Maps (value, root_id) pairs to surface forms, which have to be unique."""
+        self._frequency_order = None
+        self.status_counts = {}
+        """Maps statuses to the number of surface forms with that status."""
+        self.source_counts = {}
+        """Maps source ID's to status counts of the source's surface forms."""
+        self.user_counts = {}
+        """Maps user ID's to status counts of the user's surface forms."""
+        self.todo_indexes = {}
+        """The indexes of to-do surface forms that were asked for with
+        todo_index(), by (order, source_id, user_id, prefix, regex)."""
         self.sections = dict(
             zip(
                 self.model_list_map.values(),
@@ -87,6 +134,24 @@ class LanguageDB(object):
                 map(lambda x: dict(), self.model_list_map.values())
             )
         )
+        self.columnar = columnar
+        if columnar:
+            store = SurfaceFormStore()
+            self.sections['surface_forms'] = store
+            self.section_ids['surface_forms'] = store.by_id
+        self.id_allocators = dict(
+            zip(
+                self.model_list_map.values(),
+                map(lambda x: IDAllocator(), self.model_list_map.values())
+            )
+        )
+        self.reserved_ids = dict(
+            zip(
+                self.model_list_map.values(),
+                map(lambda x: set(), self.model_list_map.values())
+            )
+        )
+        """The ID's handed out by new_id() that no model was added with yet."""
 
         if not filename is None and os.path.exists(filename):
             self.load(filename)
@@ -95,6 +160,94 @@ class LanguageDB(object):
             self.__create_root()
 
     # METHODS #
+    def add_many(self, section, models):
+        """Add a batch of models to the given section of the database.
+
+            This is the same as calling the appropriate add_*() method for
+            every model, but the indexes are updated in one go. If any of the
+            models is a duplicate, none of them are added (and models without
+            an ID don't get one). The values of roots and surface forms are
+            normalized with self.normalizer.
+
+            @type  section: str
+            @param section: One of model_list_map.values().
+            @type  models:  list
+            @param models:  The models to add.
+            """
+        if section not in self.model_list_map.values():
+            raise exceptions.InvalidSectionError(section)
+
+        models = list(models)
+        if not models:
+            return
+
+        # Validate the whole batch before anything is added
+        tags = set([m.tag for m in models])
+        if len(tags) > 1 or self.model_list_map.get(tags.pop()) != section:
+            for model in models:
+                if self.model_list_map.get(model.tag) != section:
+                    raise exceptions.UnknownModelError(str(model))
+
+        ids = self.section_ids[section]
+        new_ids = [m.id for m in models if m.id]
+        unique_ids = set(new_ids)
+        if len(unique_ids) != len(new_ids):
+            raise exceptions.DuplicateModelError(_('Duplicate ID in batch for section %s') % (section))
+        used_ids = unique_ids.intersection(ids)
+        if used_ids:
+            raise exceptions.DuplicateModelError(str(ids[used_ids.pop()]))
+        allocator = self.id_allocators[section]
+        used_ids = [i for i in unique_ids.difference(self.reserved_ids[section]) if i in allocator]
+        if used_ids:
+            raise exceptions.IDUsedError(_('ID %d is already in use in section %s') % (used_ids[0], section))
+
+        values = None
+        if section in ('roots', 'surface_forms'):
+            values = self.normalizer.normalize_many([m.value for m in models])
+        if section == 'surface_forms':
+            keys = zip(values, [m.root_id for m in models])
+            if len(set(keys)) != len(keys):
+                raise exceptions.DuplicateModelError(_('Duplicate surface form in batch'))
+            for key in keys:
+                if key in self.surface_form_keys:
+                    raise exceptions.DuplicateModelError(str(self.surface_form_keys[key]))
+
+        for model in models:
+            self._claim_id(section, model)
+        if values is not None:
+            for model, value in zip(models, values):
+                if model.value != value:
+                    model.value = value
+
+        # Every index is updated in one call per batch
+        ids.update([(m.id, m) for m in models])
+        self.sections[section].update(models)
+        if self.columnar and section == 'surface_forms':
+            models = [ids[m.id] for m in models]
+
+        if section == 'parts_of_speech':
+            for pos in models:
+                self._map_pos(pos, True)
+            index = None
+        elif section == 'roots':
+            index = self.root_index
+        elif section == 'surface_forms':
+            index = self.surface_form_index
+            self.surface_form_keys.update(zip(keys, models))
+            self._frequency_order = None
+            for model in models:
+                self._count(model, 1)
+            if self.todo_indexes:
+                todo = [m for m in models if m.status == 'todo']
+                for todo_index in self.todo_indexes.values():
+                    todo_index.update(todo)
+        else:
+            index = None
+
+        if index is not None:
+            for key, model in zip(values, models):
+                index.setdefault(key, []).append(model)
+
     def add_part_of_speech(self, pos):
         """Add a part of speech to the database.
             @type  pos: PartOfSpeech
@@ -104,9 +257,10 @@ class LanguageDB(object):
         if self.parts_of_speech_ids.has_key(pos.id):
             raise exceptions.DuplicateModelError(str(pos))
 
+        self._claim_id('parts_of_speech', pos)
         self.parts_of_speech_ids[pos.id] = pos
         self.parts_of_speech.add(pos)
-        self.xmlroot.parts_of_speech.append(pos.elem)
+        self._map_pos(pos, True)
 
     def add_root(self, root):
         """Add a word root to the database.
@@ -116,10 +270,11 @@ class LanguageDB(object):
         if self.roots_ids.has_key(root.id):
             raise exceptions.DuplicateModelError(str(root))
 
+        self._claim_id('roots', root)
+        root.value = self.normalizer(root.value)
         self.roots_ids[root.id] = root
-        self.root_hashes[hash(root.value)] = root
+        self.root_index.setdefault(root.value, []).append(root)
         self.roots.add(root)
-        self.xmlroot.roots.append(root.elem)
 
     def add_source(self, src):
         """Add a source to the database.
@@ -127,11 +282,12 @@ class LanguageDB(object):
             @param src: The source model to add to the database.
             """
         assert isinstance(src, Source)
-        if src in self.sources:
+        if self.sources_ids.has_key(src.id):
             raise exceptions.DuplicateModelError(str(src))
 
+        self._claim_id('sources', src)
+        self.sources_ids[src.id] = src
         self.sources.add(src)
-        self.xmlroot.sources.append(src.elem)
 
     def add_surface_form(self, sf):
         """Add a surface form model to the database.
@@ -139,12 +295,22 @@ class LanguageDB(object):
             @param sf: The surface form model to add to the database.
             """
         #assert isinstance(sf, SurfaceForm)
+        key = (self.normalizer(sf.value), sf.root_id)
         if self.surface_forms_ids.has_key(sf.id):
             raise exceptions.DuplicateModelError(str(sf))
+        if key in self.surface_form_keys:
+            raise exceptions.DuplicateModelError(str(self.surface_form_keys[key]))
 
+        self._claim_id('surface_forms', sf)
+        if sf.value != key[0]:
+            sf.value = key[0]
         self.surface_forms_ids[sf.id] = sf
+        sf = self.surface_forms_ids[sf.id] # The store's view, if columnar
+        self.surface_form_keys[key] = sf
+        self.surface_form_index.setdefault(key[0], []).append(sf)
         self.surface_forms.add(sf)
-        self.xmlroot.surface_forms.append(sf.elem)
+        self._frequency_order = None
+        self._track(sf, 1)
 
     def add_user(self, usr):
         """Add a user to the database.
@@ -155,15 +321,323 @@ class LanguageDB(object):
         if self.users_ids.has_key(usr.id):
             raise exceptions.DuplicateModelError(str(usr))
 
+        self._claim_id('users', usr)
         self.users_ids[usr.id] = usr
         self.users.add(usr)
-        self.xmlroot.users.append(usr.elem)
+
+    def close(self):
+        """Discard all models and release their ID's.
+
+            Models don't have finalizers, so this is cheap even for very large
+            databases. The (now empty) database can still be used afterwards,
+            eg. to load() another file."""
+        for section in self.model_list_map.values():
+            self.sections[section].clear()
+            self.section_ids[section].clear()
+            self.id_allocators[section].clear()
+            self.reserved_ids[section].clear()
+
+        self.pos_by_name.clear()
+        self.pos_by_shortcut.clear()
+        self.root_index.clear()
+        self.surface_form_index.clear()
+        self.surface_form_keys.clear()
+        self._frequency_order = None
+        self.status_counts.clear()
+        self.source_counts.clear()
+        self.user_counts.clear()
+        for index in self.todo_indexes.values():
+            index.reset([])
+
+    def new_id(self, section):
+        """Reserve a new ID for a model in the given section.
+
+            This is only needed when a model's ID has to be known before it is
+            added, eg. to refer to a new root from new surface forms. Models
+            added without an ID get one automatically.
+
+            @type  section: str
+            @param section: One of model_list_map.values().
+            @rtype:         int
+            @return:        An ID that is not used by any model in the section."""
+        id = self.id_allocators[section].allocate()
+        self.reserved_ids[section].add(id)
+        return id
+
+    def release_id(self, section, id):
+        """Give back an ID that was reserved with new_id(), if no model was
+            added with it.
+            @rtype:  bool
+            @return: False if the ID wasn't reserved (eg. a model was added
+                with it)."""
+        reserved = self.reserved_ids[section]
+        if id not in reserved:
+            return False
+        reserved.remove(id)
+        self.id_allocators[section].release(id)
+        return True
+
+    def order_key(self, order):
+        """Get the sort key function of one of TODO_ORDERS:
+             - "id": in the order the words were added;
+             - "frequency": most frequent words first;
+             - "alphabetical": in the language's collation order (see
+               L{spelt.common.collation.Collator});
+             - "source": by source, and in the order they were added within a
+               source;
+             - "length": shortest words first;
+             - "prefix": grouped by their first PREFIX_LENGTH letters (in
+               collation order) and most frequent words first in a group.
+            Every key ends with the surface form's ID, so keys are unique.
+
+            @type  order: str
+            @param order: One of TODO_ORDERS.
+            @rtype:       callable"""
+        if order == 'id':
+            return lambda sf: sf.id
+        if order == 'frequency':
+            return lambda sf: (-sf.frequency, sf.id)
+        if order == 'source':
+            return lambda sf: (sf.source_id, sf.id)
+        if order == 'length':
+            return lambda sf: (len(sf.value), sf.id)
+
+        collate = Collator(self.lang)
+        if order == 'alphabetical':
+            return lambda sf: (collate(sf.value), sf.id)
+        if order == 'prefix':
+            n = self.PREFIX_LENGTH
+            return lambda sf: (collate(sf.value[:n]), -sf.frequency, sf.id)
+        raise ValueError(_('Unknown order: %s') % (order))
+
+    def find_parts_of_speech(self, shortcut=None, name=None):
+        """Get the parts of speech with the given shortcut or name, like
+            find() with these keywords but without scanning. If none match
+            exactly, they are matched case-insensitively.
+
+            @rtype: list"""
+        for case in (lambda text: text, lambda text: text.lower()):
+            found = []
+            for pos_map, key in ((self.pos_by_shortcut, shortcut), (self.pos_by_name, name)):
+                if key is None:
+                    continue
+                key = case(key)
+                for pos in pos_map.get(key, ()):
+                    if pos not in found and key in (case(pos.shortcut or u''), case(pos.name or u'')):
+                        found.append(pos)
+            if found:
+                return found
+        return []
+
+    def release_todo_index(self, index):
+        """Stop maintaining the given filtered to-do index. The unfiltered
+            indexes of every order are always kept."""
+        for key, other in self.todo_indexes.items():
+            if other is index and key[1:] != (None, None, None, None):
+                del self.todo_indexes[key]
+
+    def todo_index(self, order='id', source_id=None, user_id=None, prefix=None, regex=None):
+        """Get the surface forms with status "todo" in the given order,
+            optionally only those that match all of the given filters.
+
+            The index is created the first time it is asked for and then kept
+            up to date as surface forms are added, removed and changed (see
+            L{update_surface_form}), so it is never sorted again. Filtered
+            indexes are copied without sorting from the smallest kept index
+            of the same order that contains all matching forms (so typing a
+            prefix narrows the previous prefix's index), with each filter
+            tested in a single pass over that index's values or models.
+            They are kept until they are released with L{release_todo_index}.
+
+            @type  order:     str
+            @param order:     One of TODO_ORDERS. (Default: "id")
+            @type  source_id: int
+            @param source_id: Only words from this source.
+            @type  user_id:   int
+            @param user_id:   Only words imported (or last changed) by this user.
+            @type  prefix:    basestring
+            @param prefix:    Only words starting with this prefix.
+            @type  regex:     basestring
+            @param regex:     Only words in which this regular expression is
+                found (see re.search()).
+            @rtype:           spelt.models.ordered_index.OrderedIndex
+            @raise re.error:  If the regular expression is invalid."""
+        if prefix:
+            prefix = self.normalizer(prefix)
+        key = (order, source_id, user_id, prefix or None, regex or None)
+        index = self.todo_indexes.get(key)
+        if index is not None:
+            return index
+
+        if key[1:] == (None, None, None, None):
+            index = OrderedIndex(self.order_key(order), self.surface_forms_with_status('todo'))
+            self.todo_indexes[key] = index
+            return index
+
+        base = self.todo_index(order)
+        for other_key, other in self.todo_indexes.items():
+            if other_key[0] == order and len(other) < len(base) and \
+                    other_key[1] in (None, source_id) and \
+                    other_key[2] in (None, user_id) and \
+                    (other_key[3] is None or (prefix or u'').startswith(other_key[3])) and \
+                    other_key[4] in (None, regex):
+                base = other
+
+        # Each filter is a test for single surface forms (used to keep the
+        # index up to date) and a list of the test's results for every
+        # surface form in base, computed without calling Python code per form
+        tests, masks = [], []
+        for attr, id in (('source_id', source_id), ('user_id', user_id)):
+            if id is not None:
+                tests.append(lambda sf, attr=attr, id=id: getattr(sf, attr) == id)
+                masks.append(imap(eq, imap(attrgetter(attr), base.models), repeat(id)))
+        if prefix:
+            tests.append(lambda sf: sf.value.startswith(prefix))
+            masks.append(imap(unicode.startswith, base.values, repeat(prefix)))
+        if regex:
+            search = re.compile(regex, re.UNICODE).search
+            tests.append(lambda sf: search(sf.value) is not None)
+            masks.append(imap(search, base.values))
+
+        mask = masks.pop()
+        if masks:
+            mask = reduce(lambda a, b: imap(and_, a, imap(bool, b)), masks, imap(bool, mask))
+        predicate = lambda sf: all([test(sf) for test in tests])
+        index = base.filtered(predicate, list(mask))
+        self.todo_indexes[key] = index
+        return index
+
+    def update_surface_form(self, sf, value=None, root_id=None, status=None, user_id=None, frequency=None):
+        """Change the value, root, status, user and/or frequency of a surface
+            form in the database.
+
+            Use this instead of setting the fields directly, so that the value
+            and (value, root_id) indexes, the status counters and the to-do
+            indexes stay up to date. Other fields can be set directly.
+
+            @type  sf:      SurfaceForm
+            @param sf:      A surface form in the database (as returned by
+                find(), for columnar databases).
+            @type  value:   basestring
+            @param value:   The new value. (Default: None - unchanged)
+            @type  root_id: int
+            @param root_id: The ID of the new root. (Default: None - unchanged)
+            @type  status:  str
+            @param status:  The new status. (Default: None - unchanged)
+            @type  user_id: int
+            @param user_id: The ID of the user that changed the surface form.
+                (Default: None - unchanged)
+            @type  frequency: int
+            @param frequency: The new frequency. (Default: None - unchanged)
+            @raise exceptions.DuplicateModelError: If another surface form
+                already has the new value and root. Nothing is changed then."""
+        old_key = (sf.value, sf.root_id)
+        if value is None:
+            value = sf.value
+        if root_id is None:
+            root_id = sf.root_id
+        new_key = (self.normalizer(value), root_id)
+
+        if new_key != old_key:
+            other = self.surface_form_keys.get(new_key)
+            if other is not None and other is not sf:
+                raise exceptions.DuplicateModelError(str(other))
+
+        if new_key == old_key and status is None and user_id is None and frequency is None:
+            return
+
+        self._track(sf, -1)
+        if status is not None:
+            sf.status = status
+        if user_id is not None:
+            sf.user_id = user_id
+        if frequency is not None:
+            sf.frequency = frequency
+            self._frequency_order = None
+
+        if new_key != old_key:
+            if self.surface_form_keys.get(old_key) is sf:
+                del self.surface_form_keys[old_key]
+
+            if new_key[0] != old_key[0]:
+                index = self.surface_form_index
+                key = self.normalizer(old_key[0])
+                models = [m for m in index.get(key, []) if m is not sf]
+                if models:
+                    index[key] = models
+                elif key in index:
+                    del index[key]
+                index.setdefault(self.normalizer(new_key[0]), []).append(sf)
+
+            sf.value, sf.root_id = new_key
+            self.surface_form_keys[new_key] = sf
+        self._track(sf, 1)
+
+    def _claim_id(self, section, model):
+        """Register the model's ID with the section's ID allocator, or assign
+            a new ID if it doesn't have one yet.
+
+            @raise exceptions.IDUsedError: If the model's ID is already in use
+                (and wasn't reserved with new_id())."""
+        reserved = self.reserved_ids[section]
+        if not model.id:
+            model.id = self.id_allocators[section].allocate()
+        elif model.id in reserved:
+            reserved.remove(model.id)
+        elif not self.id_allocators[section].claim(model.id):
+            raise exceptions.IDUsedError(str(model))
+
+    def _map_pos(self, pos, add):
+        """Add the given part of speech to (or remove it from) pos_by_name and
+            pos_by_shortcut."""
+        for pos_map, key in ((self.pos_by_name, pos.name), (self.pos_by_shortcut, pos.shortcut)):
+            if not key:
+                continue
+            for key in set([key, key.lower()]):
+                models = [m for m in pos_map.get(key, []) if m is not pos]
+                if add:
+                    models.append(pos)
+                if models:
+                    pos_map[key] = models
+                elif key in pos_map:
+                    del pos_map[key]
+
+    def _count(self, sf, n):
+        """Add n to the status counters of the given surface form's status,
+            source and user."""
+        status = sf.status
+        count = self.status_counts.get(status, 0) + n
+        if count:
+            self.status_counts[status] = count
+        else:
+            del self.status_counts[status]
+        for section_counts, id in ((self.source_counts, sf.source_id), (self.user_counts, sf.user_id)):
+            counts = section_counts.setdefault(id, {})
+            count = counts.get(status, 0) + n
+            # Zero counts are dropped, so that reindex() gives the same result
+            if count:
+                counts[status] = count
+            else:
+                del counts[status]
+                if not counts:
+                    del section_counts[id]
+
+    def _track(self, sf, n):
+        """Add (n=1) or remove (n=-1) a single surface form to or from the
+            status counters and to-do indexes."""
+        self._count(sf, n)
+        if sf.status == 'todo':
+            for index in self.todo_indexes.values():
+                if n > 0:
+                    index.insert(sf)
+                else:
+                    index.remove(sf)
 
     def elem_is_xml_comment(self, elem):
         """Checks whether the parameter represents an XML comment (eg.
             "<!-- this is a XML comment. -->")
             """
-        return isinstance(elem, objectify.StringElement) and elem.tag == 'comment' and str(elem) == ''
+        return elem.tag is etree.Comment
 
     def find(self, id=0, section=None, **kwargs):
         """A generic method to find any of the models contained in the current language database.
@@ -191,13 +665,12 @@ class LanguageDB(object):
                 pass # If we couldn't find the model the "fast" way, search for it like in the olden times
 
         # Special case: if section="roots" and the "value" parameter is given,
-        # use self.root_hashes to speed things up.
+        # use the normalized value index to speed things up. The same goes
+        # for surface forms if "value" is the only parameter.
         if section == 'roots' and kwargs.has_key('value'):
-            try:
-                return [ self.root_hashes[hash(kwargs['value'])] ]
-            except KeyError:
-                return []
-                pass # Fall back to default search if we couldn't find the root via the hash-table
+            return list(self.root_index.get(self.normalizer(kwargs['value']), []))
+        if section == 'surface_forms' and not id and kwargs.keys() == ['value']:
+            return list(self.surface_form_index.get(self.normalizer(kwargs['value']), []))
 
         sections = section and [getattr(self, section)] or [getattr(self, s) for s in self.model_list_map.values()]
         models = []
@@ -214,91 +687,358 @@ class LanguageDB(object):
 
         return models
 
-    def import_source(self, src, filename=None):
-        """Import the words from the given source on a "one word per line"
-            basis. The parameter source is also added to the database.
+    def import_source(self, src, filename=None, format=None, memory_limit=None, **kwargs):
+        """Import the words from the given source. The parameter source is
+            also added to the database.
+
+            For word lists ("one word per line"), blank lines and lines
+            starting with "#" are skipped. Lines may also contain
+            "word<TAB>count" pairs. Corpora (running text, optionally gzipped)
+            are tokenized and the words counted.
+
+            Words are normalized with self.normalizer and every distinct word
+            that is not already in the database is added once, with its count
+            as its frequency. The count of a word that is already in the
+            database is added to the frequency of one of its surface forms:
+            the one without a root if there is one, or else the oldest one
+            (a word classified under several roots is only counted once). See
+            L{spelt.importers.formats}. The new surface forms are added in
+            batches with add_many().
+
+            If memory_limit is given, words are counted out of core (see
+            L{spelt.importers.external.external_counts}), for word lists and
+            corpora with more distinct words than fit in memory. This only
+            bounds the counting: the surface forms that are added are kept
+            in the database (and in memory) like any others.
+
+            The size and SHA-1 digest of the file are stored in the source.
+            If a source with the same fingerprint was imported before, nothing
+            is imported. If the file is an earlier imported word list or
+            corpus with lines appended to it, only the new lines are read and
+            the earlier source is updated and used instead of src.
 
             @type  source: spelt.models.Source
             @param source: The Source model containing the filename of to read
                     the list of words from.
+            @type  format: str
+            @param format: One of the keys of spelt.importers.READERS.
+                (Default: guessed from the file's contents)
+            @type  memory_limit: int
+            @param memory_limit: The approximate number of bytes that word
+                counts may use before they are written to disk.
+                (Default: None - count in memory)
+            @param kwargs: Passed on to the format's reader, eg. a tokenizer
+                for corpora.
+            @rtype:  spelt.models.Source
+            @return: The source that the imported words were added with.
             """
         if filename is None:
             filename = str(src.filename)
+        if format is None:
+            format = guess_format(filename)
+        if format not in READERS:
+            raise ValueError(_('Unknown import format: %s') % (format))
+
+        known = [s for s in self.sources if s.digest]
+        size, digest, prefixes = fingerprint(filename, [s.size for s in known])
+        for s in known:
+            if s.size == size and s.digest == digest:
+                return s # Already imported
 
-        self.add_source(src)
+        previous = None
+        if format in APPENDABLE and not is_gzipped(filename):
+            for s in known:
+                if prefixes.get(s.size) == s.digest and (previous is None or s.size > previous.size):
+                    previous = s
+
+        if previous is None:
+            src.size, src.digest = size, digest
+            self.add_source(src)
+        else:
+            kwargs['offset'] = previous.size
+            src = previous
+            src.size, src.digest = size, digest
         user_id = src.import_user_id
+        date    = timestamp() # Converted once for all new surface forms
 
-        f = open(filename, 'r')
-        line = f.readline()
+        normalize = self.normalizer.normalize_many
+        if memory_limit is None:
+            counts = READERS[format](filename, normalize=normalize, **kwargs)
+        elif format in PAIR_READERS:
+            counts = external_counts(
+                PAIR_READERS[format](filename, **kwargs),
+                normalize=normalize,
+                memory_limit=memory_limit
+            )
+        else:
+            raise ValueError(_('Format %s can not be imported out of core') % (format))
 
-        while line:
-            # Ignore comments:
-            if line.lstrip().startswith('#'):
+        index = self.surface_form_index
+        batch   = []
+        pending = {}
+        for word, count in counts:
+            if word in pending:
+                # Readers may hand back a word once per batch they read
+                pending[word].frequency += count
                 continue
+            if word in index:
+                sf = min(index[word], key=lambda sf: (sf.root_id != 0, sf.id))
+                self.update_surface_form(sf, frequency=sf.frequency + count)
+                continue
+            sf = SurfaceForm(value=word, status='todo', user_id=user_id, date=date, source_id=src.id, frequency=count)
+            batch.append(sf)
+            pending[word] = sf
+            if len(batch) >= BATCH_SIZE:
+                self.add_many('surface_forms', batch)
+                batch   = []
+                pending = {}
+        self.add_many('surface_forms', batch)
+        return src
 
-            try:
-                word = unicode(line.rstrip())
-            except UnicodeError:
-                word = unicode(line.rstrip(), 'latin-1')
+    def stats(self, source_id=None, user_id=None):
+        """Count the surface forms per status, in the whole database or of
+            one source or user.
 
-            ## Make sure we don't add a word that already exists:
-            #if db.find(section='surface_forms', value=word):
-            #    line = f.readline()
-            #    continue
+            The counts are kept up to date as surface forms are added,
+            removed and changed (see L{update_surface_form}), so this doesn't
+            look at any surface forms.
 
-            try:
-                sf = SurfaceForm(value=word, status='todo', user_id=user_id, source_id=src.id)
-                self.add_surface_form(sf)
-            except Exception, exc:
-                print 'Error adding surface form: %s: %s' % (exc.__class__.__name__, exc)
+            @type  source_id: int
+            @param source_id: Only count the surface forms of this source.
+            @type  user_id:   int
+            @param user_id:   Only count the surface forms of this user.
+            @rtype:           dict
+            @return:          Maps every valid status to a count."""
+        if source_id is not None:
+            counts = self.source_counts.get(source_id, {})
+        elif user_id is not None:
+            counts = self.user_counts.get(user_id, {})
+        else:
+            counts = self.status_counts
 
-            line = f.readline()
+        stats = dict([(status, 0) for status in VALID_STATUSES])
+        stats.update(counts)
+        return stats
 
-        f.close()
+    def surface_forms_by_frequency(self):
+        """Get all surface forms ordered by descending frequency (and by ID
+            for equal frequencies).
+
+            The order is computed once and reused until a surface form is
+            added to the database.
+            @rtype:  list
+            @return: A list of SurfaceForm models."""
+        if self._frequency_order is None:
+            keyed = [(-sf.frequency, sf.id, sf) for sf in self.surface_forms_ids.itervalues()]
+            keyed.sort()
+            self._frequency_order = [k[2] for k in keyed]
+        return self._frequency_order
+
+    def surface_forms_with_status(self, status):
+        """Get the surface forms with the given status, in no particular order.
+
+            Columnar databases scan their status column instead of every
+            surface form (see L{SurfaceFormStore.select}).
+            @type  status: str
+            @param status: One of VALID_STATUSES.
+            @rtype:        list
+            @return:       A list of SurfaceForm models (or views)."""
+        if self.columnar:
+            return self.surface_forms.select(status=status)
+        return [sf for sf in self.surface_forms if sf.status == status]
 
     def load(self, filename):
         """Load a language database from the specified file.
+
+            The file is parsed incrementally: every model element is turned
+            into a model and discarded as soon as it has been read, so the
+            complete XML tree is never kept in memory. Repeated attribute
+            values (user, source and root ID's, dates) are shared between the
+            loaded models (see L{Interner}).
+
             @type  filename: basestring
             @param filename: The full path to the file to load the language database from.
             """
-        xmlroot = objectify.parse(open(filename, 'r')).getroot()
-        self.cache[xmlroot] = list(xmlroot.getiterator())
+        sections = self.model_list_map.values()
+        interner = Interner()
+        xmlroot  = None
+        section  = None
+        depth    = 0
+
+        for event, elem in etree.iterparse(filename, events=('start', 'end')):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    # Sanity checking for basic language database structure...
+                    if elem.tag != 'language_database':
+                        raise exceptions.LanguageDBFormatError(_('Invalid root tag: %s') % (elem.tag))
+                    if 'lang' not in elem.keys():
+                        raise exceptions.LanguageDBFormatError(_('No language code specified in database!'))
+                    xmlroot = elem
+                elif depth == 2:
+                    section = elem.tag in sections and elem.tag or None
+                continue
+
+            depth -= 1
+            if depth != 2 or section is None:
+                continue
 
-        # Sanity checking for basic language database structure...
-        if xmlroot.tag != 'language_database':
-            raise LanguageDBFormatError(_('Invalid root tag: %s' % xmlroot.tag, self))
+            model = ModelFactory.create_model_from_elem(elem, interner)
+            ids = self.section_ids[section]
+            if ids.has_key(model.id):
+                raise exceptions.DuplicateModelError(str(model))
+            if section == 'surface_forms':
+                key = (model.value, model.root_id)
+                if key in self.surface_form_keys:
+                    raise exceptions.DuplicateModelError(str(model))
+            self._claim_id(section, model)
+            ids[model.id] = model
+            self.sections[section].add(model)
+            if section == 'surface_forms':
+                # The store's view, if columnar
+                self.surface_form_keys[key] = ids[model.id]
 
-        if 'lang' not in xmlroot.keys():
-            raise LanguageDBFormatError(_('No language code specified in database!'), self)
+            # Discard the model's element and everything before it
+            elem.clear()
+            parent = elem.getparent()
+            while elem.getprevious() is not None:
+                del parent[0]
+
+        root_children = [c.tag for c in xmlroot.iterchildren()]
+        for section in sections:
+            if section not in root_children:
+                etree.SubElement(xmlroot, section)
+                warnings.warn(_('No top-level "%s" XML element.') % section, exceptions.LanguageDBFormatWarning)
+            else:
+                xmlroot.find(section).clear()
 
         self.filename = filename
         self.lang     = xmlroot.get('lang')
         self.xmlroot  = xmlroot
 
-        root_children = [c.tag for c in xmlroot.iterchildren()]
-        for section in self.model_list_map.values():
-            if section not in root_children:
-                setattr(xmlroot, section, objectify.Element(section))
-                raise LanguageDBFormatWarning(_('No top-level "%s" XML element.') % section)
+        self._frequency_order = None
+        self.reindex()
 
-            mids = getattr(self, section+"_ids")
-            mset = getattr(self, section)
-            for child in getattr(xmlroot, section).iterchildren():
-                if self.elem_is_xml_comment(child):
-                    continue # Skip XML comments
-                model = ModelFactory.create_model_from_elem(child)
+        if xmlroot.get('normalization') != self.normalizer.normal_form:
+            self.migrate_normalization()
 
-                if model in mset:
-                    raise exceptions.DuplicateModelError(str(model))
+    def migrate_normalization(self):
+        """Normalize the values of all roots and surface forms in the
+            database with self.normalizer.
+
+            This is a one-off pass for databases created before values were
+            normalized. It is run by load() for databases without a
+            "normalization" attribute on the root tag. Surface forms that
+            become equal (same value and root) are merged: the first one that
+            is not "todo" (or the one with the lowest ID) is kept and gets the
+            sum of the frequencies.
+
+            @rtype:  int
+            @return: The number of models that were changed or removed."""
+        changed = 0
+
+        for section in ('roots', 'surface_forms'):
+            models = self.section_ids[section].values()
+            values = self.normalizer.normalize_many([m.value for m in models])
+            for model, value in zip(models, values):
+                if model.value != value:
+                    model.value = value
+                    changed += 1
+
+        groups = {}
+        for sf in self.surface_forms_ids.values():
+            groups.setdefault((sf.value, sf.root_id), []).append(sf)
+
+        for group in groups.values():
+            if len(group) < 2:
+                continue
+            group.sort(key=lambda sf: (sf.status == 'todo', sf.id))
+            keep = group[0]
+            for sf in group[1:]:
+                keep.frequency += sf.frequency
+                del self.surface_forms_ids[sf.id]
+                self.sections['surface_forms'].discard(sf)
+                self.id_allocators['surface_forms'].release(sf.id)
+                changed += 1
+
+        self._frequency_order = None
+        self.reindex()
+        self.xmlroot.set('normalization', self.normalizer.normal_form)
+
+        return changed
+
+    def reindex(self):
+        """Rebuild the name and shortcut maps of parts of speech, the
+            normalized value indexes of roots and surface forms, the
+            (value, root_id) index of surface forms and the status counters."""
+        normalized = self.normalizer.normalize_many
+
+        # Every value is only read once, so that both indexes share its string
+        # (the views of a columnar database decode it on every access)
+        forms  = self.surface_forms_ids.values()
+        values = [sf.value for sf in forms]
+        self.surface_form_keys = dict(zip(zip(values, [sf.root_id for sf in forms]), forms))
+
+        self.pos_by_name.clear()
+        self.pos_by_shortcut.clear()
+        for pos in self.parts_of_speech_ids.values():
+            self._map_pos(pos, True)
+
+        roots = self.roots_ids.values()
+        for index, models, values in (
+                (self.root_index,         roots, [r.value for r in roots]),
+                (self.surface_form_index, forms, values)
+            ):
+            index.clear()
+            for model, key in zip(models, normalized(values)):
+                index.setdefault(key, []).append(model)
 
-                mids[model.id] = model
-                mset.add(model)
+        self.status_counts.clear()
+        self.source_counts.clear()
+        self.user_counts.clear()
+        for sf in forms:
+            self._count(sf, 1)
 
-        # Fill self.root_hashes from self.roots_ids
-        for root in self.roots_ids.values():
-            self.root_hashes[hash(root.value)] = root
+        # The index objects are kept, as the word list may be showing them
+        if self.todo_indexes:
+            todo = [sf for sf in forms if sf.status == 'todo']
+            for index in self.todo_indexes.values():
+                index.reset(todo)
 
-        del self.cache[xmlroot]
+    def remove(self, model):
+        """Remove a model from the database and release its ID.
+            @type  model: XMLModel
+            @param model: The model to remove. It must be in the database.
+            """
+        section = self.model_list_map.get(model.tag)
+        if section is None or self.section_ids[section].get(model.id) is not model:
+            raise exceptions.UnknownModelError(str(model))
+
+        del self.section_ids[section][model.id]
+        self.sections[section].discard(model)
+        self.id_allocators[section].release(model.id)
+
+        if section == 'parts_of_speech':
+            self._map_pos(model, False)
+            return
+        elif section == 'roots':
+            index = self.root_index
+        elif section == 'surface_forms':
+            index = self.surface_form_index
+            key = (model.value, model.root_id)
+            if self.surface_form_keys.get(key) is model:
+                del self.surface_form_keys[key]
+            self._frequency_order = None
+            self._track(model, -1)
+        else:
+            return
+
+        key = self.normalizer(model.value)
+        models = [m for m in index.get(key, []) if m is not model]
+        if models:
+            index[key] = models
+        elif key in index:
+            del index[key]
 
     def save(self, filename=None):
         """Save the represented language database to the specified file.
@@ -311,22 +1051,14 @@ class LanguageDB(object):
         if filename is None:
             raise IOError('No filename given!')
 
-        # FIXME (Bug #423): Find a way to make deannotate() below actually remove those
-        # annoying pytype and xsi attribs.
-        objectify.deannotate(self.xmlroot)
-
         # Make sure that we can successfully create the XML text before we open
         # (and possibly truncate) the file.
-        try:
-            xmlstring = etree.tostring(
-                self.xmlroot,
-                pretty_print=True,
-                xml_declaration=True,
-                encoding='utf-8'
-            )
-        except Exception, exc:
-            raise exc
-            #raise ValueError(_('Unable to create string from XML tree.'))
+        xmlstring = etree.tostring(
+            self.to_elem(),
+            pretty_print=True,
+            xml_declaration=True,
+            encoding='utf-8'
+        )
 
         f = open(filename, 'w')
 
@@ -335,25 +1067,48 @@ class LanguageDB(object):
 
         self.filename = filename
 
+    def to_elem(self):
+        """Create the XML tree representing the language database.
+
+            The sections are in the same order as in the loaded file and the
+            models in every section are ordered by ID.
+
+            @rtype:  lxml.etree._Element
+            @return: A new <language_database> element."""
+        root = etree.Element(self.xmlroot.tag, attrib=dict(self.xmlroot.attrib))
+        if self.lang:
+            root.set('lang', self.lang)
+
+        for child in self.xmlroot.iterchildren():
+            if child.tag not in self.section_ids:
+                root.append(deepcopy(child))
+                continue
+            models = self.section_ids[child.tag]
+            elem = etree.SubElement(root, child.tag)
+            elem.extend([models[id].to_elem() for id in sorted(models)])
+
+        return root
+
     def __create_root(self):
         """Creates a <language_database> root tag (self.xmlroot) and adds the main sections."""
-        self.xmlroot                 = objectify.Element('language_database', lang=self.lang)
-        self.xmlroot.parts_of_speech = objectify.Element('parts_of_speech')
-        self.xmlroot.roots           = objectify.Element('roots')
-        self.xmlroot.sources         = objectify.Element('sources')
-        self.xmlroot.surface_forms   = objectify.Element('surface_forms')
-        self.xmlroot.users           = objectify.Element('users')
+        self.xmlroot = etree.Element('language_database', normalization=self.normalizer.normal_form)
+        if self.lang:
+            self.xmlroot.set('lang', self.lang)
+
+        for section in ('parts_of_speech', 'roots', 'sources', 'surface_forms', 'users'):
+            etree.SubElement(self.xmlroot, section)
 
     # SPECIAL METHODS #
     def __str__(self):
         filepart = '[%s]' % (self.filename and os.path.split(self.filename)[1] or 'no file')
 
-        return '%s[lang="%s"]%s[POS %d|R %d|SRC %d|SF %d|U %d]' % \
+        return '%s[lang="%s"]%s[POS %d|R %d|SRC %d|SF %d (todo %d)|U %d]' % \
             (
                 self.__class__.__name__, self.lang, filepart,
                 len(self.parts_of_speech),
                 len(self.roots),
                 len(self.sources),
                 len(self.surface_forms),
+                self.status_counts.get('todo', 0),
                 len(self.users)
             )
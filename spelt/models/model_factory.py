@@ -18,8 +18,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-from lxml import objectify
-
 from spelt.common              import *
 from spelt.models.pos          import PartOfSpeech
 from spelt.models.root         import Root
@@ -43,13 +41,17 @@ class ModelFactory(object):
 
     # STATIC METHODS #
     @staticmethod
-    def create_model_from_elem(elem):
+    def create_model_from_elem(elem, interner=None):
         """Create an appropriate model from the given XML element.
-            @type  elem: lxml.objectify.ObjectifiedElement
-            @param elem: The XML element to create a model from.
+            @type  elem:     lxml.etree._Element
+            @param elem:     The XML element to create a model from. It is only
+                read (see XMLModel.from_elem()).
+            @type  interner: spelt.models.xml_model.Interner
+            @param interner: Shares repeated values between the models of
+                one database. (Default: None - not shared)
             """
         if not ModelFactory.model_name_map.has_key(elem.tag):
-            raise InvalidElementError(_('Invalid XML element with tag "%s"') % (elem.tag))
+            raise exceptions.InvalidElementError(_('Invalid XML element with tag "%s"') % (elem.tag))
 
         klass = ModelFactory.model_name_map[elem.tag]
-        return klass(elem=elem)
+        return klass.from_elem(elem, interner)
@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from bisect    import bisect_left, bisect_right
+from itertools import compress
+
+class OrderedIndex(object):
+    """
+    A list of models that is kept sorted by a key function, along with the
+    value of every model.
+
+    Models are inserted and removed with a binary search, so a list of
+    surface forms can be kept in order as their statuses change, without
+    sorting it again. The key of a model must not change while it is in the
+    index and keys must be unique (eg. end with the model's ID).
+
+    The models are kept in plain lists, because the word list needs their
+    positions (tree paths) and filtered() copies them in one pass. Finding a
+    model's place is O(log n), but inserting or removing it moves the rest
+    of the lists, so it is O(n). That is a memmove of a few pointers per
+    entry: about 0.1 ms at 100,000 entries and 1.5 ms at a million, per
+    cached index.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, key, models=(), predicate=None):
+        """Constructor.
+
+            @type  key:       callable
+            @param key:       Gives the sort key of a model.
+            @type  models:    iterable
+            @param models:    The models to put in the index.
+            @type  predicate: callable
+            @param predicate: Only models for which this returns true are
+                put in the index. (Default: None - all models)"""
+        self.key = key
+        self.predicate = predicate
+        self.change_handlers = []
+        """A list of callables that are called after the index changed. A
+            single insertion or removal calls f(position, model, inserted);
+            reset() calls f(None, None, None)."""
+        self.reset(models)
+
+    # METHODS #
+    def filtered(self, predicate, mask=None):
+        """Create an index with the same order that only contains the models
+            for which predicate returns true. Nothing is sorted and no keys
+            are computed.
+
+            @type  mask: list
+            @param mask: The predicate's result for every model in the index,
+                if the caller can compute it faster (eg. from self.values).
+            @rtype:      OrderedIndex"""
+        if mask is None:
+            mask = map(predicate, self.models)
+        index = OrderedIndex(self.key, predicate=predicate)
+        index.keys   = list(compress(self.keys, mask))
+        index.models = list(compress(self.models, mask))
+        index.values = list(compress(self.values, mask))
+        return index
+
+    def index(self, model):
+        """Get the position of the given model, or -1 if it is not in the
+            index."""
+        pos = bisect_left(self.keys, self.key(model))
+        if pos < len(self.models) and self.models[pos] is model:
+            return pos
+        return -1
+
+    def insert(self, model):
+        """Insert a model at its place in the order.
+            @rtype:  int
+            @return: The model's position, or -1 if the predicate didn't
+                accept it."""
+        if self.predicate is not None and not self.predicate(model):
+            return -1
+        key = self.key(model)
+        pos = bisect_right(self.keys, key)
+        self.keys.insert(pos, key)
+        self.models.insert(pos, model)
+        self.values.insert(pos, model.value)
+        self._notify(pos, model, True)
+        return pos
+
+    def remove(self, model):
+        """Remove a model from the index.
+            @rtype:  int
+            @return: The model's position before it was removed, or -1 if it
+                wasn't in the index."""
+        pos = self.index(model)
+        if pos >= 0:
+            del self.keys[pos], self.models[pos], self.values[pos]
+            self._notify(pos, model, False)
+        return pos
+
+    def reset(self, models):
+        """Replace the contents of the index with the given models."""
+        self.keys, self.models, self.values = [], [], []
+        self.update(models)
+
+    def update(self, models):
+        """Add a batch of models, sorting once instead of inserting every
+            model separately. Handlers are notified as for reset()."""
+        key = self.key
+        if self.predicate is not None:
+            models = filter(self.predicate, models)
+        items = zip(self.keys, self.models, self.values)
+        items.extend([(key(m), m, m.value) for m in models])
+        # Keys are unique, so models are never compared
+        items.sort()
+        self._set_items(items)
+
+    def _set_items(self, items):
+        self.keys   = [item[0] for item in items]
+        self.models = [item[1] for item in items]
+        self.values = [item[2] for item in items]
+        self._notify(None, None, None)
+
+    def _notify(self, position, model, inserted):
+        # Handlers may add or remove handlers (eg. the word list sets a new
+        # model on a reset): loop over a copy and skip the removed ones
+        for f in list(self.change_handlers):
+            if callable(f) and f in self.change_handlers:
+                f(position, model, inserted)
+
+    # SPECIAL METHODS #
+    def __getitem__(self, position):
+        return self.models[position]
+
+    def __iter__(self):
+        return iter(self.models)
+
+    def __len__(self):
+        return len(self.models)
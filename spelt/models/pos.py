@@ -18,15 +18,19 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-from lxml import objectify
-
-from spelt.models.xml_model import XMLModel
+from spelt.models.xml_model import XMLModel, elem_texts
 
 class PartOfSpeech(XMLModel):
     """
     This class represents a part-of-speech section from the language database.
     """
 
+    __slots__ = ('name', 'shortcut', 'remarks')
+
+    tag     = 'part_of_speech'
+    values  = ('name', 'shortcut', 'remarks')
+    attribs = ('id',)
+
     # CONSTRUCTORS #
     def __init__(self, name=None, shortcut=None, remarks=None, id=0, elem=None):
         """Constructor.
@@ -38,36 +42,35 @@ class PartOfSpeech(XMLModel):
             @param remarks:  Remarks for use by the end-user (default None)
             @type  id:       int
             @param id:       Unique identifier of this part-of-speech (default None)
+            @type  elem:     lxml.etree._Element
+            @param elem:     An XML element to read the fields from.
             """
         assert name is None or isinstance(name, basestring)
         assert shortcut is None or isinstance(shortcut, basestring)
         assert remarks is None or isinstance(remarks, basestring)
         assert isinstance(id, int)
 
-        super(PartOfSpeech, self).__init__(
-            tag='part_of_speech',
-            values=['name', 'shortcut', 'remarks'],
-            attribs=['id'],
-            elem=elem
-        )
+        super(PartOfSpeech, self).__init__(elem=elem)
 
-        if elem is None:
+        if not hasattr(self, 'name'):
             self.name = name
+        if not hasattr(self, 'shortcut'):
             self.shortcut = shortcut
+        if not hasattr(self, 'remarks'):
             self.remarks = remarks
+        if not hasattr(self, 'id'):
             self.id = id
-        else:
-            if not hasattr(self, 'name'):
-                self.name = name
-            if not hasattr(self, 'shortcut'):
-                self.shortcut = shortcut
-            if not hasattr(self, 'remarks'):
-                self.remarks = remarks
-            if not hasattr(self, 'id'):
-                self.id = id
-            else:
-                # Make sure that the ID is registered with the ID manager.
-                self.id = self.id
+
+    @classmethod
+    def from_elem(cls, elem, interner=None):
+        """See XMLModel.from_elem()."""
+        texts = elem_texts(elem)
+        pos   = cls._hydrate(int(elem.get('id', 0)))
+        init  = object.__setattr__
+        init(pos, 'name',     texts.get('name', u''))
+        init(pos, 'shortcut', texts.get('shortcut', u''))
+        init(pos, 'remarks',  texts.get('remarks', u''))
+        return pos
 
     # METHODS #
     def validate_data(self):
@@ -75,10 +78,3 @@ class PartOfSpeech(XMLModel):
         assert len(self.name) > 0
         assert self.shortcut is None or len(self.shortcut) > 0
         assert isinstance(self.id, int)
-
-    # SPECIAL METHODS #
-    def __eq__(self, rhs):
-        return self.id == rhs.id
-
-    def __hash__(self):
-        return self.id
@@ -18,17 +18,21 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-import time
 from datetime import datetime
-from lxml     import objectify
 
-from spelt.models.xml_model import XMLModel
+from spelt.models.xml_model import DatedModel, Interner, elem_texts, timestamp
 
-class Root(XMLModel):
+class Root(DatedModel):
     """
     This class represents a word root as represented in the XML language database.
     """
 
+    __slots__ = ('value', 'remarks', 'pos_id', 'user_id')
+
+    tag     = 'root'
+    values  = ('value', 'remarks')
+    attribs = ('id', 'pos_id', 'user_id', 'date')
+
     # CONSTRUCTORS #
     def __init__(self, value=None, remarks=None, id=0, pos_id=0, user_id=0, date=None, elem=None):
         """Constructor.
@@ -43,76 +47,59 @@ class Root(XMLModel):
             @param pos_id:  The word root's part-of-speech's ID
             @type  user_id: int
             @param user_id: The ID of the user that added/changed the root
-            @type  date:    datetime.datetime
+            @type  date:    datetime.datetime or int
             @param date:    The last modification date of the word root
+                (Default: None - now)
+            @type  elem:    lxml.etree._Element
+            @param elem:    An XML element to read the fields from. The other
+                parameters are only used for fields missing from it.
             """
         assert value is None or isinstance(value, basestring)
         assert remarks is None or isinstance(remarks, basestring)
         assert isinstance(id, int)
         assert isinstance(pos_id, int)
         assert isinstance(user_id, int)
-        assert date is None or isinstance(date, datetime)
+        assert date is None or isinstance(date, (datetime, int))
 
-        super(Root, self).__init__(
-            tag='root',
-            values=['value', 'remarks'],
-            attribs=['id', 'pos_id', 'user_id', 'date'],
-            elem=elem
-        )
+        super(Root, self).__init__(elem=elem)
 
-        if date is None:
-            date = datetime.now()
-
-        if elem is None:
-            self.value   = value
+        if not hasattr(self, 'value'):
+            self.value = value
+        if not hasattr(self, 'remarks'):
             self.remarks = remarks
-            self.id      = id
-            self.pos_id  = pos_id
+        if not hasattr(self, 'id'):
+            self.id = id
+        if not hasattr(self, 'pos_id'):
+            self.pos_id = pos_id
+        if not hasattr(self, 'user_id'):
             self.user_id = user_id
-            if date is not None:
-                self.date = date
-            else:
-                self.date = datetime.now()
-        else:
-            if not hasattr(self, 'value'):
-                self.value = value
-            if not hasattr(self, 'remarks'):
-                self.remarks = remarks
-            if not hasattr(self, 'id'):
-                self.id = id
-            else:
-                # Make sure that the ID is registered with the ID manager.
-                self.id = self.id
-            if not hasattr(self, 'pos_id'):
-                self.pos_id = pos_id
-            if not hasattr(self, 'user_id'):
-                self.user_id = user_id
-            if not hasattr(self, 'date'):
-                self.date = date
+        if not hasattr(self, 'date'):
+            self.date = timestamp(date)
 
+    @classmethod
+    def from_elem(cls, elem, interner=None):
+        """See XMLModel.from_elem(). The value is used as is: LanguageDB.load()
+            takes care of normalization."""
+        if interner is None:
+            interner = Interner()
+        attrib = elem.attrib
+        texts  = elem_texts(elem)
+        num    = interner.int
+        root   = cls._hydrate(int(attrib.get('id', 0)))
+        init   = object.__setattr__
+        init(root, 'value',   texts.get('value', u''))
+        init(root, 'remarks', texts.get('remarks', u''))
+        init(root, 'pos_id',  num(attrib.get('pos_id', 0)))
+        init(root, 'user_id', num(attrib.get('user_id', 0)))
+        init(root, 'date',    num(attrib.get('date') or timestamp()))
+        return root
 
     # METHODS #
     def validate_data(self):
         """See XMLModel.validate_data()."""
         assert len(self.value) > 0
-        assert self.remarks is None or isinstance(self.remarks, basestring) or isinstance(self.remarks, objectify.NoneElement)
+        assert self.remarks is None or isinstance(self.remarks, basestring)
         assert isinstance(self.id, int)
         assert isinstance(self.pos_id, int)
         assert isinstance(self.user_id, int)
-        assert isinstance(self._date, datetime)
-
-    # SPECIAL METHODS #
-    def __eq__(self, rhs):
-        return self.id == rhs.id
-
-    def __hash__(self):
-        return self.id
-
-    def __setattr__(self, name, value):
-        if name == 'date':
-            if isinstance(value, datetime):
-                value = str(int( time.mktime(value.timetuple()) ))
-            elif isinstance(value, int) or isinstance(value, basestring):
-                value = str(value)
-
-        super(Root, self).__setattr__(name, value)
+        assert isinstance(self.date, int)
@@ -18,22 +18,25 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-import time
-from datetime import datetime
-from lxml     import objectify
-
 from spelt.common import _
 
-from spelt.models.xml_model import XMLModel
+from spelt.models.xml_model import DatedModel, elem_texts, timestamp
 
 
-class Source(XMLModel):
+class Source(DatedModel):
     """
     This class represents a source for a word
     """
 
+    __slots__ = ('name', 'filename', 'description', 'import_user_id', 'size', 'digest')
+
+    tag         = 'source'
+    values      = ('name', 'filename', 'description')
+    attribs     = ('id', 'date', 'import_user_id', 'size', 'digest')
+    int_attribs = ('date', 'size')
+
     # CONSTRUCTORS #
-    def __init__(self, name=None, filename=None, desc=None, id=0, date=None, import_user_id=0, elem=None):
+    def __init__(self, name=None, filename=None, desc=None, id=0, date=None, import_user_id=0, size=0, digest='', elem=None):
         """Constructor.
             @type  name:           basestring
             @param name:           The source's name (default None).
@@ -43,66 +46,58 @@ class Source(XMLModel):
             @param desc:           Description (default None).
             @type  id:             int
             @param id:             ID from XML file (default None).
-            @type  date:           datetime.datetime
-            @param date:           A timestamp string representing the date the source was added (default None).
+            @type  date:           datetime.datetime or int
+            @param date:           The date the source was added (default None - now).
             @type  import_user_id: int
             @param import_user_id: The ID of the user that imported the source (right? (default None).
+            @type  size:           int
+            @param size:           The size in bytes of the imported file (default 0).
+            @type  digest:         str
+            @param digest:         The SHA-1 hex digest of the imported file's
+                                   contents (default '' - unknown).
+            @type  elem:           lxml.etree._Element
+            @param elem:           An XML element to read the fields from.
             """
-        super(Source, self).__init__(
-            tag='source',
-            attribs=['id', 'date', 'import_user_id'],
-            values=['name', 'filename', 'description'],
-            elem=elem
-        )
+        super(Source, self).__init__(elem=elem)
 
-        # Check that date is a valid timestamp
-        if date is None:
-            date = datetime.now()
-
-        if elem is None:
-            self.name           = name
-            self.filename       = filename
-            self.description    = desc
-            self.date           = date
+        if not hasattr(self, 'name'):
+            self.name = name
+        if not hasattr(self, 'filename'):
+            self.filename = filename
+        if not hasattr(self, 'description'):
+            self.description = desc
+        if not hasattr(self, 'id'):
+            self.id = id
+        if not hasattr(self, 'date'):
+            self.date = timestamp(date)
+        if not hasattr(self, 'import_user_id'):
             self.import_user_id = import_user_id
-            self.id             = id
-        else:
-            if not hasattr(self, 'name'):
-                self.name = name
-            if not hasattr(self, 'filename'):
-                self.filename = filename
-            if not hasattr(self, 'description'):
-                self.description = desc
-            if not hasattr(self, 'id'):
-                self.id = id
-            else:
-                # Make sure that the ID is registered with the ID manager.
-                self.id = self.id
-            if not hasattr(self, 'date'):
-                self.date = date
-            if not hasattr(self, 'import_user_id'):
-                self.import_user_id = import_user_id
+        if not hasattr(self, 'size'):
+            self.size = size
+        if not hasattr(self, 'digest'):
+            self.digest = digest
+
+    @classmethod
+    def from_elem(cls, elem, interner=None):
+        """See XMLModel.from_elem()."""
+        attrib = elem.attrib
+        texts  = elem_texts(elem)
+        src    = cls._hydrate(int(attrib.get('id', 0)))
+        init   = object.__setattr__
+        init(src, 'name',           texts.get('name', u''))
+        init(src, 'filename',       texts.get('filename', u''))
+        init(src, 'description',    texts.get('description', u''))
+        init(src, 'date',           int(attrib.get('date') or timestamp()))
+        init(src, 'import_user_id', int(attrib.get('import_user_id', 0)))
+        init(src, 'size',           int(attrib.get('size', 0)))
+        init(src, 'digest',         attrib.get('digest', ''))
+        return src
 
     # METHODS #
     def validate_data(self):
         """See XMLModel.validate_data()."""
         assert len(self.name) > 0
         assert isinstance(self.id, int)
-        assert isinstance(self._date, datetime) and len(self.date) > 0
+        assert isinstance(self.date, int)
         assert isinstance(self.import_user_id, int)
-
-    # SPECIAL METHODS #
-    def __eq__(self, rhs):
-        return self.id == rhs.id
-
-    def __hash__(self):
-        return self.id
-
-    def __setattr__(self, name, value):
-        if name == 'date':
-            if isinstance(value, datetime):
-                value = str(int( time.mktime(value.timetuple()) ))
-            elif isinstance(value, int) or isinstance(value, basestring):
-                value = str(value)
-
-        super(Source, self).__setattr__(name, value)
+        assert isinstance(self.size, int) and self.size >= 0
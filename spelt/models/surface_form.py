@@ -18,21 +18,30 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-import time
 from datetime import datetime
-from lxml     import objectify
 
-from spelt.models.xml_model import XMLModel
+from spelt.models.xml_model import DatedModel, Interner, elem_texts, timestamp
 
 VALID_STATUSES = ('classified', 'ignored', 'rejected', 'todo')
+STATUSES = dict([(status, status) for status in VALID_STATUSES])
+"""Maps every valid status (str or unicode) to the one shared str in
+    VALID_STATUSES, so that a status costs each surface form no more than a
+    reference to one of four objects."""
 
-class SurfaceForm(XMLModel):
+class SurfaceForm(DatedModel):
     """
     This class represents a surface form word (a word with a root).
     """
 
+    __slots__ = ('value', 'status', 'user_id', 'source_id', 'root_id', 'frequency')
+
+    tag         = 'surface_form'
+    values      = ('value', 'status')
+    attribs     = ('id', 'user_id', 'date', 'source_id', 'root_id', 'frequency')
+    int_attribs = ('date', 'frequency')
+
     # CONSTRUCTORS #
-    def __init__(self, value='', status='', id=0, user_id=0, date=None, source_id=0, root_id=0, elem=None):
+    def __init__(self, value='', status='', id=0, user_id=0, date=None, source_id=0, root_id=0, frequency=1, elem=None):
         """
         Constructor.
             @type  value:     basestring
@@ -43,57 +52,66 @@ class SurfaceForm(XMLModel):
             @param status:    The classification status of the surface form word.
             @type  user_id:   int
             @param user_id:   The user that classified the word.
-            @type  date:      datetime.datetime
-            @param date:      Date of classification.
+            @type  date:      datetime.datetime or int
+            @param date:      Date of classification. (Default: None - now)
             @type  source_id: int
             @param source_id: Source associated with this word.
             @type  root_id:   int
             @param root_id:   ID of the root word for this structure.
+            @type  frequency: int
+            @param frequency: The number of times the word occurred in its source.
+            @type  elem:      lxml.etree._Element
+            @param elem:      An XML element to read the fields from. The
+                other parameters are only used for fields missing from it.
             """
         assert isinstance(value, basestring)
         assert isinstance(status, str)
         assert isinstance(id, int)
         assert isinstance(user_id, int)
-        assert date is None or isinstance(date, datetime)
+        assert date is None or isinstance(date, (datetime, int))
         assert isinstance(source_id, int)
         assert isinstance(root_id, int)
+        assert isinstance(frequency, int)
 
-        super(SurfaceForm, self).__init__(
-            tag='surface_form',
-            values=['value', 'status'],
-            attribs=['id', 'user_id', 'date', 'source_id', 'root_id'],
-            elem=elem
-        )
-
-        if date is None:
-            date = datetime.now()
+        super(SurfaceForm, self).__init__(elem=elem)
 
-        if elem is None:
-            self.value     = value
-            self.status    = status
-            self.id        = id
-            self.user_id   = user_id
-            self.date      = date
+        if not hasattr(self, 'value'):
+            self.value = value
+        if not hasattr(self, 'status'):
+            self.status = status
+        if not hasattr(self, 'id'):
+            self.id = id
+        if not hasattr(self, 'user_id'):
+            self.user_id = user_id
+        if not hasattr(self, 'date'):
+            self.date = timestamp(date)
+        if not hasattr(self, 'source_id'):
             self.source_id = source_id
-            self.root_id   = root_id
-        else:
-            if not hasattr(self, 'value'):
-                self.value = value
-            if not hasattr(self, 'status'):
-                self.status = status
-            if not hasattr(self, 'id'):
-                self.id = id
-            else:
-                # Make sure that the ID is registered with the ID manager.
-                self.id = self.id
-            if not hasattr(self, 'user_id'):
-                self.user_id = user_id
-            if not hasattr(self, 'date'):
-                self.date = date
-            if not hasattr(self, 'source_id'):
-                self.source_id = source_id
-            if not hasattr(self, 'root_id'):
-                self.root_id = root_id
+        if not hasattr(self, 'root_id'):
+            self.root_id = root_id
+        if not hasattr(self, 'frequency'):
+            self.frequency = frequency
+
+    @classmethod
+    def from_elem(cls, elem, interner=None):
+        """See XMLModel.from_elem(). The value is used as is: LanguageDB.load()
+            takes care of normalization."""
+        if interner is None:
+            interner = Interner()
+        attrib = elem.attrib
+        texts  = elem_texts(elem)
+        num    = interner.int
+        status = texts.get('status', u'')
+        sf     = cls._hydrate(int(attrib.get('id', 0)))
+        init   = object.__setattr__
+        init(sf, 'value',     texts.get('value', u''))
+        init(sf, 'status',    STATUSES.get(status) or interner.string(status))
+        init(sf, 'user_id',   num(attrib.get('user_id', 0)))
+        init(sf, 'date',      num(attrib.get('date') or timestamp()))
+        init(sf, 'source_id', num(attrib.get('source_id', 0)))
+        init(sf, 'root_id',   num(attrib.get('root_id', 0)))
+        init(sf, 'frequency', num(attrib.get('frequency', 1)))
+        return sf
 
     # METHODS #
     def validate_data(self):
@@ -102,21 +120,13 @@ class SurfaceForm(XMLModel):
         assert isinstance(str(self.status), str)           and self.status in VALID_STATUSES
         assert isinstance(self.id, int)                    and self.id > 0
         assert isinstance(self.user_id, int)               and self.user_id > 0
-        assert isinstance(self._date, datetime)
+        assert isinstance(self.date, int)
         assert isinstance(self.source_id, int)
+        assert isinstance(self.frequency, int)             and self.frequency >= 0
 
     # SPECIAL METHODS #
-    def __eq__(self, rhs):
-        return hash(self) == hash(rhs)
-
-    def __hash__(self):
-        return hash('%s_%s' % (self.value, self.root_id))
-
     def __setattr__(self, name, value):
-        if name == 'date':
-            if isinstance(value, datetime):
-                value = str(int( time.mktime(value.timetuple()) ))
-            elif isinstance(value, int) or isinstance(value, basestring):
-                value = str(value)
+        if name == 'status':
+            value = STATUSES.get(value, value)
 
         super(SurfaceForm, self).__setattr__(name, value)
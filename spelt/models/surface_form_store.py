@@ -0,0 +1,418 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from array     import array
+from itertools import compress, count as counter, ifilter, imap, repeat
+from operator  import eq
+
+from spelt.models.surface_form import STATUSES, VALID_STATUSES, SurfaceForm
+from spelt.models.xml_model    import XMLModel, timestamp
+
+INT_COLUMNS = (
+    ('id',        'ids'),
+    ('user_id',   'user_ids'),
+    ('date',      'dates'),
+    ('source_id', 'source_ids'),
+    ('root_id',   'root_ids'),
+    ('frequency', 'frequencies')
+)
+"""Maps the integer fields of surface forms to the store's columns."""
+
+class SurfaceFormStore(object):
+    """
+    A column-oriented container for the surface forms of a language database.
+
+    Every integer field is kept in an array (one machine word per surface
+    form), statuses are one byte codes and the values are UTF-8 encoded in a
+    single packed string table. Surface forms are read and changed through
+    L{SurfaceFormRow} views, which look like L{SurfaceForm} models. There is
+    exactly one view per stored surface form, so views can be compared with
+    "is" and kept in indexes.
+
+    The store acts as a set of views; L{by_id} is the same store as a
+    dictionary of ID's to views, so both can stand in for the containers of
+    the surface_forms section of a LanguageDB (see its columnar parameter).
+    Adding a model to the store copies its fields: later changes have to be
+    made through the view.
+
+    Filters on statuses and ID's (L{select}, L{count}) scan the columns
+    without creating any objects for the rows that don't match.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, models=()):
+        """Constructor.
+
+            @type  models: iterable
+            @param models: Surface forms (with ID's) to add to the store."""
+        self._reset()
+        self.by_id = SurfaceFormIDs(self)
+        """The store as a dictionary of ID's to views."""
+        self.update(models)
+
+    def _reset(self):
+        for name, column in INT_COLUMNS:
+            setattr(self, column, array('l'))
+        self.statuses     = array('b')
+        self.status_names = [''] + list(VALID_STATUSES)
+        """The status names by code. Unknown statuses are added as needed."""
+        self.status_codes = dict([(name, code) for code, name in enumerate(self.status_names)])
+        self.text     = bytearray()
+        self.offsets  = array('l')
+        self.lengths  = array('l')
+        self.garbage  = 0
+        """The number of bytes in the text table that aren't used anymore."""
+        self.rows     = array('l')
+        """The row of every ID, or -1."""
+        self.views    = []
+        self.free     = []
+        """Rows of removed surface forms, that will be reused."""
+
+    # METHODS #
+    def add(self, model):
+        """Add a surface form to the store, unless its ID is in it already.
+
+            @type  model: SurfaceForm
+            @param model: The surface form to copy into the store. It must
+                have an ID."""
+        assert model.id > 0
+        if self.row(model.id) < 0:
+            self._append(model)
+
+    def clear(self):
+        """Remove all surface forms. Views that are still referenced keep
+            their values (in a copy of the old columns)."""
+        old = SurfaceFormStore.__new__(SurfaceFormStore)
+        old.__dict__.update(self.__dict__)
+        for view in self:
+            view.store = old
+        self._reset()
+
+    def compact(self):
+        """Drop the unused bytes from the text table."""
+        text = bytearray()
+        old, offsets, lengths = self.text, self.offsets, self.lengths
+        for row in xrange(len(offsets)):
+            offset = offsets[row]
+            offsets[row] = len(text)
+            text.extend(old[offset:offset + lengths[row]])
+        self.text    = text
+        self.garbage = 0
+
+    def count(self, status):
+        """Count the surface forms with the given status.
+
+            @type  status: str
+            @param status: One of VALID_STATUSES."""
+        code = self.status_codes.get(status)
+        if code is None:
+            return 0
+        return self.statuses.count(code)
+
+    def discard(self, model):
+        """Remove the given surface form from the store if it is in it."""
+        row = self.row(model.id)
+        if row >= 0 and self.views[row] is model:
+            self._remove(row)
+
+    def row(self, id):
+        """Get the row of the surface form with the given ID, or -1."""
+        if 0 < id < len(self.rows):
+            return self.rows[id]
+        return -1
+
+    def select(self, status=None, source_id=None, user_id=None, root_id=None):
+        """Get the surface forms whose fields have the given values (in the
+            order they were added). Fields that are None aren't checked.
+
+            @rtype:  list
+            @return: A list of L{SurfaceFormRow} views."""
+        rows = None
+        if status is not None:
+            code = self.status_codes.get(status)
+            if code is None:
+                return []
+            rows = compress(counter(), imap(eq, self.statuses, repeat(code)))
+
+        for value, column in (
+                (source_id, self.source_ids),
+                (user_id,   self.user_ids),
+                (root_id,   self.root_ids)
+            ):
+            if value is None:
+                continue
+            if rows is None:
+                rows = compress(counter(), imap(eq, column, repeat(value)))
+            else:
+                rows = [row for row in rows if column[row] == value]
+
+        if rows is None:
+            return list(self)
+        views = self.views
+        # Removed rows are None
+        return filter(None, [views[row] for row in rows])
+
+    def status_counts(self):
+        """Count the surface forms per status.
+
+            @rtype:  dict
+            @return: Maps statuses to the number of surface forms with it.
+                Statuses that aren't used are left out."""
+        counts = {}
+        for code, name in enumerate(self.status_names):
+            n = self.statuses.count(code)
+            if n:
+                counts[name] = n
+        return counts
+
+    def update(self, models):
+        """Add all of the given surface forms (see L{add})."""
+        for model in models:
+            self.add(model)
+
+    def _append(self, model, view=None):
+        """Copy the given model's fields into a new row and create its view.
+            An existing view can be given, which is moved to the new row."""
+        if self.free:
+            row = self.free.pop()
+            for name, column in INT_COLUMNS:
+                getattr(self, column)[row] = getattr(model, name)
+            self.statuses[row] = self._status_code(model.status)
+            self.offsets[row], self.lengths[row] = self._pack(model.value)
+        else:
+            row = len(self.views)
+            for name, column in INT_COLUMNS:
+                getattr(self, column).append(getattr(model, name))
+            self.statuses.append(self._status_code(model.status))
+            offset, length = self._pack(model.value)
+            self.offsets.append(offset)
+            self.lengths.append(length)
+            self.views.append(None)
+
+        self._set_row(model.id, row)
+        if view is None:
+            view = SurfaceFormRow(self, row)
+        else:
+            view.store, view.row = self, row
+        self.views[row] = view
+        return view
+
+    def _pack(self, value):
+        """Add a value to the text table.
+            @rtype:  tuple
+            @return: The offset and length of the encoded value."""
+        data = value.encode('utf-8')
+        offset = len(self.text)
+        self.text.extend(data)
+        return offset, len(data)
+
+    def _remove(self, row):
+        """Remove a row. Its view is moved to a store of its own, so that it
+            still has its values."""
+        view = self.views[row]
+        SurfaceFormStore()._append(view, view=view)
+
+        self._set_row(self.ids[row], -1)
+        for name, column in INT_COLUMNS:
+            getattr(self, column)[row] = 0
+        self.statuses[row] = -1
+        self.garbage += self.lengths[row]
+        self.lengths[row] = 0
+        self.views[row] = None
+        self.free.append(row)
+
+    def _set_row(self, id, row):
+        rows = self.rows
+        if id >= len(rows):
+            rows.extend(repeat(-1, max(id + 1, 2 * len(rows)) - len(rows)))
+        rows[id] = row
+
+    def _set_value(self, row, value):
+        self.garbage += self.lengths[row]
+        self.offsets[row], self.lengths[row] = self._pack(value)
+        if self.garbage > 4096 and self.garbage > len(self.text) / 2:
+            self.compact()
+
+    def _status_code(self, status):
+        code = self.status_codes.get(status)
+        if code is None:
+            code = self.status_codes[status] = len(self.status_names)
+            self.status_names.append(STATUSES.get(status, status))
+        return code
+
+    # SPECIAL METHODS #
+    def __contains__(self, model):
+        row = self.row(getattr(model, 'id', 0))
+        return row >= 0 and self.views[row] == model
+
+    def __iter__(self):
+        return ifilter(None, self.views)
+
+    def __len__(self):
+        return len(self.views) - len(self.free)
+
+
+class SurfaceFormIDs(object):
+    """
+    A dictionary-like view of a L{SurfaceFormStore} that maps ID's to the
+    store's L{SurfaceFormRow} views.
+    """
+
+    # CONSTRUCTOR #
+    def __init__(self, store):
+        self.store = store
+
+    # METHODS #
+    def clear(self):
+        self.store.clear()
+
+    def get(self, id, default=None):
+        row = self.store.row(id)
+        if row < 0:
+            return default
+        return self.store.views[row]
+
+    def has_key(self, id):
+        return self.store.row(id) >= 0
+
+    def items(self):
+        return [(view.id, view) for view in self.store]
+
+    def iterkeys(self):
+        return ifilter(None, self.store.ids)
+
+    def itervalues(self):
+        return iter(self.store)
+
+    def keys(self):
+        return list(self.iterkeys())
+
+    def update(self, pairs):
+        for id, model in pairs:
+            self[id] = model
+
+    def values(self):
+        return list(self.store)
+
+    # SPECIAL METHODS #
+    def __contains__(self, id):
+        return self.has_key(id)
+
+    def __delitem__(self, id):
+        row = self.store.row(id)
+        if row < 0:
+            raise KeyError(id)
+        self.store._remove(row)
+
+    def __getitem__(self, id):
+        row = self.store.row(id)
+        if row < 0:
+            raise KeyError(id)
+        return self.store.views[row]
+
+    def __iter__(self):
+        return self.iterkeys()
+
+    def __len__(self):
+        return len(self.store)
+
+    def __setitem__(self, id, model):
+        assert model.id == id
+        row = self.store.row(id)
+        if row >= 0:
+            if self.store.views[row] is model:
+                return
+            self.store._remove(row)
+        self.store._append(model)
+
+
+def _int_field(name, column):
+    def get(self):
+        return getattr(self.store, column)[self.row]
+    def set(self, value):
+        getattr(self.store, column)[self.row] = value
+    return property(get, set, doc='The %s column of the row.' % (name))
+
+class SurfaceFormRow(object):
+    """
+    A view of one row of a L{SurfaceFormStore}, with the same fields and
+    methods as a L{SurfaceForm}. Changes to the fields go directly to the
+    store's columns.
+    """
+
+    __slots__ = ('store', 'row')
+
+    tag         = SurfaceForm.tag
+    values      = SurfaceForm.values
+    attribs     = SurfaceForm.attribs
+    int_attribs = SurfaceForm.int_attribs
+
+    # CONSTRUCTOR #
+    def __init__(self, store, row):
+        self.store = store
+        self.row   = row
+
+    # FIELDS #
+    user_id   = _int_field('user_id',   'user_ids')
+    source_id = _int_field('source_id', 'source_ids')
+    root_id   = _int_field('root_id',   'root_ids')
+    frequency = _int_field('frequency', 'frequencies')
+
+    def _get_date(self):
+        return self.store.dates[self.row]
+    def _set_date(self, date):
+        self.store.dates[self.row] = timestamp(date)
+    date = property(_get_date, _set_date)
+
+    def _get_id(self):
+        return self.store.ids[self.row]
+    def _set_id(self, id):
+        store = self.store
+        store._set_row(store.ids[self.row], -1)
+        store._set_row(id, self.row)
+        store.ids[self.row] = id
+    id = property(_get_id, _set_id)
+
+    def _get_status(self):
+        store = self.store
+        return store.status_names[store.statuses[self.row]]
+    def _set_status(self, status):
+        self.store.statuses[self.row] = self.store._status_code(status or '')
+    status = property(_get_status, _set_status)
+
+    def _get_value(self):
+        store  = self.store
+        offset = store.offsets[self.row]
+        return store.text[offset:offset + store.lengths[self.row]].decode('utf-8')
+    def _set_value(self, value):
+        self.store._set_value(self.row, value or u'')
+    value = property(_get_value, _set_value)
+
+    # METHODS #
+    to_elem       = XMLModel.to_elem.im_func
+    validate_data = SurfaceForm.validate_data.im_func
+
+    # SPECIAL METHODS #
+    __eq__   = XMLModel.__eq__.im_func
+    __ne__   = XMLModel.__ne__.im_func
+    __hash__ = XMLModel.__hash__.im_func
+
+    __repr__ = XMLModel.__repr__.im_func
+    __str__  = XMLModel.__str__.im_func
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from spelt.models.id_allocator import IDAllocator
+
+class TestIDAllocator(object):
+    """Unit test for IDAllocator."""
+
+    def test_allocate(self):
+        ids = IDAllocator()
+        assert [ids.allocate() for i in range(3)] == [1, 2, 3]
+        assert ids.claim(10)
+        assert not ids.claim(2)
+        assert ids.allocate() == 11
+        assert len(ids) == 5 and 10 in ids and 5 not in ids
+
+    def test_release(self):
+        ids = IDAllocator()
+        for id in (1, 2, 3, 1000):
+            ids.claim(id)
+
+        assert ids.release(2)
+        assert not ids.release(2)
+        assert 2 not in ids and ids.high == 1000
+
+        # Released ID's aren't allocated again, not even the highest one
+        assert ids.release(1000)
+        assert ids.high == 1000 and 1000 not in ids
+        assert ids.allocate() == 1001
+        assert ids.claim(2) and ids.claim(1000)
+
+        ids.clear()
+        assert len(ids) == 0 and 1 not in ids and ids.allocate() == 1
@@ -20,12 +20,20 @@
 
 # Contains LanguageDB: the main model representing a language database and provides access to all its parts.
 
-import os.path
+import os, os.path
+import tempfile
 from lxml import etree
 
-from langdb    import LanguageDB
-from user      import User
-from xml_model import XMLModel
+from spelt.common import exceptions
+from spelt.common.normalize import Normalizer
+
+from langdb       import LanguageDB
+from pos          import PartOfSpeech
+from root         import Root
+from source       import Source
+from surface_form import SurfaceForm
+from user         import User
+from xml_model    import XMLModel
 
 TEST_SAVE = True
 
@@ -83,3 +91,386 @@ class TestLanguageDB(object):
         assert len(res) == 2
         assert res[0].value == 'koeie' and res[0].status == 'todo'
         assert res[1].value == 'varkies' and res[1].status == 'todo'
+
+    def test_find_parts_of_speech(self):
+        ldb = LanguageDB(lang='af')
+        ldb.load('test_langdb.xldb')
+        noun = ldb.parts_of_speech_ids[123]
+        assert ldb.find_parts_of_speech(shortcut=u'n1') == [noun]
+        assert ldb.find_parts_of_speech(name=u'noun, ORDINARY') == [noun]
+        assert ldb.find_parts_of_speech(shortcut=u'v1sp', name=u'Noun, ordinary') == [ldb.parts_of_speech_ids[125], noun]
+
+        upper = PartOfSpeech(name=u'Noun, Ordinary', shortcut=u'N1')
+        ldb.add_part_of_speech(upper)
+        assert ldb.find_parts_of_speech(shortcut=u'N1') == [upper]
+        assert ldb.find_parts_of_speech(shortcut=u'n1') == [noun]
+        assert ldb.find_parts_of_speech(name=u'noun, ordinary') == [noun, upper]
+
+        ldb.remove(noun)
+        assert ldb.find_parts_of_speech(shortcut=u'n1') == [upper]
+        assert not ldb.find_parts_of_speech(name=u'Noun') and u'noun, ordinary' in ldb.pos_by_name
+
+    def test_import_source(self):
+        fd, filename = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, '# words\nkoeie\nboom\t3\nkoeie\n\nvarkies\n')
+        os.close(fd)
+
+        ldb = LanguageDB(lang='af')
+        try:
+            ldb.import_source(Source(name='test', filename=filename, import_user_id=1))
+        finally:
+            os.remove(filename)
+
+        assert len(ldb.surface_forms) == 3
+        words = [(sf.value, sf.frequency) for sf in ldb.surface_forms_by_frequency()]
+        assert words == [(u'boom', 3), (u'koeie', 2), (u'varkies', 1)]
+
+    def test_ids(self):
+        # Databases don't share ID's, so the same file can be loaded twice
+        ldb1 = LanguageDB(lang='af', filename='test_langdb.xldb')
+        ldb2 = LanguageDB(lang='af', filename='test_langdb.xldb')
+        assert sorted(ldb1.roots_ids) == sorted(ldb2.roots_ids)
+
+        # Models without an ID get one when they are added
+        roots = [Root(value=u'boom'), Root(value=u'koei')]
+        ldb1.add_many('roots', roots)
+        ldb2.add_root(Root(value=u'vark'))
+        top = max(ldb2.roots_ids)
+        assert [r.id for r in roots] == [top, top + 1]
+
+        # Reserved ID's aren't handed out again
+        id = ldb1.new_id('surface_forms')
+        sf = SurfaceForm(value=u'bome')
+        ldb1.add_surface_form(sf)
+        assert sf.id == id + 1
+        ldb1.add_surface_form(SurfaceForm(value=u'koeie', id=id))
+        assert ldb1.surface_forms_ids[id].value == u'koeie'
+
+        # ID's that are in use can't be claimed
+        ldb1.id_allocators['surface_forms'].claim(id + 5)
+        for add in (ldb1.add_surface_form, lambda sf: ldb1.add_many('surface_forms', [sf])):
+            try:
+                add(SurfaceForm(value=u'vark', id=id + 5))
+                assert False, 'Used ID claimed'
+            except exceptions.IDUsedError:
+                pass
+        assert not ldb1.find(section='surface_forms', value=u'vark')
+
+    def test_update_surface_form(self):
+        ldb = LanguageDB(lang='af')
+        root = Root(value=u'koei')
+        ldb.add_root(root)
+        sf1 = SurfaceForm(value=u'koeie', status='todo')
+        sf2 = SurfaceForm(value=u'koeie', status='classified', root_id=root.id)
+        ldb.add_many('surface_forms', [sf1, SurfaceForm(value=u'bome')])
+        ldb.add_surface_form(sf2)
+
+        # (value, root_id) pairs are unique
+        try:
+            ldb.add_surface_form(SurfaceForm(value=u'koeie'))
+            assert False, 'Duplicate surface form added'
+        except exceptions.DuplicateModelError:
+            pass
+        try:
+            ldb.update_surface_form(sf1, root_id=root.id)
+            assert False, 'Surface form changed into a duplicate'
+        except exceptions.DuplicateModelError:
+            pass
+
+        # Surface forms stay in the set after their root changes
+        ldb.remove(sf2)
+        ldb.update_surface_form(sf1, root_id=root.id)
+        assert sf1.root_id == root.id and sf1 in ldb.surface_forms
+        assert ldb.surface_form_keys[(u'koeie', root.id)] is sf1
+        assert (u'koeie', 0) not in ldb.surface_form_keys
+
+        ldb.update_surface_form(sf1, value=u'koeï')
+        assert ldb.find(section='surface_forms', value=u'koeï') == [sf1]
+        assert not ldb.find(section='surface_forms', value=u'koeie')
+
+    def test_remove(self):
+        ldb = LanguageDB(lang='af', filename='test_langdb.xldb')
+        root = ldb.find(section='roots', value=u'koeï')[0]
+        ldb.remove(root)
+        assert root.id not in ldb.roots_ids and root not in ldb.roots
+        assert not ldb.find(section='roots', value=u'koeï')
+        assert root.id not in ldb.id_allocators['roots']
+
+        try:
+            ldb.remove(root)
+            assert False, 'Root removed twice'
+        except exceptions.UnknownModelError:
+            pass
+
+        ldb.close()
+        assert not ldb.surface_forms and not ldb.surface_forms_ids
+        assert len(ldb.id_allocators['surface_forms']) == 0
+        ldb.load('test_langdb.xldb')
+        assert ldb.find(section='roots', value=u'koeï')
+
+    def test_reimport_source(self):
+        fd, filename = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, 'koeie\nboom\n')
+        os.close(fd)
+
+        ldb = LanguageDB(lang='af')
+        try:
+            src = ldb.import_source(Source(name='first', filename=filename, import_user_id=1))
+            assert src.size == 11 and len(src.digest) == 40
+
+            # The same file under another name is not imported again
+            assert ldb.import_source(Source(name='again', filename=filename)) is src
+            assert len(ldb.sources) == 1
+
+            # Only appended lines are read
+            f = open(filename, 'ab')
+            f.write('varkies\nkoeie\n')
+            f.close()
+            assert ldb.import_source(Source(name='more', filename=filename)) is src
+            assert len(ldb.sources) == 1 and src.size == 25
+
+            words = dict([(sf.value, sf.frequency) for sf in ldb.surface_forms])
+            assert words == {u'koeie': 2, u'boom': 1, u'varkies': 1}
+            assert ldb.find(section='surface_forms', value=u'varkies')[0].source_id == src.id
+
+            # A word with several surface forms is counted once, preferably
+            # on the one without a root
+            roots = [Root(value=u'boom'), Root(value=u'bome')]
+            ldb.add_many('roots', roots)
+            bome = [SurfaceForm(value=u'bome', root_id=r.id, status='classified') for r in roots]
+            ldb.add_many('surface_forms', bome)
+            f = open(filename, 'ab')
+            f.write('bome\n')
+            f.close()
+            ldb.import_source(Source(name='more', filename=filename))
+            assert [sf.frequency for sf in bome] == [2, 1]
+
+            bome.append(SurfaceForm(value=u'bome', status='todo'))
+            ldb.add_surface_form(bome[-1])
+            f = open(filename, 'ab')
+            f.write('bome\n')
+            f.close()
+            ldb.import_source(Source(name='more', filename=filename))
+            assert [sf.frequency for sf in bome] == [2, 1, 2]
+        finally:
+            os.remove(filename)
+
+    def test_normalization(self):
+        nfc, nfd = u'koe\u00ef', u'koei\u0308'
+
+        fd, filename = tempfile.mkstemp(suffix='.txt')
+        os.write(fd, '\n'.join([nfc, nfd, nfd]).encode('utf-8'))
+        os.close(fd)
+
+        ldb = LanguageDB(lang='af')
+        try:
+            ldb.import_source(Source(name='test', filename=filename, import_user_id=1))
+        finally:
+            os.remove(filename)
+
+        assert len(ldb.surface_forms) == 1
+        sf = list(ldb.surface_forms)[0]
+        assert sf.value == nfc and sf.frequency == 3
+        assert ldb.find(section='surface_forms', value=nfd) == [sf]
+
+        root = Root(value=nfd)
+        assert root.value == nfd
+        ldb.add_root(root)
+        assert root.value == nfc
+        assert ldb.find(section='roots', value=nfd) == [root]
+
+        sf = SurfaceForm(value=nfd, root_id=root.id)
+        ldb.add_surface_form(sf)
+        assert sf.value == nfc and len(ldb.find(section='surface_forms', value=nfd)) == 2
+        ldb.update_surface_form(sf, value=u'koei\u0308e')
+        assert sf.value == u'koe\u00efe'
+
+    def test_nfd_normalization(self):
+        nfc, nfd = u'koe\u00ef', u'koei\u0308'
+        ldb = LanguageDB(lang='af', normalizer=Normalizer('NFD'))
+        ldb.add_surface_form(SurfaceForm(value=nfc, status='todo'))
+        ldb.add_many('roots', [Root(value=nfc)])
+        assert [sf.value for sf in ldb.surface_forms] == [nfd]
+        assert [r.value for r in ldb.roots] == [nfd]
+
+        # The values that a migration writes are kept, so it settles
+        assert ldb.migrate_normalization() == 0
+        fd, filename = tempfile.mkstemp(suffix='.xldb')
+        os.close(fd)
+        try:
+            ldb.save(filename)
+            other = LanguageDB(lang='af', normalizer=Normalizer('NFD'))
+            other.load(filename)
+        finally:
+            os.remove(filename)
+        assert [sf.value for sf in other.surface_forms] == [nfd]
+        assert other.migrate_normalization() == 0
+
+    def test_migrate_normalization(self):
+        nfc, nfd = u'koe\u00ef', u'koei\u0308'
+
+        ldb = LanguageDB(lang='af')
+        sf1 = SurfaceForm(value=u'boom', status='todo', frequency=2)
+        sf2 = SurfaceForm(value=u'bome', status='todo', frequency=3)
+        ldb.add_surface_form(sf1)
+        ldb.add_surface_form(sf2)
+        # Values that were not normalized, as in an old database
+        sf2.value = nfd
+        sf1.value = nfc
+        sf2.status = 'classified'
+        ldb.reindex()
+
+        assert ldb.migrate_normalization() == 2
+        assert ldb.surface_forms_ids.values() == [sf2]
+        assert ldb.surface_forms == set([sf2])
+        assert sf2.value == nfc and sf2.frequency == 5
+        assert len(ldb.to_elem().find('surface_forms')) == 1
+        assert ldb.xmlroot.get('normalization') == 'NFC'
+
+    def test_stats(self):
+        ldb = LanguageDB(lang='af')
+        sfs = [
+            SurfaceForm(value=u'koeie',   status='todo', source_id=1, user_id=1),
+            SurfaceForm(value=u'varkies', status='todo', source_id=1, user_id=1),
+            SurfaceForm(value=u'bome',    status='todo', source_id=2, user_id=2),
+        ]
+        ldb.add_many('surface_forms', sfs[:2])
+        ldb.add_surface_form(sfs[2])
+        assert ldb.stats() == {'todo': 3, 'classified': 0, 'ignored': 0, 'rejected': 0}
+
+        ldb.update_surface_form(sfs[0], status='classified', user_id=2)
+        ldb.remove(sfs[2])
+        assert ldb.stats()['todo'] == 1 and ldb.stats()['classified'] == 1
+        assert ldb.stats(source_id=1)['todo'] == 1 and ldb.stats(source_id=2)['todo'] == 0
+        assert ldb.stats(user_id=2)['classified'] == 1 and ldb.stats(user_id=1)['todo'] == 1
+        assert '(todo 1)' in str(ldb)
+
+        # The counters are rebuilt from scratch by reindex()
+        counts = (ldb.status_counts.copy(), ldb.source_counts.copy(), ldb.user_counts.copy())
+        ldb.reindex()
+        assert (ldb.status_counts, ldb.source_counts, ldb.user_counts) == counts
+
+        loaded = LanguageDB(lang='af', filename='test_langdb.xldb')
+        assert sum(loaded.stats().values()) == len(loaded.surface_forms)
+
+    def test_todo_index(self):
+        ldb = LanguageDB(lang='af')
+        ldb.add_many('surface_forms', [
+            SurfaceForm(value=u'koeie', status='todo', frequency=1),
+            SurfaceForm(value=u'bome',  status='todo', frequency=3),
+        ])
+        by_id, by_frequency = ldb.todo_index('id'), ldb.todo_index('frequency')
+        assert by_frequency.values == [u'bome', u'koeie']
+        assert ldb.todo_index('id') is by_id
+
+        sf = SurfaceForm(value=u'varkies', status='todo', frequency=2)
+        ldb.add_surface_form(sf)
+        assert by_frequency.values == [u'bome', u'varkies', u'koeie']
+        ldb.add_many('surface_forms', [SurfaceForm(value=u'vark', status='todo', frequency=5)])
+        assert by_frequency.values == [u'vark', u'bome', u'varkies', u'koeie']
+
+        ldb.update_surface_form(sf, status='classified')
+        assert sf not in by_id and by_frequency.values == [u'vark', u'bome', u'koeie']
+        ldb.update_surface_form(by_id[0], value=u'koei')
+        assert by_id.values == [u'koei', u'bome', u'vark']
+
+        ldb.close()
+        assert len(by_id) == 0 and len(by_frequency) == 0
+
+    def test_todo_filters(self):
+        ldb = LanguageDB(lang='af')
+        ldb.add_many('surface_forms', [
+            SurfaceForm(value=u'koeie',  status='todo', source_id=2, user_id=1, frequency=1),
+            SurfaceForm(value=u'bome',   status='todo', source_id=1, user_id=1, frequency=2),
+            SurfaceForm(value=u'koeël',  status='todo', source_id=1, user_id=2, frequency=3),
+            SurfaceForm(value=u'kombuis', status='todo', source_id=1, user_id=2, frequency=4),
+        ])
+        by_source = ldb.todo_index('frequency', source_id=1)
+        assert by_source.values == [u'kombuis', u'koeël', u'bome']
+        assert ldb.todo_index('frequency', source_id=1) is by_source
+        assert ldb.todo_index('frequency', source_id=1, prefix=u'k').values == [u'kombuis', u'koeël']
+        assert ldb.todo_index('frequency', source_id=1, prefix=u'koe').values == [u'koeël']
+        assert ldb.todo_index('id', user_id=1).values == [u'koeie', u'bome']
+        by_prefix = ldb.todo_index('frequency', prefix=u'koe')
+        assert by_prefix.values == [u'koeël', u'koeie']
+        assert ldb.todo_index('id', source_id=1, prefix=u'ko').values == [u'koeël', u'kombuis']
+        by_regex = ldb.todo_index('id', regex=u'(ie|ël)$')
+        assert by_regex.values == [u'koeie', u'koeël']
+
+        sf = SurfaceForm(value=u'koedoe', status='todo', source_id=1, frequency=5)
+        ldb.add_surface_form(sf)
+        assert by_source.values[0] == u'koedoe' and by_prefix.values[0] == u'koedoe'
+        assert sf not in by_regex
+        ldb.update_surface_form(by_prefix[1], status='classified')
+        assert by_prefix.values == [u'koedoe', u'koeie'] and u'koeël' not in by_source.values
+
+        ldb.release_todo_index(by_prefix)
+        assert by_prefix not in ldb.todo_indexes.values()
+        assert ldb.todo_index('frequency', prefix=u'koe') is not by_prefix
+        ldb.release_todo_index(ldb.todo_index('id'))
+        assert ('id', None, None, None, None) in ldb.todo_indexes
+
+    def test_todo_orders(self):
+        ldb = LanguageDB(lang='af')
+        ldb.add_many('surface_forms', [
+            SurfaceForm(value=u'koeie',   status='todo', source_id=2, frequency=1),
+            SurfaceForm(value=u'Bome',    status='todo', source_id=1, frequency=2),
+            SurfaceForm(value=u'koeël',   status='todo', source_id=1, frequency=3),
+            SurfaceForm(value=u'appels',  status='todo', source_id=2, frequency=1),
+        ])
+        values = lambda order: ldb.todo_index(order).values
+        assert values('alphabetical') == [u'appels', u'Bome', u'koeël', u'koeie']
+        assert values('source')       == [u'Bome', u'koeël', u'koeie', u'appels']
+        assert values('length')       == [u'Bome', u'koeie', u'koeël', u'appels']
+        assert values('prefix')       == [u'appels', u'Bome', u'koeël', u'koeie']
+
+        ldb.add_surface_form(SurfaceForm(value=u'bok', status='todo', frequency=9))
+        assert values('alphabetical') == [u'appels', u'bok', u'Bome', u'koeël', u'koeie']
+        assert values('prefix')[:3] == [u'appels', u'bok', u'Bome']
+        assert sorted([key[0] for key in ldb.todo_indexes]) == sorted(LanguageDB.TODO_ORDERS[2:])
+
+    def test_columnar(self):
+        ldb = LanguageDB(lang='af', filename='test_langdb.xldb', columnar=True)
+        plain = LanguageDB(lang='af', filename='test_langdb.xldb')
+        assert etree.tostring(ldb.to_elem()) == etree.tostring(plain.to_elem())
+        assert len(ldb.surface_forms) == len(plain.surface_forms)
+        todo = [
+            sorted([(sf.id, sf.value) for sf in db.surface_forms_with_status('todo')])
+            for db in (ldb, plain)
+        ]
+        assert todo[0] and todo[0] == todo[1]
+
+        sf = SurfaceForm(value=u'bokkie', status='todo')
+        ldb.add_surface_form(sf)
+        view = ldb.surface_forms_ids[sf.id]
+        assert view is not sf and view == sf
+        assert ldb.find(section='surface_forms', value=u'bokkie') == [view]
+
+        ldb.update_surface_form(view, value=u'varke')
+        assert ldb.surface_form_keys[(u'varke', 0)] is view
+        ldb.remove(view)
+        assert view not in ldb.surface_forms and not ldb.find(section='surface_forms', value=u'varke')
+
+    def test_add_many(self):
+        ldb = LanguageDB(lang='af')
+        roots = [Root(value=u'boom'), Root(value=u'koei'), Root(value=u'vark')]
+        ldb.add_many('roots', roots)
+        assert ldb.roots == set(roots)
+        assert ldb.roots_ids[roots[1].id] is roots[1]
+        assert ldb.find(section='roots', value=u'koei') == [roots[1]]
+        assert len(ldb.to_elem().find('roots')) == 3
+
+        # A batch with a duplicate is rejected as a whole
+        try:
+            ldb.add_many('roots', [Root(value=u'perd'), roots[0]])
+            assert False, 'Duplicate root added'
+        except exceptions.DuplicateModelError:
+            pass
+        assert len(ldb.roots) == 3 and not ldb.find(section='roots', value=u'perd')
+
+        # Models have to match the section
+        try:
+            ldb.add_many('roots', [SurfaceForm(value=u'bome')])
+            assert False, 'Surface form added to roots'
+        except exceptions.UnknownModelError:
+            pass
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from lxml     import etree
+from StringIO import StringIO
+
+from spelt.common              import exceptions
+from spelt.models.model_factory import ModelFactory
+from spelt.models.pos          import PartOfSpeech
+from spelt.models.root         import Root
+from spelt.models.source       import Source
+from spelt.models.surface_form import SurfaceForm
+from spelt.models.user         import User
+
+class TestModelFactory(object):
+    """Unit test for ModelFactory and the models' hydration constructors."""
+
+    xml = """
+        <models>
+            <part_of_speech id="1123">
+                <name>Noun</name>
+                <shortcut>n1</shortcut>
+                <remarks xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" xsi:nil="true"/>
+            </part_of_speech>
+            <root id="1125" pos_id="1123" user_id="2" date="123456">
+                <value>koei</value>
+                <remarks>A cow</remarks>
+            </root>
+            <source id="1127" date="7654321" import_user_id="2" size="12" digest="abc">
+                <name>Source</name>
+                <filename>src.txt</filename>
+                <description/>
+            </source>
+            <surface_form id="1129" user_id="2" date="321" source_id="1127" root_id="1125" frequency="7">
+                <value>koeie</value>
+                <status>classified</status>
+            </surface_form>
+            <user id="1131">
+                <name>Walter</name>
+            </user>
+        </models>"""
+
+    def test_hydration(self):
+        elems = list(etree.parse(StringIO(self.xml)).getroot())
+        before = [etree.tostring(e) for e in elems]
+        models = [ModelFactory.create_model_from_elem(e) for e in elems]
+
+        # The elements are only read
+        assert [etree.tostring(e) for e in elems] == before
+        assert [m.__class__ for m in models] == [PartOfSpeech, Root, Source, SurfaceForm, User]
+
+        # Hydrated models have the same fields (besides the ID, which is
+        # already taken) as fully constructed ones
+        for model, elem in zip(models, elems):
+            expected = model.__class__(elem=elem)
+            for name in model.attribs[1:] + model.values:
+                assert getattr(model, name) == getattr(expected, name), name
+
+        pos, root, src, sf, usr = models
+        assert [m.id for m in models] == [1123, 1125, 1127, 1129, 1131]
+        assert pos.remarks == u''
+        assert root.pos_id == 1123 and root.date == 123456
+        assert src.size == 12 and src.digest == 'abc'
+        assert sf.frequency == 7 and sf.value == u'koeie'
+        assert usr.name == u'Walter'
+
+    def test_invalid_elem(self):
+        try:
+            ModelFactory.create_model_from_elem(etree.Element('bogus'))
+            assert False, 'Model created from invalid element'
+        except exceptions.InvalidElementError:
+            pass
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from spelt.models.ordered_index import OrderedIndex
+from spelt.models.surface_form  import SurfaceForm
+
+class TestOrderedIndex(object):
+    """Unit test for OrderedIndex."""
+
+    def test_order(self):
+        sfs = [SurfaceForm(value=u'w%d' % (i), id=i, frequency=i % 3) for i in range(1, 7)]
+        changes = []
+        index = OrderedIndex(lambda sf: (-sf.frequency, sf.id), sfs[3:])
+        index.change_handlers.append(lambda *args: changes.append(args))
+
+        assert [sf.id for sf in index] == [5, 4, 6]
+        assert index.values == [u'w5', u'w4', u'w6']
+        assert index.insert(sfs[1]) == 0 and index[0] is sfs[1]
+        assert index.index(sfs[3]) == 2 and index.index(sfs[0]) == -1
+
+        assert index.remove(sfs[3]) == 2 and index.remove(sfs[3]) == -1
+        assert changes == [(0, sfs[1], True), (2, sfs[3], False)]
+
+        index.update(sfs[:1] + sfs[2:3])
+        assert [sf.id for sf in index] == [2, 5, 1, 3, 6]
+        assert changes[-1] == (None, None, None) and len(index) == 5
+
+        # Handlers may replace themselves while the index notifies them
+        calls = []
+        def replace(*args):
+            calls.append('replace')
+            index.change_handlers.remove(replace)
+            index.change_handlers.append(added)
+        def added(*args):
+            calls.append('added')
+        index.change_handlers[:] = [replace, lambda *args: calls.append('other')]
+        index.reset(sfs)
+        index.reset(sfs)
+        assert calls == ['replace', 'other', 'other', 'added']
+
+    def test_filtered(self):
+        sfs = [SurfaceForm(value=u'w%d' % (i), id=i, frequency=i % 3) for i in range(1, 7)]
+        index = OrderedIndex(lambda sf: (-sf.frequency, sf.id), sfs)
+        odd = index.filtered(lambda sf: sf.id % 2)
+        assert [sf.id for sf in odd] == [5, 1, 3]
+        assert odd.keys == [(-2, 5), (-1, 1), (-0, 3)]
+
+        assert odd.insert(SurfaceForm(value=u'w8', id=8, frequency=2)) == -1
+        assert odd.insert(SurfaceForm(value=u'w7', id=7, frequency=1)) == 2
+        odd.update([SurfaceForm(value=u'w%d' % (i), id=i, frequency=0) for i in (9, 10)])
+        assert [sf.id for sf in odd] == [5, 1, 7, 3, 9]
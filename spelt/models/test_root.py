@@ -44,9 +44,9 @@ class TestRoot:
         Test creation of a simple Root object with its own constructor.
         """
         r = Root()
-        now = str(int( time.mktime(datetime.now().timetuple()) ))
-        # r.id not tested because it should be automagically determined by
-        # the voodoo in IDManager
+        now = int( time.mktime(datetime.now().timetuple()) )
+        # The ID is assigned when the root is added to a LanguageDB
+        assert r.id      == 0
         assert r.value   == u''
         assert r.remarks == u''
         assert r.pos_id  == 0
@@ -60,7 +60,7 @@ class TestRoot:
         assert r.id      == 1
         assert r.pos_id  == 11
         assert r.user_id == 111
-        assert r.date    == '123456'
+        assert r.date    == 123456
         del r
 
     def test_create_with_xml(self):
@@ -78,14 +78,31 @@ class TestRoot:
         assert r1.id      == 1
         assert r1.pos_id  == 11
         assert r1.user_id == 111
-        assert r1.date    == "1212555224"
+        assert r1.date    == 1212555224
 
         assert r2.value   == u'boom'
         assert r2.remarks == u''
         assert r2.id      == 2
         assert r2.pos_id  == 22
         assert r2.user_id == 222
-        assert r2.date    == "1212555925"
+        assert r2.date    == 1212555925
 
         del r1
         del r2
+
+    def test_equality(self):
+        """
+        Test that roots are compared by ID, and that roots without an ID are
+        only equal to themselves and can't be hashed.
+        """
+        r1, r2 = Root(value=u'koei'), Root(value=u'boom')
+        assert r1 == r1 and r1 != r2 and not r1 == r2
+        try:
+            set([r1])
+            assert False, 'Root without an ID hashed'
+        except TypeError:
+            pass
+
+        r3, r4 = Root(value=u'koei', id=3), Root(value=u'boom', id=3)
+        assert r3 == r4 and not r3 != r4 and len(set([r3, r4])) == 1
+        assert r3 != r1 and not Root(id=3) == r1
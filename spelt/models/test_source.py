@@ -51,12 +51,13 @@ class TestSource:
         Test creation of a simple Source object with its own constructor.
         XML attributes (first 3 arguments) only.
         """
-        now = str(int( time.mktime(datetime.now().timetuple()) ))
+        now = int( time.mktime(datetime.now().timetuple()) )
         s = Source(id=101, date=now, import_user_id=2)
 
         assert s.id == 101
         assert s.date == now
         assert s.import_user_id == 2
+        assert s.size == 0
         assert s.name == u''
         assert s.filename == u''
         assert s.description == u''
@@ -85,14 +86,16 @@ class TestSource:
         assert s1.filename == 'testsrc1.txt'
         assert s1.description == 'A fictitious source for testing purposes'
         assert s1.id == 1
-        assert s1.date == '1212555224'
+        assert s1.date == 1212555224
         assert s1.import_user_id == 4
+        assert s1.size == 0 # Sources saved before fingerprinting
+        assert s1.digest == ''
 
         assert s2.name == 'Test Source 2'
         assert s2.filename == 'testsrc2.txt'
         assert s2.description == 'Another fictitious source for testing purposes'
         assert s2.id == 2
-        assert s2.date == '1212555925'
+        assert s2.date == 1212555925
         assert s2.import_user_id == 2
 
 
@@ -22,7 +22,8 @@ from datetime import datetime
 from lxml     import etree, objectify
 from StringIO import StringIO
 
-from spelt.models.surface_form import SurfaceForm
+from spelt.models.surface_form import SurfaceForm, VALID_STATUSES
+from spelt.models.xml_model    import Interner
 
 class TestSurfaceForm(object):
     """Unit test for the SurfaceForm model class."""
@@ -52,9 +53,13 @@ class TestSurfaceForm(object):
         assert sf.status    == 'todo'
         assert sf.id        == 3
         assert sf.user_id   == 30
-        assert sf.date      == "0"
+        assert sf.date      == 0
         assert sf.source_id == 33
         assert sf.root_id   == 333
+        assert sf.frequency == 1
+
+        sf = SurfaceForm(u'varkies', 'todo', frequency=42)
+        assert sf.frequency == 42
 
     def test_create_from_xml(self):
         """
@@ -69,13 +74,39 @@ class TestSurfaceForm(object):
         assert sf1.value     == u'koeie'
         assert sf1.status    == 'classified'
         assert sf1.user_id   == 1
-        assert sf1.date      == '123'
+        assert sf1.date      == 123
         assert sf1.source_id == 11
         assert sf1.root_id   == 111
 
         assert sf2.value     == unicode('varkagtighede')
         assert sf2.status    == 'ignored'
         assert sf2.user_id   == 2
-        assert sf2.date      == '321'
+        assert sf2.date      == 321
         assert sf2.source_id == 22
         assert sf2.root_id   == 222
+        assert sf2.frequency == 1
+
+    def test_shared_values(self):
+        """
+        Test that statuses and repeated attributes are shared between surface
+        forms loaded with the same Interner.
+        """
+        interner = Interner()
+        elems = [etree.fromstring(
+            '<surface_form id="%d" user_id="1" date="1234567" source_id="1000">'
+            '<value>w%d</value><status>todo</status></surface_form>' % (i, i)) for i in (1, 2)]
+        sf1, sf2 = [SurfaceForm.from_elem(elem, interner) for elem in elems]
+
+        assert sf1.status is sf2.status is VALID_STATUSES[-1]
+        assert sf1.date is sf2.date
+        assert sf1.source_id is sf2.source_id
+        assert sf1.id != sf2.id
+
+        sf1.status = u'ignored'
+        assert type(sf1.status) is str and sf1.status == 'ignored'
+
+    def test_equality(self):
+        sf1, sf2 = SurfaceForm(value=u'koeie'), SurfaceForm(value=u'koeie')
+        assert sf1 == sf1 and not sf1 == sf2 and sf1 != sf2
+        assert SurfaceForm(id=5) == SurfaceForm(value=u'bome', id=5)
+        assert not SurfaceForm(id=5) != SurfaceForm(value=u'bome', id=5)
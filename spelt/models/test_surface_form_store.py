@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2008 Zuza Software Foundation
+#
+# This file is part of Spelt.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, see <http://www.gnu.org/licenses/>.
+
+from lxml import etree
+
+from spelt.models.surface_form       import SurfaceForm
+from spelt.models.surface_form_store import SurfaceFormStore
+
+class TestSurfaceFormStore(object):
+    """Unit test for SurfaceFormStore and its row views."""
+
+    def setup(self):
+        self.forms = [
+            SurfaceForm(u'koeie',   'todo',       1, 1, 100, 1, 0,  4),
+            SurfaceForm(u'varkies', 'classified', 2, 1, 100, 1, 11, 2),
+            SurfaceForm(u'koeï',    'todo',       5, 2, 200, 2, 0,  1),
+        ]
+        self.store = SurfaceFormStore(self.forms)
+
+    def test_views(self):
+        store = self.store
+        assert len(store) == 3 and len(store.by_id) == 3
+        view = store.by_id[5]
+        assert view.value == u'koeï' and view.status == 'todo'
+        assert view.user_id == 2 and view.date == 200 and view.frequency == 1
+        assert view == self.forms[2] and self.forms[2] == view
+        assert view in store and store.by_id.get(5) is view
+        assert sorted(store.by_id) == [1, 2, 5]
+
+        view.value = u'koei\u0308' # Stored as given (LanguageDB normalizes)
+        assert view.value == u'koei\u0308'
+        view.value = u'koe\u00ef'
+        view.status = 'ignored'
+        view.frequency += 1
+        assert view.value == u'koeï' and view.status == 'ignored' and view.frequency == 2
+        assert etree.tostring(view.to_elem()) == etree.tostring(self.forms[2].to_elem()).replace(
+            'frequency="1"', 'frequency="2"').replace('todo', 'ignored')
+
+        view.id = 7
+        assert store.by_id[7] is view and 5 not in store.by_id
+
+    def test_select(self):
+        store = self.store
+        assert [sf.id for sf in store.select(status='todo')] == [1, 5]
+        assert [sf.id for sf in store.select(status='todo', source_id=2)] == [5]
+        assert [sf.id for sf in store.select(user_id=1)] == [1, 2]
+        assert store.select(status='rejected') == []
+        assert store.count('todo') == 2 and store.count('ignored') == 0
+        assert store.status_counts() == {'todo': 2, 'classified': 1}
+
+    def test_remove(self):
+        store = self.store
+        view = store.by_id[1]
+        del store.by_id[1]
+        assert len(store) == 2 and view not in store
+        # Removed views keep their values
+        assert view.value == u'koeie' and view.id == 1
+        assert store.count('todo') == 1
+
+        # The free row is reused
+        store.add(SurfaceForm(u'bome', 'todo', 9))
+        assert len(store.views) == 3 and store.by_id[9].value == u'bome'
+
+        old = store.by_id[2]
+        store.clear()
+        assert len(store) == 0 and old.value == u'varkies'
+        assert store.select(status='todo') == []
+
+    def test_compact(self):
+        store = self.store
+        view = store.by_id[2]
+        for i in range(1000):
+            view.value = u'varkies%d' % (i)
+        assert view.value == u'varkies999'
+        assert len(store.text) < 4096 * 3
+        assert store.by_id[1].value == u'koeie'
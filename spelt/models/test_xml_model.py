@@ -18,34 +18,41 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-from lxml     import etree, objectify
+from lxml     import etree
 from StringIO import StringIO
 
-from spelt.models.xml_model import XMLModel
+from datetime import datetime
+
+from spelt.models.root      import Root
+from spelt.models.xml_model import DatedModel, Interner, XMLModel, timestamp
+
+class Person(XMLModel):
+    """A minimal model for testing XMLModel."""
+
+    __slots__ = ('height', 'weight', 'notes', 'sex', 'race')
+
+    tag     = 'person'
+    values  = ('height', 'weight', 'notes')
+    attribs = ('sex', 'race')
 
 class TestXMLModel:
     """Unit test for XMLModel class."""
 
-    xml = StringIO("""
+    xml = """
         <person sex="male" race="chinese">
             <height>182</height>
             <weight>70.5</weight>
             <notes></notes>
         </person>
-        """)
+        """
 
-    def __init__(self):
-        self.model = XMLModel(
-            'person',
-            values=['height', 'weight', 'notes'],
-            attribs=['sex', 'race'],
-            elem=objectify.parse(TestXMLModel.xml).getroot()
-        )
+    def setup(self):
+        self.model = Person(elem=etree.parse(StringIO(self.xml)).getroot())
 
     def test_from_xml(self):
         """
-        Test that XMLModel.from_xml() works by checking that members are assigned
-        according to the hard-coded values represented in xml.
+        Test that XMLModel.read_elem() works by checking that members are
+        assigned according to the hard-coded values represented in xml.
         """
         assert self.model.sex == 'male'
         assert self.model.race == 'chinese'
@@ -55,19 +62,58 @@ class TestXMLModel:
 
     def test_to_xml(self):
         """
-        Test that XMLModel.to_xml() works by comparing the source
-        lxml.objectify.ObjectifiedElement used to create a XMLModel and the element
-        returned by to_xml().
+        Test that XMLModel.to_elem() works by comparing the model with the
+        element it returns.
         """
-        toroot = self.model.elem
+        toroot = self.model.to_elem()
 
+        assert toroot.tag == 'person'
         assert self.model.sex    == toroot.get('sex')
         assert self.model.race   == toroot.get('race')
-        assert float(self.model.height) == float(toroot.height)
-        assert float(self.model.weight) == float(toroot.weight)
-        assert self.model.notes  == toroot.notes
+        assert float(self.model.height) == float(toroot.findtext('height'))
+        assert float(self.model.weight) == float(toroot.findtext('weight'))
+        assert self.model.notes  == toroot.findtext('notes')
+
+    def test_slots(self):
+        """Test that models don't have a per-instance __dict__."""
+        assert not hasattr(self.model, '__dict__')
+        try:
+            self.model.age = 30
+            assert False, 'Undeclared field set'
+        except AttributeError:
+            pass
+
+class TestDatedModel:
+    """Unit test for DatedModel."""
+
+    def test_dates(self):
+        day = 86400
+        roots = [Root(value=u'r%d' % i, date=i * day / 2) for i in range(6)]
+
+        assert Root(date=datetime.fromtimestamp(day)).date == day
+        roots[0].date = datetime.fromtimestamp(0)
+        assert roots[0].date == 0 and roots[0].to_elem().get('date') == '0'
+
+        def values(roots):
+            return [r.value for r in roots]
+        assert values(DatedModel.filter_dates(roots, start=day, end=2 * day)) == [u'r2', u'r3']
+        assert values(DatedModel.filter_dates(roots, end=datetime.fromtimestamp(day))) == [u'r0', u'r1']
+        assert values(DatedModel.filter_dates(roots, start=2 * day)) == [u'r4', u'r5']
+        assert DatedModel.date_stats(roots) == {0: 2, day: 2, 2 * day: 2}
+        assert abs(timestamp() - Root().date) <= 1
+
+class TestInterner:
+    """Unit test for Interner."""
+
+    def test_interner(self):
+        interner = Interner()
+        assert interner.int('123456') == 123456
+        assert interner.int('123456') is interner.int(u'123456')
+        assert interner.string(u'abc' * 2) is interner.string(u'abcabc')
 
 if __name__ == '__main__':
     test = TestXMLModel()
+    test.setup()
     test.test_from_xml()
     test.test_to_xml()
+    test.test_slots()
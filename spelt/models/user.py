@@ -18,15 +18,19 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-from lxml import objectify
-
-from spelt.models.xml_model import XMLModel
+from spelt.models.xml_model import XMLModel, elem_texts
 
 class User(XMLModel):
     """
     This class represents user from the language database.
     """
 
+    __slots__ = ('name',)
+
+    tag     = 'user'
+    values  = ('name',)
+    attribs = ('id',)
+
     # CONSTRUCTORS #
     def __init__(self, name='<unknown>', id=0, elem=None):
         """Constructor.
@@ -34,33 +38,28 @@ class User(XMLModel):
             @param name: User's name (default None)
             @type  id: int
             @param id: The user's unique identifier (default None)
+            @type  elem: lxml.etree._Element
+            @param elem: An XML element to read the fields from.
             """
         assert name is None or isinstance(name, basestring)
         assert isinstance(id, int)
 
-        super(User, self).__init__(tag='user', values=['name'], attribs=['id'], elem=elem)
+        super(User, self).__init__(elem=elem)
 
-        if elem is None:
+        if not hasattr(self, 'name'):
             self.name = name
-            self.id   = id
-        else:
-            if not hasattr(self, 'name'):
-                self.name = name
-            if not hasattr(self, 'id'):
-                self.id = id
-            else:
-                # Make sure that the ID is registered with the ID manager.
-                self.id = self.id
+        if not hasattr(self, 'id'):
+            self.id = id
+
+    @classmethod
+    def from_elem(cls, elem, interner=None):
+        """See XMLModel.from_elem()."""
+        usr = cls._hydrate(int(elem.get('id', 0)))
+        object.__setattr__(usr, 'name', elem_texts(elem).get('name', u''))
+        return usr
 
     # METHODS #
     def validate_data(self):
         """See XMLModel.validate_data()."""
         assert isinstance(self.id, int)
         assert isinstance(unicode(self.name), basestring) and len(unicode(self.name)) > 0
-
-    # SPECIAL METHODS #
-    def __eq__(self, rhs):
-        return self.id == rhs.id
-
-    def __hash__(self):
-        return self.id
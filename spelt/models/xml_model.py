@@ -18,49 +18,165 @@
 # You should have received a copy of the GNU General Public License
 # along with this program; if not, see <http://www.gnu.org/licenses/>.
 
-from lxml import objectify
+import time
+from datetime import datetime
+from lxml     import etree
 
 from spelt.common import exceptions, _
 
-from spelt.models.id_manager import IDManager
+def timestamp(date=None):
+    """Convert a date to the integer number of seconds since the epoch, as
+        stored in models.
 
-class XMLModel(IDManager):
+        @type  date: datetime.datetime, int or basestring
+        @param date: The date to convert. (Default: None - now)
+        @rtype:      int"""
+    if date is None:
+        return int(time.time())
+    if isinstance(date, datetime):
+        return int(time.mktime(date.timetuple()))
+    return int(date)
+
+def elem_texts(elem):
+    """Get the text of every child of the given element.
+
+        @type  elem: lxml.etree._Element
+        @param elem: The element to read.
+        @rtype:      dict
+        @return:     Maps child tags to unicode text."""
+    return dict([(child.tag, unicode(child.text or u'')) for child in elem.iterchildren()])
+
+class Interner(object):
+    """
+    Shares equal field values between the models loaded from one database.
+
+    Most of the attributes of a large database repeat: thousands of surface
+    forms have the same user_id, source_id and import date. Parsing every one
+    of them separately leaves a separate int object in each model, so
+    from_elem() looks them up here instead. The attribute text is used as
+    key, which also saves the int() call for all but the first occurrence.
+    """
+
+    def __init__(self):
+        self.ints    = {}
+        self.strings = {}
+
+    def int(self, text):
+        """Get the (shared) int for the given attribute text.
+
+            @type  text: basestring
+            @param text: The attribute value to convert."""
+        try:
+            return self.ints[text]
+        except KeyError:
+            value = self.ints[text] = int(text)
+            return value
+
+    def string(self, value):
+        """Get the shared copy of the given string.
+
+            @type  value: basestring
+            @param value: The string to share."""
+        return self.strings.setdefault(value, value)
+
+class XMLModel(object):
     """
     This base-class of that provides common XML reading and writing methods.
 
-    This class is only meant to be inherited from, but can conceivably be used
-    on its own (see test_xml_model).
+    Models are plain objects with their fields in __slots__, so reading a
+    field is a normal attribute access. XML elements are only read when a
+    model is loaded (read_elem()) and only created when it is saved
+    (to_elem()).
+
+    A model's ID is 0 until it is added to a LanguageDB, which assigns the
+    ID's of its models (see L{spelt.models.id_allocator.IDAllocator}).
+
+    This class is only meant to be inherited from (see test_xml_model).
+    Inheriting classes have to set tag, values and attribs and declare
+    their fields in __slots__.
     """
 
+    __slots__ = ('id',)
+
+    tag = None
+    """The XML-tag to use to represent an instance of this model."""
+    values = ()
+    """The names of the fields that are stored as child elements."""
+    attribs = ()
+    """The names of the fields that are stored as XML attributes."""
+    int_attribs = ()
+    """Attributes (besides ID's) that are automatically converted to int()s."""
+
     # CONSTRUCTORS #
-    def __init__(self, tag, values, attribs, elem=None):
+    def __init__(self, elem=None):
         """Constructor.
 
-            @type  tag:     str
-            @param tag:     The XML-tag to use to represent an instance of this model
-            @type  values:  list
-            @param values:  A list of names of accepted the child values
-            @type  attribs: list
-            @param attribs: A list of accepted attributes
-            @type  elem:    lxml.objectify.ObjectifiedElement
-            @param elem:    The XML element wrapped by the model
+            @type  elem: lxml.etree._Element
+            @param elem: An XML element to read the model's fields from. Fields
+                that are not in the element are left unset.
             """
-        assert isinstance(tag, str) and len(tag) > 0
+        assert isinstance(self.tag, str) and len(self.tag) > 0
+
+        if elem is not None:
+            self.read_elem(elem)
+
+    @classmethod
+    def from_elem(cls, elem, interner=None):
+        """Create a model from an XML element while loading a database.
 
-        # Bypass XMLModel.__setattr__()
-        super_set = super(XMLModel, self).__setattr__
-        super_set('tag', tag)
-        super_set('values', values)
-        super_set('attribs', attribs)
+            Inheriting classes override this with a hydration constructor that
+            bypasses __init__(). This version simply calls it.
 
-        if elem is None:
-            super_set('elem', objectify.Element(tag))
-        else:
-            super_set('elem', elem)
+            @type  elem:     lxml.etree._Element
+            @param elem:     The element to read the model from.
+            @type  interner: Interner
+            @param interner: Shares repeated values with the other models
+                loaded from the same database. (Default: None - not shared)"""
+        return cls(elem=elem)
 
-        super(XMLModel, self).__init__()
+    @classmethod
+    def _hydrate(cls, id):
+        """Create an empty instance with the given ID, for from_elem()."""
+        model = cls.__new__(cls)
+        object.__setattr__(model, 'id', id)
+        return model
 
     # METHODS #
+    def read_elem(self, elem):
+        """Set the model's fields from the given XML element.
+
+            ID's and int_attribs are converted to int()s and child values to
+            unicode strings. Fields not present in the element are not
+            changed.
+
+            @type  elem: lxml.etree._Element
+            @param elem: The element to read from."""
+        attrib = elem.attrib
+        for name in self.attribs:
+            if name in attrib:
+                value = attrib[name]
+                if name == 'id' or name.endswith('_id') or name in self.int_attribs:
+                    value = int(value)
+                setattr(self, name, value)
+
+        values = self.values
+        for child in elem.iterchildren():
+            if child.tag in values:
+                setattr(self, child.tag, unicode(child.text or u''))
+
+    def to_elem(self):
+        """Create an XML element representing the model.
+
+            @rtype:  lxml.etree._Element
+            @return: A new element with the model's attributes and values."""
+        elem = etree.Element(self.tag)
+        for name in self.attribs:
+            elem.set(name, unicode(getattr(self, name)))
+        for name in self.values:
+            value = getattr(self, name)
+            etree.SubElement(elem, name).text = value is not None and unicode(value) or u''
+        return elem
+
     def validate_data(self):
         """
         Checks whether all data-constraints are met.
@@ -71,7 +187,7 @@ class XMLModel(IDManager):
 
         Notes to this function's relevance in XML-related operations:
             - Optional values (not attributes) may be None.
-            - Attributes declared in XMLModel.__init__ must have a non-None
+            - Attributes declared in attribs must have a non-None
               value.
 
         This method is empty and should be overridden in inheriting classes.
@@ -80,35 +196,29 @@ class XMLModel(IDManager):
         pass
 
     # SPECIAL METHODS #
-    def __getattribute__(self, name):
-        super_getattr = super(XMLModel, self).__getattribute__
-        elem = super_getattr('elem')
+    def __eq__(self, rhs):
+        # Models of the same type are equal if they have the same ID (also
+        # true for the views of a SurfaceFormStore). Models that weren't
+        # added to a database yet (ID 0) are only equal to themselves.
+        if getattr(rhs, 'tag', None) != self.tag:
+            return False
+        if not self.id or not rhs.id:
+            return self is rhs
+        return self.id == rhs.id
 
-        if name in super_getattr('attribs'):
-            if name == 'id' or name.endswith('_id'):
-                # Automatically convert ID's to int()s
-                return int(elem.attrib[name])
-            else:
-                return elem.attrib[name]
-        elif name in super_getattr('values'):
-            return unicode(getattr(elem, name))
+    def __ne__(self, rhs):
+        return not self.__eq__(rhs)
 
-        return super_getattr(name)
+    def __hash__(self):
+        # The ID is only assigned when the model is added to a database, so
+        # a hash before that would change
+        if not self.id:
+            raise TypeError(_('%s can not be hashed before it has an ID') % (self.__class__.__name__))
+        return self.id
 
     def __setattr__(self, name, value):
-        if name in ('attribs', 'values'):
-            super(XMLModel, self).__setattr__(name, value)
-        elif name in self.attribs:
-            # Give the 'id' attribute special treatment, because we love it so much. :/
-            if name == 'id':
-                self._set_id(value)
-                self.elem.set('id', str(self._id))
-                return
-            self.elem.set(name, str(value))
-        elif name in self.values:
-            if value is None:
-                value = u''
-            setattr(self.elem, name, value)
+        if value is None and name in self.values:
+            value = u''
 
         super(XMLModel, self).__setattr__(name, value)
 
@@ -128,3 +238,67 @@ class XMLModel(IDManager):
             self.__class__.__name__, self.id,
             ','.join([( '%s="%s"' % (v, repr(getattr(self, v))) ) for v in self.values])
         )
+
+
+class DatedModel(XMLModel):
+    """
+    Base class of models with a date. Dates are stored as integer seconds
+    since the epoch and only converted to and from strings in XML.
+
+    The class methods filter and count lists of models (of any dated type)
+    by date. They are plain loops over the models' integer dates: only the
+    given limits are converted, and no datetime is created per model.
+    """
+
+    __slots__ = ('date',)
+
+    int_attribs = ('date',)
+
+    # CLASS METHODS #
+    @classmethod
+    def filter_dates(cls, models, start=None, end=None):
+        """Get the models dated from start up to (but not including) end.
+
+            @type  models: iterable
+            @param models: The models to filter.
+            @type  start:  datetime.datetime or int
+            @param start:  The earliest date. (Default: None - no limit)
+            @type  end:    datetime.datetime or int
+            @param end:    The date after the last. (Default: None - no limit)
+            @rtype:        list
+            @return:       The matching models, in their original order."""
+        if start is None and end is None:
+            return list(models)
+        if end is None:
+            start = timestamp(start)
+            return [m for m in models if m.date >= start]
+        if start is None:
+            end = timestamp(end)
+            return [m for m in models if m.date < end]
+
+        start, end = timestamp(start), timestamp(end)
+        return [m for m in models if start <= m.date < end]
+
+    @classmethod
+    def date_stats(cls, models, period=86400):
+        """Count models per period of time.
+
+            @type  models: iterable
+            @param models: The models to count.
+            @type  period: int
+            @param period: The length of a period in seconds. (Default: one day)
+            @rtype:        dict
+            @return:       Maps the start of every period (in seconds since
+                the epoch) that has models to the number of models in it."""
+        counts = {}
+        get = counts.get
+        for start in [m.date - m.date % period for m in models]:
+            counts[start] = get(start, 0) + 1
+        return counts
+
+    # SPECIAL METHODS #
+    def __setattr__(self, name, value):
+        if name == 'date' and not isinstance(value, int):
+            value = timestamp(value)
+
+        super(DatedModel, self).__setattr__(name, value)